@@ -0,0 +1,72 @@
+"""Add composite and partial indexes for hot filters
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '005'
+down_revision: Union[str, None] = '004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_ROWS = "is_deleted = false"
+
+# (nom, table, colonnes, condition partielle)
+INDEXES = [
+    # Scores : historique par joueur, filtres jeu/borne, fil des scores récents
+    ('ix_scores_player1_id_created_at', 'scores', ['player1_id', 'created_at'], ACTIVE_ROWS),
+    ('ix_scores_player2_id_created_at', 'scores', ['player2_id', 'created_at'], ACTIVE_ROWS),
+    ('ix_scores_game_id_created_at', 'scores', ['game_id', 'created_at'], None),
+    ('ix_scores_arcade_id_created_at', 'scores', ['arcade_id', 'created_at'], None),
+    ('ix_scores_created_at_active', 'scores', ['created_at'], ACTIVE_ROWS),
+
+    # Réservations : file d'attente FIFO des bornes et réservations par joueur
+    ('ix_reservations_arcade_status_created_at', 'reservations', ['arcade_id', 'status', 'created_at'], None),
+    ('ix_reservations_waiting_queue', 'reservations', ['arcade_id', 'created_at'],
+     "status = 'WAITING' AND is_deleted = false"),
+    ('ix_reservations_player_id', 'reservations', ['player_id'], None),
+    ('ix_reservations_player2_id', 'reservations', ['player2_id'], None),
+
+    # Amitiés : les deux sens de la relation
+    ('ix_friendships_requester_id_status', 'friendships', ['requester_id', 'status'], ACTIVE_ROWS),
+    ('ix_friendships_requested_id_status', 'friendships', ['requested_id', 'status'], ACTIVE_ROWS),
+
+    # Codes promo : vérification "déjà utilisé par cet utilisateur"
+    ('ix_promo_uses_user_id_promo_code_id', 'promo_uses', ['user_id', 'promo_code_id'], ACTIVE_ROWS),
+
+    # Jeux installés sur une borne
+    ('ix_arcade_games_arcade_id_slot_number', 'arcade_games', ['arcade_id', 'slot_number'], ACTIVE_ROWS),
+]
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY ne peut pas s'exécuter dans une transaction :
+    # on sort du bloc transactionnel d'Alembic pour ne pas verrouiller les tables en écriture
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True
+            )
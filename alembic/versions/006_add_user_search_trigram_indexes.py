@@ -0,0 +1,56 @@
+"""Add trigram indexes for user search
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '006'
+down_revision: Union[str, None] = '005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Colonnes interrogées par GET /users/search (ILIKE '%q%' + similarité)
+SEARCH_COLUMNS = ['pseudo', 'nom', 'prenom']
+
+
+def upgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Index GIN trigrammes : ILIKE '%q%' et similarity() sans parcours séquentiel
+    with op.get_context().autocommit_block():
+        for column in SEARCH_COLUMNS:
+            op.create_index(
+                f'ix_users_{column}_trgm',
+                'users',
+                [column],
+                unique=False,
+                if_not_exists=True,
+                postgresql_using='gin',
+                postgresql_ops={column: 'gin_trgm_ops'},
+                postgresql_concurrently=True,
+                postgresql_where=sa.text("is_deleted = false")
+            )
+
+
+def downgrade() -> None:
+    if op.get_context().dialect.name != 'postgresql':
+        return
+
+    with op.get_context().autocommit_block():
+        for column in reversed(SEARCH_COLUMNS):
+            op.drop_index(
+                f'ix_users_{column}_trgm',
+                table_name='users',
+                if_exists=True,
+                postgresql_concurrently=True
+            )
+    # L'extension pg_trgm est conservée : d'autres objets peuvent en dépendre
@@ -51,6 +51,17 @@ def get_current_admin(
     return token_data
 
 
+def admin_from_profile_token(token: Optional[str]) -> Optional[dict]:
+    """Admin authentifié par le token de l'en-tête ``X-Profile-Token`` (profilage, hors dépendances).
+
+    Distinct de ``Authorization``, laissé à la route profilée (token utilisateur).
+    """
+    token = (token or "").strip()
+    if not token:
+        return None
+    return verify_firebase_token(token, "admin")
+
+
 def verify_arcade_key(
         x_api_key: Annotated[str, Header()] = None
 ) -> bool:
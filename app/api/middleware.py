@@ -0,0 +1,446 @@
+import gzip
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from typing import Callable, Dict, Iterable, Optional, Tuple
+from app.core.config import settings
+from app.core.instrumentation import track_queries, record_request
+from app.core.metrics import (
+    http_request_duration, http_requests_in_flight, http_requests_rejected, compression_cache_requests
+)
+from app.core import profiling
+from app.core.rate_limit import (
+    RateLimiter, ConcurrencyLimiter, rate_limiter, concurrency_limiter, parse_route_limits, retry_after_header
+)
+from app.core.security import verify_arcade_api_key
+
+try:
+    import brotli
+except ImportError:  # Brotli optionnel : repli sur gzip
+    brotli = None
+
+
+def route_template(scope: Scope) -> str:
+    """Retourne le chemin déclaré de la route traitée (ex: /api/v1/arcades/{arcade_id}).
+
+    Le routeur renseigne ``scope["endpoint"]`` ; la correspondance endpoint -> chemin
+    est construite une seule fois par application.
+    """
+    endpoint = scope.get("endpoint")
+    app = scope.get("app")
+    if endpoint is None or app is None:
+        return "unmatched"
+
+    templates: Optional[Dict] = getattr(app.state, "route_templates", None)
+    if templates is None or endpoint not in templates:
+        templates = {
+            route.endpoint: route.path
+            for route in app.routes
+            if hasattr(route, "endpoint")
+        }
+        app.state.route_templates = templates
+
+    return templates.get(endpoint, "unmatched")
+
+
+class QueryStatsMiddleware:
+    """Compte les requêtes SQL et le temps passé en base pour chaque requête HTTP.
+
+    En mode DEBUG, les compteurs sont renvoyés dans les en-têtes
+    ``X-DB-Query-Count`` et ``X-DB-Query-Time-Ms``. Dans tous les cas, ils sont
+    cumulés par route et les instructions répétées (N+1) sont journalisées.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+            async def send_with_stats(message: Message) -> None:
+                if message["type"] == "http.response.start" and settings.DEBUG:
+                    headers = MutableHeaders(scope=message)
+                    headers.append("X-DB-Query-Count", str(stats.count))
+                    headers.append("X-DB-Query-Time-Ms", f"{stats.duration * 1000:.2f}")
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_stats)
+            finally:
+                stats.route = route_template(scope)
+                record_request(stats)
+
+
+class MetricsMiddleware:
+    """Mesure la durée des requêtes HTTP par route, méthode et statut.
+
+    Le travail par requête se limite à deux lectures d'horloge et à l'écriture
+    dans le fragment de métriques du thread courant (aucun verrou).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+        http_requests_in_flight.inc()
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_requests_in_flight.dec()
+            http_request_duration.observe(
+                time.perf_counter() - start,
+                route_template(scope),
+                scope["method"],
+                str(status_code)
+            )
+
+
+class ProfilingMiddleware:
+    """Profilage échantillonné d'une requête, demandé par un administrateur.
+
+    Activé par l'en-tête ``X-Profile: 1`` (ou le paramètre ``?profile=1``)
+    accompagné d'un token admin valide dans ``X-Profile-Token`` ; sinon la
+    requête est servie normalement. ``Authorization`` reste celui de la route
+    profilée : une route utilisateur se profile avec un token utilisateur. Le profil est conservé en mémoire et son identifiant renvoyé
+    dans l'en-tête ``X-Profile-Id`` (voir ``GET /api/v1/admin/profiles``).
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    @staticmethod
+    def _requested(scope: Scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                return value in (b"1", b"true")
+        query = scope.get("query_string", b"")
+        return b"profile=" in query and any(
+            part in (b"profile=1", b"profile=true") for part in query.split(b"&")
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.PROFILING_ENABLED or not self._requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        # Import local : les dépendances d'authentification importent les modèles
+        from app.api.deps import admin_from_profile_token
+        # Vérification Firebase bloquante (appel réseau) : hors de la boucle d'événements
+        admin = await run_in_threadpool(admin_from_profile_token, Headers(scope=scope).get("x-profile-token"))
+        if admin is None:
+            await self.app(scope, receive, send)
+            return
+
+        profiler = profiling.RequestProfiler()
+        # Les en-têtes partent avant la fin du profil : l'identifiant est fixé dès le début
+        profile_id = profiling.new_profile_id()
+        status_code = 500
+
+        async def send_with_profile_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message).append("X-Profile-Id", profile_id)
+            await send(message)
+
+        token = profiling.activate(profiler)
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_with_profile_id)
+        finally:
+            profiler.stop()
+            profiling.deactivate(token)
+            profiling.profile_store.add(profiler.report(
+                id=profile_id,
+                route=route_template(scope),
+                method=scope["method"],
+                path=scope["path"],
+                status=status_code
+            ))
+
+
+def match_route_template(scope: Scope) -> Optional[str]:
+    """Chemin déclaré de la route qui traitera la requête, avant le passage dans le routeur."""
+    app = scope.get("app")
+    if app is None:
+        return None
+    for route in app.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", None)
+    return None
+
+
+def _credential_key(credential: str) -> str:
+    # Empreinte courte : les tokens complets occuperaient trop de mémoire dans les seaux
+    return hashlib.sha256(credential.encode()).hexdigest()[:32]
+
+
+class RateLimitMiddleware:
+    """Limitation de débit et délestage, avec priorité aux bornes.
+
+    - Seaux à jetons par utilisateur (token), par clé API de borne valide et,
+      hors bornes, par route (``RATE_LIMIT_ROUTES``) : 429. Une clé API
+      invalide est ignorée. Avec ``RATE_LIMIT_BY_ADDRESS``, aussi par client
+      anonyme et en plafond des tokens, par adresse IP.
+    - Délestage : au-delà de ``max_concurrency - LOAD_SHED_KIOSK_RESERVED``
+      requêtes en cours, ou si le pool de connexions est saturé, les requêtes
+      non prioritaires reçoivent un 503. Les requêtes authentifiées par une clé
+      de borne valide peuvent utiliser la capacité réservée.
+
+    Les deux réponses portent un en-tête ``Retry-After``.
+    """
+
+    EXEMPT_PATHS = frozenset({"/health", "/health/ready", "/metrics"})
+
+    def __init__(self, app: ASGIApp, pool_saturation: Optional[Callable[[], float]] = None,
+                 limiter: Optional[RateLimiter] = None, concurrency: Optional[ConcurrencyLimiter] = None):
+        self.app = app
+        self.pool_saturation = pool_saturation
+        self.limiter = limiter or rate_limiter
+        self.concurrency = concurrency or concurrency_limiter
+        self._route_limits_source: Optional[str] = None
+        self._route_limits: Dict[str, Tuple[float, float]] = {}
+
+    def _route_limit(self, route: Optional[str]) -> Optional[Tuple[float, float]]:
+        if self._route_limits_source != settings.RATE_LIMIT_ROUTES:
+            self._route_limits = parse_route_limits(settings.RATE_LIMIT_ROUTES)
+            self._route_limits_source = settings.RATE_LIMIT_ROUTES
+        return self._route_limits.get(route) if route else None
+
+    def _rate_limit_delay(self, scope: Scope, headers: Headers, kiosk: bool) -> float:
+        # Adresse réelle seulement si uvicorn fait confiance au proxy (FORWARDED_ALLOW_IPS)
+        client = scope.get("client") if settings.RATE_LIMIT_BY_ADDRESS else None
+        authorization = headers.get("authorization")
+        delay = 0.0
+        if kiosk:
+            # Seau partagé réservé aux clés vérifiées : une clé inventée n'ouvre pas de seau
+            delay = self.limiter.check("api_key", _credential_key(headers["x-api-key"]),
+                                       settings.RATE_LIMIT_API_KEY_PER_SECOND, settings.RATE_LIMIT_API_KEY_BURST)
+        elif authorization:
+            delay = self.limiter.check("user", _credential_key(authorization),
+                                       settings.RATE_LIMIT_USER_PER_SECOND, settings.RATE_LIMIT_USER_BURST)
+            if not delay and client:
+                # Le token n'est pas vérifié ici : plafond par adresse contre les tokens changeants
+                delay = self.limiter.check("address", client[0],
+                                           settings.RATE_LIMIT_ADDRESS_PER_SECOND,
+                                           settings.RATE_LIMIT_ADDRESS_BURST)
+        elif client:
+            delay = self.limiter.check("client", client[0],
+                                       settings.RATE_LIMIT_ANONYMOUS_PER_SECOND,
+                                       settings.RATE_LIMIT_ANONYMOUS_BURST)
+        if delay or kiosk:
+            return delay
+
+        route = match_route_template(scope)
+        route_limit = self._route_limit(route)
+        if route_limit is None:
+            return 0.0
+        return self.limiter.check("route", route, *route_limit)
+
+    @staticmethod
+    async def _reject(scope: Scope, receive: Receive, send: Send, status_code: int, detail: str,
+                      delay: float, reason: str) -> None:
+        http_requests_rejected.inc(reason)
+        response = JSONResponse(
+            {"detail": detail},
+            status_code=status_code,
+            headers={"Retry-After": retry_after_header(delay)}
+        )
+        await response(scope, receive, send)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # Requêtes préliminaires CORS : pas de jetons ni de place en file pour elles
+        if scope["type"] != "http" or not settings.RATE_LIMIT_ENABLED or scope["path"] in self.EXEMPT_PATHS \
+                or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        api_key = headers.get("x-api-key")
+        kiosk = bool(api_key) and verify_arcade_api_key(api_key)
+
+        delay = self._rate_limit_delay(scope, headers, kiosk)
+        if delay:
+            await self._reject(scope, receive, send, 429, "Trop de requêtes, réessayez plus tard", delay,
+                               "rate_limited")
+            return
+
+        if not kiosk and self.pool_saturation is not None \
+                and self.pool_saturation() >= settings.DB_POOL_SATURATION_THRESHOLD:
+            await self._reject(scope, receive, send, 503, "Service surchargé, réessayez plus tard",
+                               settings.LOAD_SHED_RETRY_AFTER_SECONDS, "pool_saturated")
+            return
+
+        if not self.concurrency.acquire(priority=kiosk):
+            await self._reject(scope, receive, send, 503, "Service surchargé, réessayez plus tard",
+                               settings.LOAD_SHED_RETRY_AFTER_SECONDS, "shed")
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.concurrency.release()
+
+
+# Types de contenu compressibles (préfixes)
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "image/svg+xml")
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Choisit ``br`` ou ``gzip`` selon les qualités (q) de l'en-tête Accept-Encoding.
+
+    La préférence du serveur (brotli) ne départage que les qualités égales.
+    """
+    accepted = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token.strip().lower()] = quality
+
+    # Qualité la plus haute d'abord ; à égalité, brotli (meilleur taux) avant gzip
+    candidates = [encoding for encoding in ("br", "gzip") if encoding != "br" or brotli is not None]
+    qualities = {encoding: accepted.get(encoding, accepted.get("*", 0.0)) for encoding in candidates}
+    best = max(candidates, key=lambda encoding: qualities[encoding])
+    return best if qualities[best] > 0 else None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class CompressedBodyCache:
+    """Corps déjà compressés, indexés par empreinte du contenu et encodage (LRU borné en octets)."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[bytes, str], bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get_or_compress(self, body: bytes, encoding: str) -> bytes:
+        key = (hashlib.sha256(body).digest(), encoding)
+        with self._lock:
+            compressed = self._entries.get(key)
+            if compressed is not None:
+                self._entries.move_to_end(key)
+                compression_cache_requests.inc("hit")
+                return compressed
+
+        compression_cache_requests.inc("miss")
+        compressed = compress(body, encoding)
+        if len(compressed) > self.max_bytes:
+            return compressed
+
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = compressed
+                self._size += len(compressed)
+                while self._size > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        return compressed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+
+class CompressionMiddleware:
+    """Compression gzip/brotli des réponses au-delà d'une taille minimale.
+
+    Les réponses des routes de catalogue (``cacheable_routes``) sont conservées
+    compressées en mémoire, indexées par l'empreinte de leur contenu : un corps
+    identique n'est compressé qu'une fois. Les réponses en flux (plusieurs
+    morceaux) sont transmises telles quelles.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: Optional[int] = None,
+                 cacheable_routes: Iterable[str] = (), cache: Optional[CompressedBodyCache] = None):
+        self.app = app
+        self.minimum_size = minimum_size if minimum_size is not None else settings.COMPRESSION_MIN_SIZE
+        self.cacheable_routes = frozenset(cacheable_routes)
+        self.cache = cache or CompressedBodyCache(settings.COMPRESSION_CACHE_MAX_BYTES)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message: Optional[Message] = None
+        passthrough = False
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message, passthrough
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if message["type"] != "http.response.body" or passthrough:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(scope=start_message)
+            if message.get("more_body", False) or not self._compressible(start_message["status"], headers):
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            headers.add_vary_header("Accept-Encoding")
+            if len(body) >= self.minimum_size:
+                if route_template(scope) in self.cacheable_routes:
+                    body = self.cache.get_or_compress(body, encoding)
+                else:
+                    body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+
+            passthrough = True
+            await send(start_message)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _compressible(status_code: int, headers: MutableHeaders) -> bool:
+        if status_code < 200 or status_code in (204, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return content_type.startswith(COMPRESSIBLE_TYPES)
@@ -1,19 +1,56 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy import func
 from typing import List, Optional
 
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, SessionReleasingRoute
 from app.models.user import User
 from app.models.arcade import Arcade, ArcadeGame
 from app.models.game import Game
 from app.models.promo import PromoCode
 from app.models.ticket import TicketOffer
 from app.api.deps import get_current_admin
+from app.core.profiling import profile_store
+from app.core.slow_queries import slow_query_log
+from app.core.query_cache import query_cache
+from app.core.batch_loader import batch_loader
+from app.services.friend_service import publish_friendship_change
+from app.utils.helpers import parse_fields, required_columns
 from pydantic import BaseModel
 from datetime import datetime, timezone, timedelta
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
+
+FIELDS_QUERY_DESCRIPTION = "Champs à renvoyer, séparés par des virgules"
+
+# Champs de la liste des codes promo et leur calcul
+PROMO_CODE_FIELDS = {
+    "id": lambda promo: promo.id,
+    "code": lambda promo: promo.code,
+    "tickets_reward": lambda promo: promo.tickets_reward,
+    "usage_limit": lambda promo: promo.usage_limit,
+    "current_uses": lambda promo: promo.current_uses,
+    "is_single_use_global": lambda promo: promo.is_single_use_global,
+    "is_single_use_per_user": lambda promo: promo.is_single_use_per_user,
+    "valid_from": lambda promo: promo.valid_from.isoformat() if promo.valid_from else None,
+    "valid_until": lambda promo: promo.valid_until.isoformat() if promo.valid_until else None,
+    "is_active": lambda promo: promo.is_active,
+    "is_valid_now": lambda promo: promo.is_valid_now(),
+    "is_expired": lambda promo: promo.is_expired(),
+    "days_until_expiry": lambda promo: promo.days_until_expiry(),
+    "created_at": lambda promo: promo.created_at.isoformat(),
+}
+
+# Colonnes lues par les champs calculés
+PROMO_CODE_FIELD_DEPENDENCIES = {
+    "is_valid_now": ("is_active", "is_deleted", "valid_from", "valid_until"),
+    "is_expired": ("valid_until",),
+    "days_until_expiry": ("valid_until",),
+}
+
+
+def _model_columns(model) -> list:
+    return [column.key for column in model.__table__.columns]
 
 
 class CreateArcadeRequest(BaseModel):
@@ -261,12 +298,18 @@ async def update_promo_code(
 @router.get("/promo-codes/")
 async def list_promo_codes(
         include_expired: bool = False,
+        fields: Optional[str] = Query(None, description=FIELDS_QUERY_DESCRIPTION),
         db: Session = Depends(get_db),
         _: dict = Depends(get_current_admin)
 ):
     """Liste tous les codes promo avec filtrage optionnel."""
 
-    query = db.query(PromoCode).filter(PromoCode.is_deleted == False)
+    output_fields = parse_fields(fields, PROMO_CODE_FIELDS) or list(PROMO_CODE_FIELDS)
+    columns = required_columns(output_fields, PROMO_CODE_FIELD_DEPENDENCIES)
+
+    query = db.query(PromoCode).options(
+        load_only(*(getattr(PromoCode, column) for column in columns))
+    ).filter(PromoCode.is_deleted == False)
 
     if not include_expired:
         now = datetime.now(timezone.utc)
@@ -278,22 +321,7 @@ async def list_promo_codes(
 
     result = []
     for promo in promo_codes:
-        result.append({
-            "id": promo.id,
-            "code": promo.code,
-            "tickets_reward": promo.tickets_reward,
-            "usage_limit": promo.usage_limit,
-            "current_uses": promo.current_uses,
-            "is_single_use_global": promo.is_single_use_global,
-            "is_single_use_per_user": promo.is_single_use_per_user,
-            "valid_from": promo.valid_from.isoformat() if promo.valid_from else None,
-            "valid_until": promo.valid_until.isoformat() if promo.valid_until else None,
-            "is_active": promo.is_active,
-            "is_valid_now": promo.is_valid_now(),
-            "is_expired": promo.is_expired(),
-            "days_until_expiry": promo.days_until_expiry(),
-            "created_at": promo.created_at.isoformat()
-        })
+        result.append({field: PROMO_CODE_FIELDS[field](promo) for field in output_fields})
 
     return result
 
@@ -404,11 +432,19 @@ async def update_user_tickets(
 
 @router.get("/users/deleted")
 async def list_deleted_users(
+        fields: Optional[str] = Query(None, description=FIELDS_QUERY_DESCRIPTION),
         db: Session = Depends(get_db),
         _: dict = Depends(get_current_admin)
 ):
     """Liste les utilisateurs supprimés (soft delete)."""
 
+    selected_fields = parse_fields(fields, _model_columns(User))
+    if selected_fields:
+        rows = db.query(*(getattr(User, field) for field in selected_fields)).filter(
+            User.is_deleted == True
+        ).all()
+        return [dict(row._mapping) for row in rows]
+
     deleted_users = db.query(User).filter(
         User.is_deleted == True
     ).all()
@@ -522,6 +558,7 @@ async def soft_delete_user(
         purchase.deleted_at = datetime.now(timezone.utc)
         deleted_purchases += 1
 
+    publish_friendship_change(db, "remove_user", user_id)
     db.commit()
 
     return {
@@ -689,7 +726,7 @@ async def force_cancel_user_reservations(
 # === STATISTIQUES ===
 @router.get("/stats")
 async def get_admin_stats(
-        db: Session = Depends(get_db),
+        db: Session = Depends(get_read_db),
         _: dict = Depends(get_current_admin)
 ):
     """Récupère les statistiques globales de la plateforme."""
@@ -781,11 +818,19 @@ async def soft_delete_arcade(
 
 @router.get("/arcades/deleted")
 async def list_deleted_arcades(
+        fields: Optional[str] = Query(None, description=FIELDS_QUERY_DESCRIPTION),
         db: Session = Depends(get_db),
         _: dict = Depends(get_current_admin)
 ):
     """Liste les bornes d'arcade supprimées (soft delete)."""
 
+    selected_fields = parse_fields(fields, _model_columns(Arcade))
+    if selected_fields:
+        rows = db.query(*(getattr(Arcade, field) for field in selected_fields)).filter(
+            Arcade.is_deleted == True
+        ).order_by(Arcade.deleted_at.desc()).all()
+        return [dict(row._mapping) for row in rows]
+
     deleted_arcades = db.query(Arcade).filter(
         Arcade.is_deleted == True
     ).order_by(Arcade.deleted_at.desc()).all()
@@ -839,26 +884,30 @@ async def restore_arcade(
         ArcadeGame.is_deleted == True
     ).all()
 
+    # Jeux et emplacements occupés lus en une requête chacun, pas une par association
+    loader = batch_loader(db)
+    loader.prime(Game, (ag.game_id for ag in arcade_games))
+    occupied_slots = {
+        slot_number for slot_number, in db.query(ArcadeGame.slot_number).filter(
+            ArcadeGame.arcade_id == arcade_id,
+            ArcadeGame.is_deleted == False
+        ).all()
+    }
+
     restored_associations = 0
     for ag in arcade_games:
         # Vérifier que le jeu existe toujours
-        game_exists = db.query(Game).filter(
-            Game.id == ag.game_id,
-            Game.is_deleted == False
-        ).first()
+        game = loader.get(Game, ag.game_id)
+        game_exists = game is not None and not game.is_deleted
 
         if game_exists:
-            # Vérifier qu'il n'y a pas de conflit de slot
-            slot_conflict = db.query(ArcadeGame).filter(
-                ArcadeGame.arcade_id == arcade_id,
-                ArcadeGame.slot_number == ag.slot_number,
-                ArcadeGame.is_deleted == False,
-                ArcadeGame.id != ag.id
-            ).first()
+            # Vérifier qu'il n'y a pas de conflit de slot (y compris avec une association déjà restaurée)
+            slot_conflict = ag.slot_number in occupied_slots
 
             if not slot_conflict:
                 ag.is_deleted = False
                 ag.deleted_at = None
+                occupied_slots.add(ag.slot_number)
                 restored_associations += 1
 
     db.commit()
@@ -907,4 +956,63 @@ async def regenerate_arcade_api_key(
         "arcade_id": arcade.id,
         "old_api_key": old_api_key[:20] + "...",  # Masquer partiellement
         "new_api_key": new_api_key
-    }
\ No newline at end of file
+    }
+
+
+# === DIAGNOSTIC ===
+@router.get("/profiles")
+async def list_profiles(
+        _: dict = Depends(get_current_admin)
+):
+    """Profils de requêtes capturés par ce worker, du plus récent au plus ancien (sans arbre d'appels).
+
+    Une requête est profilée lorsqu'elle porte l'en-tête ``X-Profile: 1`` (ou
+    ``?profile=1``) et un token admin ; son identifiant est renvoyé dans ``X-Profile-Id``.
+    """
+    return profile_store.summaries()
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+        profile_id: str,
+        _: dict = Depends(get_current_admin)
+):
+    """Profil complet d'une requête : temps SQL et arbre d'appels échantillonné."""
+
+    profile = profile_store.get(profile_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profil non trouvé"
+        )
+    return profile
+
+
+@router.get("/slow-queries")
+async def list_slow_queries(
+        route: Optional[str] = Query(None, description="Filtrer par route (ex: /api/v1/scores/)"),
+        limit: int = Query(50, ge=1, le=500),
+        _: dict = Depends(get_current_admin)
+):
+    """Requêtes SQL lentes de ce worker, de la plus récente à la plus ancienne.
+
+    Chaque entrée porte la route qui l'a émise, ses paramètres masqués et, si
+    ``SLOW_QUERY_EXPLAIN`` est activé, son plan d'exécution.
+    """
+    return [entry.to_dict() for entry in slow_query_log.entries(route)[:limit]]
+
+
+@router.get("/slow-queries/summary")
+async def get_slow_queries_summary(
+        _: dict = Depends(get_current_admin)
+):
+    """Requêtes lentes regroupées par instruction, triées par temps cumulé."""
+    return slow_query_log.summary()
+
+
+@router.get("/query-cache")
+async def get_query_cache_stats(
+        _: dict = Depends(get_current_admin)
+):
+    """Taille du cache de requêtes et taux de succès par requête (depuis le démarrage du worker)."""
+    return query_cache.stats()
@@ -1,18 +1,22 @@
 # Correction du fichier app/api/v1/arcades.py
 # Ajout des IDs des joueurs dans la réponse de la file d'attente
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, SessionReleasingRoute
+from app.core.coalescing import singleflight
+from app.core.query_cache import query_cache
+from app.core.batch_loader import batch_loader
 from app.models.arcade import Arcade, ArcadeGame
 from app.models.game import Game
 from app.models.reservation import Reservation, ReservationStatus
 from app.models.user import User
 from app.api.deps import verify_arcade_key, get_current_user
+from app.utils.helpers import parse_fields, sparse_response
 from pydantic import BaseModel
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
 
 
 class GameOnArcadeResponse(BaseModel):
@@ -57,18 +61,87 @@ class QueueItemResponse(BaseModel):
 
 
 @router.get("/", response_model=List[ArcadeResponse])
-async def get_arcades(
+@singleflight()
+def get_arcades(
+        fields: Optional[str] = Query(None, description="Champs à renvoyer, séparés par des virgules"),
+        db: Session = Depends(get_read_db)
+):
+    """Récupère la liste de toutes les bornes d'arcade.
+
+    ``fields=`` restreint la réponse et les colonnes lues ; sans ``games``, les
+    jeux installés ne sont pas chargés (ex: ``fields=id,nom,latitude,longitude``).
+    """
+
+    selected_fields = parse_fields(fields, ArcadeResponse.model_fields)
+    output_fields = selected_fields or list(ArcadeResponse.model_fields)
+
+    def load():
+        # L'identifiant sert à rattacher les jeux même s'il n'est pas demandé
+        columns = [getattr(Arcade, field) for field in output_fields if field != "games"]
+        if "id" not in output_fields:
+            columns.insert(0, Arcade.id)
+
+        arcades = db.query(*columns).filter(
+            Arcade.is_deleted == False
+        ).all()
+
+        # Enrichir avec les jeux : une seule requête pour toutes les bornes
+        games_by_arcade = {}
+        if "games" in output_fields and arcades:
+            arcade_games = db.query(ArcadeGame.arcade_id, ArcadeGame.slot_number, Game).join(
+                Game, ArcadeGame.game_id == Game.id
+            ).filter(
+                ArcadeGame.arcade_id.in_([arcade.id for arcade in arcades]),
+                ArcadeGame.is_deleted == False,
+                Game.is_deleted == False
+            ).order_by(ArcadeGame.arcade_id, ArcadeGame.slot_number).all()
+
+            for arcade_id, slot_number, game in arcade_games:
+                games_by_arcade.setdefault(arcade_id, []).append(GameOnArcadeResponse(
+                    id=game.id,
+                    nom=game.nom,
+                    description=game.description,
+                    min_players=game.min_players,
+                    max_players=game.max_players,
+                    ticket_cost=game.ticket_cost,
+                    slot_number=slot_number
+                ))
+
+        result = []
+        for arcade in arcades:
+            arcade_data = {
+                field: games_by_arcade.get(arcade.id, []) if field == "games" else getattr(arcade, field)
+                for field in output_fields
+            }
+            result.append(arcade_data)
+        return result
+
+    result = query_cache.get_or_load(
+        "arcades.list", {"fields": output_fields}, ("arcades", "arcade_games", "games"), load, db=db
+    )
+
+    if selected_fields:
+        return sparse_response(result, selected_fields)
+    return [ArcadeResponse(**arcade_data) for arcade_data in result]
+
+
+@router.get("/{arcade_id}", response_model=ArcadeResponse)
+async def get_arcade(
+        arcade_id: int,
         db: Session = Depends(get_db)
 ):
-    """Récupère la liste de toutes les bornes d'arcade."""
+    """Récupère les détails d'une borne d'arcade spécifique."""
 
-    arcades = db.query(Arcade).filter(
-        Arcade.is_deleted == False
-    ).all()
+    def load():
+        arcade = db.query(Arcade).filter(
+            Arcade.id == arcade_id,
+            Arcade.is_deleted == False
+        ).first()
 
-    # Enrichir avec les jeux
-    result = []
-    for arcade in arcades:
+        if not arcade:
+            return None
+
+        # Récupérer les jeux de cette borne
         arcade_games = db.query(ArcadeGame, Game).join(
             Game, ArcadeGame.game_id == Game.id
         ).filter(
@@ -90,7 +163,7 @@ async def get_arcades(
             )
             games.append(game_data)
 
-        arcade_data = ArcadeResponse(
+        return ArcadeResponse(
             id=arcade.id,
             nom=arcade.nom,
             description=arcade.description,
@@ -99,22 +172,10 @@ async def get_arcades(
             longitude=arcade.longitude,
             games=games
         )
-        result.append(arcade_data)
-
-    return result
-
-
-@router.get("/{arcade_id}", response_model=ArcadeResponse)
-async def get_arcade(
-        arcade_id: int,
-        db: Session = Depends(get_db)
-):
-    """Récupère les détails d'une borne d'arcade spécifique."""
 
-    arcade = db.query(Arcade).filter(
-        Arcade.id == arcade_id,
-        Arcade.is_deleted == False
-    ).first()
+    arcade = query_cache.get_or_load(
+        "arcades.detail", {"arcade_id": arcade_id}, ("arcades", "arcade_games", "games"), load
+    )
 
     if not arcade:
         raise HTTPException(
@@ -122,37 +183,7 @@ async def get_arcade(
             detail="Borne d'arcade non trouvée"
         )
 
-    # Récupérer les jeux de cette borne
-    arcade_games = db.query(ArcadeGame, Game).join(
-        Game, ArcadeGame.game_id == Game.id
-    ).filter(
-        ArcadeGame.arcade_id == arcade.id,
-        ArcadeGame.is_deleted == False,
-        Game.is_deleted == False
-    ).all()
-
-    games = []
-    for arcade_game, game in arcade_games:
-        game_data = GameOnArcadeResponse(
-            id=game.id,
-            nom=game.nom,
-            description=game.description,
-            min_players=game.min_players,
-            max_players=game.max_players,
-            ticket_cost=game.ticket_cost,
-            slot_number=arcade_game.slot_number
-        )
-        games.append(game_data)
-
-    return ArcadeResponse(
-        id=arcade.id,
-        nom=arcade.nom,
-        description=arcade.description,
-        localisation=arcade.localisation,
-        latitude=arcade.latitude,
-        longitude=arcade.longitude,
-        games=games
-    )
+    return arcade
 
 
 @router.get("/{arcade_id}/queue", response_model=List[QueueItemResponse])
@@ -186,25 +217,30 @@ async def get_arcade_queue(
         Reservation.is_deleted == False
     ).order_by(Reservation.created_at).all()
 
+    # Joueurs et jeux chargés en une requête par type, pas une par réservation
+    loader = batch_loader(db)
+    loader.prime(User, (reservation.player_id for reservation in reservations))
+    loader.prime(User, (reservation.player2_id for reservation in reservations))
+    loader.prime(Game, (reservation.game_id for reservation in reservations))
+
     queue = []
     for i, reservation in enumerate(reservations):
         # Récupérer le joueur 2 si présent
         player2_id = None
         player2_pseudo = None
-        if reservation.player2_id:
-            player2 = db.query(User).filter(User.id == reservation.player2_id).first()
-            if player2:
-                player2_id = player2.id
-                player2_pseudo = player2.pseudo
+        player2 = loader.get(User, reservation.player2_id)
+        if player2:
+            player2_id = player2.id
+            player2_pseudo = player2.pseudo
 
         queue_item = QueueItemResponse(
             id=reservation.id,
             player_id=reservation.player_id,  # ID du joueur principal
-            player_pseudo=reservation.player.pseudo,
+            player_pseudo=loader.get(User, reservation.player_id).pseudo,
             player2_id=player2_id,  # ID du joueur 2 (optionnel)
             player2_pseudo=player2_pseudo,
             game_id=reservation.game_id,  # ID du jeu
-            game_name=reservation.game.nom,
+            game_name=loader.get(Game, reservation.game_id).nom,
             unlock_code=reservation.unlock_code,
             position=i + 1
         )
@@ -1,11 +1,48 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from sqlalchemy import or_, and_
+from sqlalchemy.exc import IntegrityError
+from app.core.database import get_db, SessionReleasingRoute
 from app.models.user import User
 from app.schemas.user import UserCreate, UserResponse
 from app.api.deps import get_current_user
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
+
+
+# Colonnes uniques des utilisateurs et message renvoyé en cas de conflit
+UNIQUE_FIELD_MESSAGES = {
+    "pseudo": "Ce pseudo est déjà utilisé",
+    "numero_telephone": "Ce numéro de téléphone est déjà utilisé",
+    "email": "Cet email est déjà utilisé",
+    "firebase_uid": "Utilisateur déjà enregistré",
+}
+
+
+def _unique_violation_detail(error: IntegrityError) -> str:
+    """Message correspondant à la contrainte d'unicité violée (SQLite et PostgreSQL nomment la colonne)."""
+    message = str(error.orig)
+    for field, detail in UNIQUE_FIELD_MESSAGES.items():
+        if field in message:
+            return detail
+    return "Utilisateur déjà enregistré"
+
+
+def _commit_user(db: Session, user: User) -> UserResponse:
+    """Écrit l'utilisateur et construit la réponse avant le commit (pas de relecture)."""
+    try:
+        # L'INSERT récupère id et horodatages via RETURNING
+        db.flush()
+        response = UserResponse.model_validate(user)
+        db.commit()
+    except IntegrityError as error:
+        # Inscription concurrente : la contrainte d'unicité est le garde-fou final
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=_unique_violation_detail(error)
+        )
+    return response
 
 
 @router.post("/register", response_model=UserResponse)
@@ -15,10 +52,21 @@ async def register_user(
 ):
     """Enregistre un nouvel utilisateur après vérification Firebase."""
 
-    # Vérifier si l'utilisateur existe déjà
-    existing_user = db.query(User).filter(
-        User.firebase_uid == user_data.firebase_uid
-    ).first()
+    # Une seule requête pour l'utilisateur existant et les conflits de pseudo / téléphone
+    candidates = db.query(User).filter(
+        or_(
+            User.firebase_uid == user_data.firebase_uid,
+            and_(
+                or_(
+                    User.pseudo == user_data.pseudo,
+                    User.numero_telephone == user_data.numero_telephone
+                ),
+                User.is_deleted == False
+            )
+        )
+    ).all()
+
+    existing_user = next((user for user in candidates if user.firebase_uid == user_data.firebase_uid), None)
 
     if existing_user:
         if existing_user.is_deleted:
@@ -28,9 +76,7 @@ async def register_user(
             # Mettre à jour les données
             for field, value in user_data.dict(exclude={"firebase_uid"}).items():
                 setattr(existing_user, field, value)
-            db.commit()
-            db.refresh(existing_user)
-            return existing_user
+            return _commit_user(db, existing_user)
         else:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
@@ -38,25 +84,23 @@ async def register_user(
             )
 
     # Vérifier l'unicité du pseudo et téléphone
-    if db.query(User).filter(User.pseudo == user_data.pseudo, User.is_deleted == False).first():
+    if any(user.pseudo == user_data.pseudo for user in candidates):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Ce pseudo est déjà utilisé"
+            detail=UNIQUE_FIELD_MESSAGES["pseudo"]
         )
 
-    if db.query(User).filter(User.numero_telephone == user_data.numero_telephone, User.is_deleted == False).first():
+    if any(user.numero_telephone == user_data.numero_telephone for user in candidates):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Ce numéro de téléphone est déjà utilisé"
+            detail=UNIQUE_FIELD_MESSAGES["numero_telephone"]
         )
 
     # Créer le nouvel utilisateur
     user = User(**user_data.dict())
     db.add(user)
-    db.commit()
-    db.refresh(user)
 
-    return user
+    return _commit_user(db, user)
 
 
 @router.get("/me", response_model=UserResponse)
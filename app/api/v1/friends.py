@@ -1,57 +1,203 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, and_
-from typing import List
-from app.core.database import get_db
+from sqlalchemy import or_, and_, select, union, union_all
+from typing import List, Optional
+from app.core.database import get_db, get_read_db, SessionReleasingRoute
 from app.models.user import User
 from app.models.friend import Friendship, FriendshipStatus
 from app.schemas.user import UserSearchResponse
+from app.schemas.friend import FriendshipResponse
 from app.api.deps import get_current_user
-from pydantic import BaseModel
+from app.services.friend_service import friend_graph, pending_friend_requests, publish_friendship_change
+from pydantic import BaseModel, validator
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
+
+MAX_STATUS_LOOKUP_IDS = 500
 
 
 class FriendRequestCreate(BaseModel):
     user_id: int
 
 
-class FriendshipResponse(BaseModel):
-    id: int
-    status: FriendshipStatus
-    requester: UserSearchResponse
-    requested: UserSearchResponse
+class FriendshipStatusRequest(BaseModel):
+    user_ids: List[int]
+
+    @validator('user_ids')
+    def validate_user_ids(cls, v):
+        if not v:
+            raise ValueError('At least one user id is required')
+        if len(v) > MAX_STATUS_LOOKUP_IDS:
+            raise ValueError(f'Maximum {MAX_STATUS_LOOKUP_IDS} user ids can be looked up at once')
+        return v
+
 
-    class Config:
-        from_attributes = True
+class FriendshipStatusItem(BaseModel):
+    user_id: int
+    # "friend", "pending_sent", "pending_received", "none" ou "self"
+    status: str
+
+
+class FriendSuggestionResponse(BaseModel):
+    id: int
+    pseudo: str
+    nom: str
+    prenom: str
+    mutual_friends: int
 
 
 @router.get("/", response_model=List[UserSearchResponse])
 async def get_my_friends(
-        db: Session = Depends(get_db),
+        response: Response,
+        cursor: Optional[int] = Query(None, description="Identifiant du dernier ami de la page précédente"),
+        limit: int = Query(100, ge=1, le=500),
+        pseudo_prefix: Optional[str] = Query(None, min_length=1, description="Filtrer par début de pseudo"),
+        db: Session = Depends(get_read_db),
         current_user: User = Depends(get_current_user)
 ):
-    """Récupère la liste des amis acceptés."""
+    """Récupère la liste des amis acceptés (pagination par curseur).
 
-    friendships = db.query(Friendship).filter(
-        and_(
-            or_(
-                Friendship.requester_id == current_user.id,
-                Friendship.requested_id == current_user.id
-            ),
+    Les deux sens de la relation sont réunis par un UNION puis joints à
+    ``users`` : une seule requête, quel que soit le nombre d'amis. Lorsqu'une
+    page suivante existe, son curseur est renvoyé dans l'en-tête ``X-Next-Cursor``.
+    """
+
+    friend_ids = union(
+        select(Friendship.requested_id.label("friend_id")).where(
+            Friendship.requester_id == current_user.id,
+            Friendship.status == FriendshipStatus.ACCEPTED,
+            Friendship.is_deleted == False
+        ),
+        select(Friendship.requester_id.label("friend_id")).where(
+            Friendship.requested_id == current_user.id,
             Friendship.status == FriendshipStatus.ACCEPTED,
             Friendship.is_deleted == False
         )
-    ).all()
+    ).subquery()
+
+    query = db.query(User.id, User.pseudo, User.nom, User.prenom).join(
+        friend_ids, User.id == friend_ids.c.friend_id
+    ).filter(
+        User.is_deleted == False
+    )
+
+    if cursor is not None:
+        query = query.filter(User.id > cursor)
 
-    friends = []
-    for friendship in friendships:
-        friend = friendship.requested if friendship.requester_id == current_user.id else friendship.requester
-        friends.append(friend)
+    if pseudo_prefix:
+        query = query.filter(User.pseudo.istartswith(pseudo_prefix, autoescape=True))
+
+    # Une ligne de plus pour savoir s'il existe une page suivante
+    friends = query.order_by(User.id).limit(limit + 1).all()
+
+    if len(friends) > limit:
+        friends = friends[:limit]
+        response.headers["X-Next-Cursor"] = str(friends[-1].id)
 
     return friends
 
 
+@router.get("/suggestions", response_model=List[FriendSuggestionResponse])
+async def get_friend_suggestions(
+        limit: int = Query(10, ge=1, le=50),
+        db: Session = Depends(get_read_db),
+        current_user: User = Depends(get_current_user)
+):
+    """Suggère des amis d'amis, classés par nombre d'amis en commun.
+
+    Le classement se fait sur le graphe d'amitiés en mémoire ; seules les
+    demandes en attente et les profils des candidats retenus sont lus en base.
+    """
+
+    friend_graph.ensure_loaded(db)
+
+    # Les utilisateurs avec une demande en attente (dans un sens ou l'autre) sont écartés
+    pending = db.query(Friendship.requester_id, Friendship.requested_id).filter(
+        or_(
+            Friendship.requester_id == current_user.id,
+            Friendship.requested_id == current_user.id
+        ),
+        Friendship.status == FriendshipStatus.PENDING,
+        Friendship.is_deleted == False
+    ).all()
+    pending_ids = {user_id for row in pending for user_id in row}
+
+    ranked = friend_graph.suggestions(current_user.id, limit, exclude=pending_ids)
+    if not ranked:
+        return []
+
+    users = {
+        user.id: user
+        for user in db.query(User.id, User.pseudo, User.nom, User.prenom).filter(
+            User.id.in_([user_id for user_id, _ in ranked]),
+            User.is_deleted == False
+        )
+    }
+
+    return [
+        FriendSuggestionResponse(
+            id=user_id,
+            pseudo=users[user_id].pseudo,
+            nom=users[user_id].nom,
+            prenom=users[user_id].prenom,
+            mutual_friends=mutual_friends
+        )
+        for user_id, mutual_friends in ranked
+        if user_id in users
+    ]
+
+
+@router.post("/status", response_model=List[FriendshipStatusItem])
+async def get_friendship_statuses(
+        request_data: FriendshipStatusRequest,
+        db: Session = Depends(get_read_db),
+        current_user: User = Depends(get_current_user)
+):
+    """Relation de l'utilisateur connecté avec chacun des utilisateurs demandés.
+
+    Une seule requête sur les deux sens de ``friendships`` ; les identifiants
+    sont renvoyés dans l'ordre de la demande, sans doublon.
+    """
+
+    user_ids = list(dict.fromkeys(request_data.user_ids))
+
+    active_relation = (
+        Friendship.status.in_([FriendshipStatus.ACCEPTED, FriendshipStatus.PENDING]),
+        Friendship.is_deleted == False
+    )
+    # Un UNION ALL plutôt qu'un OR : chaque sens utilise son propre index
+    relations = db.execute(union_all(
+        select(Friendship.requester_id, Friendship.requested_id, Friendship.status).where(
+            Friendship.requester_id == current_user.id,
+            Friendship.requested_id.in_(user_ids),
+            *active_relation
+        ),
+        select(Friendship.requester_id, Friendship.requested_id, Friendship.status).where(
+            Friendship.requested_id == current_user.id,
+            Friendship.requester_id.in_(user_ids),
+            *active_relation
+        )
+    )).all()
+
+    statuses = {}
+    for requester_id, requested_id, friendship_status in relations:
+        if friendship_status == FriendshipStatus.ACCEPTED:
+            other_id = requested_id if requester_id == current_user.id else requester_id
+            statuses[other_id] = "friend"
+        elif requester_id == current_user.id:
+            statuses.setdefault(requested_id, "pending_sent")
+        else:
+            statuses.setdefault(requester_id, "pending_received")
+
+    return [
+        FriendshipStatusItem(
+            user_id=user_id,
+            status="self" if user_id == current_user.id else statuses.get(user_id, "none")
+        )
+        for user_id in user_ids
+    ]
+
+
 @router.get("/requests", response_model=List[FriendshipResponse])
 async def get_friend_requests(
         db: Session = Depends(get_db),
@@ -59,15 +205,7 @@ async def get_friend_requests(
 ):
     """Récupère les demandes d'amis reçues en attente."""
 
-    requests = db.query(Friendship).filter(
-        and_(
-            Friendship.requested_id == current_user.id,
-            Friendship.status == FriendshipStatus.PENDING,
-            Friendship.is_deleted == False
-        )
-    ).all()
-
-    return requests
+    return pending_friend_requests(db, current_user.id)
 
 
 @router.post("/request")
@@ -156,6 +294,7 @@ async def accept_friend_request(
         )
 
     friendship.status = FriendshipStatus.ACCEPTED
+    publish_friendship_change(db, "add", friendship.requester_id, friendship.requested_id)
     db.commit()
 
     return {"message": "Demande d'ami acceptée"}
@@ -219,6 +358,7 @@ async def remove_friend(
 
     # Soft delete
     friendship.is_deleted = True
+    publish_friendship_change(db, "remove", current_user.id, user_id)
     db.commit()
 
     return {"message": "Ami retiré de votre liste"}
\ No newline at end of file
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
-from app.core.database import get_db
+from app.core.database import get_db, SessionReleasingRoute
+from app.core.coalescing import singleflight
+from app.core.query_cache import query_cache
 from app.models.game import Game
 from pydantic import BaseModel
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
 
 
 class GameResponse(BaseModel):
@@ -21,16 +23,19 @@ class GameResponse(BaseModel):
 
 
 @router.get("/", response_model=List[GameResponse])
-async def get_games(
+@singleflight()
+def get_games(
         db: Session = Depends(get_db)
 ):
     """Récupère la liste de tous les jeux disponibles."""
 
-    games = db.query(Game).filter(
-        Game.is_deleted == False
-    ).all()
+    def load():
+        games = db.query(Game).filter(
+            Game.is_deleted == False
+        ).all()
+        return [GameResponse.model_validate(game) for game in games]
 
-    return games
+    return query_cache.get_or_load("games.list", {}, ("games",), load)
 
 
 @router.get("/{game_id}", response_model=GameResponse)
@@ -40,10 +45,14 @@ async def get_game(
 ):
     """Récupère les détails d'un jeu spécifique."""
 
-    game = db.query(Game).filter(
-        Game.id == game_id,
-        Game.is_deleted == False
-    ).first()
+    def load():
+        game = db.query(Game).filter(
+            Game.id == game_id,
+            Game.is_deleted == False
+        ).first()
+        return GameResponse.model_validate(game) if game else None
+
+    game = query_cache.get_or_load("games.detail", {"game_id": game_id}, ("games",), load)
 
     if not game:
         raise HTTPException(
@@ -0,0 +1,122 @@
+import time
+import asyncio
+import logging
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import APIRouter, Depends
+from sqlalchemy import text
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Callable, Dict, List, Optional, Any
+from app.core.config import settings
+from app.core.database import get_read_session_factory, SessionReleasingRoute
+from app.models.user import User
+from app.schemas.user import UserResponse
+from app.schemas.friend import FriendshipResponse
+from app.schemas.reservation import ReservationResponse
+from app.services import friend_service, promo_service, reservation_service
+from app.api.deps import get_current_user
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(route_class=SessionReleasingRoute)
+
+
+class DashboardResponse(BaseModel):
+    user: UserResponse
+    tickets_balance: int
+    reservations: Optional[List[ReservationResponse]] = None
+    friend_requests: Optional[List[FriendshipResponse]] = None
+    available_promos: Optional[List[Dict[str, Any]]] = None
+    # Sections absentes de la réponse (trop lentes ou en erreur)
+    unavailable_sections: List[str] = []
+
+
+# Sections chargées en parallèle, chacune avec sa propre session
+DASHBOARD_SECTIONS: Dict[str, Callable[[Session, int], Any]] = {
+    "reservations": lambda db, user_id: reservation_service.list_user_reservations(db, user_id),
+    # Sérialisé dans le thread, tant que la session est ouverte
+    "friend_requests": lambda db, user_id: [
+        FriendshipResponse.model_validate(friendship)
+        for friendship in friend_service.pending_friend_requests(db, user_id)
+    ],
+    "available_promos": lambda db, user_id: promo_service.available_promo_codes(db, user_id),
+}
+
+
+# Exécuteur dédié et borné : une section expirée continue de tourner (un thread
+# ne s'interrompt pas), mais ne peut pas occuper plus de threads, ni de
+# connexions, que ``DASHBOARD_MAX_WORKERS``
+_section_executor = ThreadPoolExecutor(max_workers=settings.DASHBOARD_MAX_WORKERS,
+                                       thread_name_prefix="dashboard")
+
+
+def _apply_statement_timeout(db: Session, deadline: float) -> None:
+    """Borne les requêtes de la section au temps restant avant l'échéance (PostgreSQL)."""
+    if db.get_bind().dialect.name != "postgresql":
+        return
+    remaining_ms = max(int((deadline - time.monotonic()) * 1000), 1)
+    # Équivalent de SET LOCAL statement_timeout, avec paramètre lié
+    db.execute(text("SELECT set_config('statement_timeout', :timeout, true)"), {"timeout": str(remaining_ms)})
+
+
+def _run_section(loader: Callable[[Session, int], Any], session_factory: sessionmaker, user_id: int,
+                 deadline: float) -> Any:
+    # Section restée en file d'attente au-delà de l'échéance : inutile d'emprunter une connexion
+    if time.monotonic() >= deadline:
+        raise TimeoutError("Échéance du tableau de bord dépassée avant le démarrage de la section")
+    db = session_factory()
+    try:
+        _apply_statement_timeout(db, deadline)
+        return loader(db, user_id)
+    finally:
+        db.close()
+
+
+@router.get("/dashboard", response_model=DashboardResponse)
+async def get_dashboard(
+        session_factory: sessionmaker = Depends(get_read_session_factory),
+        current_user: User = Depends(get_current_user)
+):
+    """Écran d'accueil de l'application en une seule requête.
+
+    Le profil et le solde viennent de l'utilisateur déjà chargé par
+    l'authentification. Les autres sections sont chargées en parallèle ; celles
+    qui dépassent ``DASHBOARD_TIMEOUT_SECONDS`` ou échouent sont renvoyées à
+    ``null`` et listées dans ``unavailable_sections``.
+    """
+
+    loop = asyncio.get_running_loop()
+    deadline = time.monotonic() + settings.DASHBOARD_TIMEOUT_SECONDS
+    # Un future d'exécuteur est abandonné immédiatement à l'expiration du délai,
+    # contrairement à run_in_threadpool qui attend la fin du thread
+    futures = {
+        name: loop.run_in_executor(
+            _section_executor, contextvars.copy_context().run,
+            _run_section, loader, session_factory, current_user.id, deadline
+        )
+        for name, loader in DASHBOARD_SECTIONS.items()
+    }
+    await asyncio.wait(futures.values(), timeout=settings.DASHBOARD_TIMEOUT_SECONDS)
+
+    sections = {}
+    unavailable = []
+    for name, future in futures.items():
+        if not future.done():
+            # Retire la section de la file si elle n'a pas démarré ; sinon la
+            # statement_timeout l'interrompt à l'échéance
+            future.cancel()
+            logger.warning(f"Dashboard section '{name}' timed out")
+            unavailable.append(name)
+        elif future.exception() is not None:
+            logger.warning(f"Dashboard section '{name}' failed: {future.exception()}")
+            unavailable.append(name)
+        else:
+            sections[name] = future.result()
+
+    return DashboardResponse(
+        user=UserResponse.model_validate(current_user),
+        tickets_balance=current_user.tickets_balance,
+        unavailable_sections=unavailable,
+        **sections
+    )
@@ -1,13 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app.core.database import get_db
+from app.core.database import get_db, SessionReleasingRoute
 from app.models.user import User
 from app.models.promo import PromoCode, PromoUse
+from app.services import promo_service
 from app.api.deps import get_current_user
 from pydantic import BaseModel
-from datetime import datetime, timezone
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
 
 
 class UsePromoCodeRequest(BaseModel):
@@ -143,41 +143,4 @@ async def get_available_promo_codes(
 ):
     """Récupère les codes promo disponibles pour l'utilisateur (non sensible)."""
 
-    # Cette route pourrait être utilisée pour afficher des codes publics
-    # ou des indices sur les codes disponibles
-    now = datetime.now(timezone.utc)
-
-    available_codes = db.query(PromoCode).filter(
-        PromoCode.is_deleted == False,
-        PromoCode.is_active == True,
-        # Codes actuellement valides
-        (PromoCode.valid_from.is_(None) | (PromoCode.valid_from <= now)),
-        (PromoCode.valid_until.is_(None) | (PromoCode.valid_until > now)),
-        # Codes qui ont encore des utilisations disponibles
-        (PromoCode.usage_limit.is_(None) | (PromoCode.current_uses < PromoCode.usage_limit))
-    ).all()
-
-    # Filtrer ceux déjà utilisés par l'utilisateur si single_use_per_user
-    result = []
-    for code in available_codes:
-        if code.is_single_use_per_user:
-            existing_use = db.query(PromoUse).filter(
-                PromoUse.user_id == current_user.id,
-                PromoUse.promo_code_id == code.id,
-                PromoUse.is_deleted == False
-            ).first()
-
-            if existing_use:
-                continue  # Skip ce code, déjà utilisé
-
-        # Ne pas révéler le code exact, juste des infos générales
-        result.append({
-            "id": code.id,
-            "tickets_reward": code.tickets_reward,
-            "usage_limit": code.usage_limit,
-            "current_uses": code.current_uses,
-            "valid_until": code.valid_until.isoformat() if code.valid_until else None,
-            "days_until_expiry": code.days_until_expiry()
-        })
-
-    return result
\ No newline at end of file
+    return promo_service.available_promo_codes(db, current_user.id)
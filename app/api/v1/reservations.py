@@ -2,15 +2,17 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import random
-from app.core.database import get_db
+from app.core.database import get_db, SessionReleasingRoute
 from app.models.user import User
 from app.models.arcade import Arcade, ArcadeGame
 from app.models.game import Game
 from app.models.reservation import Reservation, ReservationStatus
+from app.schemas.reservation import ReservationResponse
+from app.services import reservation_service
 from app.api.deps import get_current_user, verify_arcade_key
 from pydantic import BaseModel
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
 
 
 class CreateReservationRequest(BaseModel):
@@ -19,23 +21,10 @@ class CreateReservationRequest(BaseModel):
     player2_id: Optional[int] = None
 
 
-class ReservationResponse(BaseModel):
-    id: int
-    unlock_code: str
-    status: ReservationStatus
-    arcade_name: str
-    game_name: str
-    player_pseudo: str
-    player2_pseudo: Optional[str]
-    tickets_used: int
-    position_in_queue: Optional[int]
-
-    class Config:
-        from_attributes = True
-
 class UpdateReservationStatusRequest(BaseModel):
     status: ReservationStatus
 
+
 @router.post("/", response_model=ReservationResponse)
 async def create_reservation(
         reservation_data: CreateReservationRequest,
@@ -156,47 +145,7 @@ async def get_my_reservations(
 ):
     """Récupère les réservations de l'utilisateur actuel."""
 
-    reservations = db.query(Reservation).join(
-        Arcade, Reservation.arcade_id == Arcade.id
-    ).join(
-        Game, Reservation.game_id == Game.id
-    ).filter(
-        (Reservation.player_id == current_user.id) | (Reservation.player2_id == current_user.id),
-        Reservation.is_deleted == False
-    ).order_by(Reservation.created_at.desc()).all()
-
-    result = []
-    for reservation in reservations:
-        # Récupérer le joueur 2 si nécessaire
-        player2_pseudo = None
-        if reservation.player2_id:
-            player2 = db.query(User).filter(User.id == reservation.player2_id).first()
-            if player2:
-                player2_pseudo = player2.pseudo
-
-        # Calculer la position dans la file si en attente
-        position_in_queue = None
-        if reservation.status == ReservationStatus.WAITING:
-            position_in_queue = db.query(Reservation).filter(
-                Reservation.arcade_id == reservation.arcade_id,
-                Reservation.status == ReservationStatus.WAITING,
-                Reservation.created_at <= reservation.created_at,
-                Reservation.is_deleted == False
-            ).count()
-
-        result.append(ReservationResponse(
-            id=reservation.id,
-            unlock_code=reservation.unlock_code,
-            status=reservation.status,
-            arcade_name=reservation.arcade.nom,
-            game_name=reservation.game.nom,
-            player_pseudo=reservation.player.pseudo,
-            player2_pseudo=player2_pseudo,
-            tickets_used=reservation.tickets_used,
-            position_in_queue=position_in_queue
-        ))
-
-    return result
+    return reservation_service.list_user_reservations(db, current_user.id)
 
 
 @router.get("/{reservation_id}", response_model=ReservationResponse)
@@ -1,18 +1,46 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import and_, or_, insert
 from typing import List, Optional
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, SessionReleasingRoute
+from app.core.coalescing import singleflight
+from app.core.query_cache import query_cache
 from app.models.user import User
 from app.models.score import Score
 from app.models.game import Game
 from app.models.arcade import Arcade
 from app.models.friend import Friendship, FriendshipStatus
 from app.api.deps import get_current_user, verify_arcade_key
-from pydantic import BaseModel
+from app.utils.helpers import parse_fields, required_columns, sparse_response
+from pydantic import BaseModel, validator
 from sqlalchemy.orm import aliased
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
+
+# Nombre maximum de scores acceptés dans un envoi groupé
+MAX_BATCH_SCORES = 500
+
+Player1 = aliased(User, name="p1")
+Player2 = aliased(User, name="p2")
+
+# Colonnes sélectionnables pour la liste des scores
+SCORE_COLUMNS = {
+    "id": Score.id,
+    "player2_id": Score.player2_id,
+    "score_j1": Score.score_j1,
+    "score_j2": Score.score_j2,
+    "created_at": Score.created_at,
+    "player1_pseudo": Player1.pseudo.label("player1_pseudo"),
+    "player2_pseudo": Player2.pseudo.label("player2_pseudo"),
+    "game_name": Game.nom.label("game_name"),
+    "arcade_name": Arcade.nom.label("arcade_name"),
+}
+
+# Colonnes nécessaires aux champs calculés (les autres champs sont des colonnes homonymes)
+SCORE_FIELD_DEPENDENCIES = {
+    "winner_pseudo": ("score_j1", "score_j2", "player2_id", "player1_pseudo", "player2_pseudo"),
+    "is_single_player": ("player2_id",),
+}
 
 
 class CreateScoreRequest(BaseModel):
@@ -24,6 +52,19 @@ class CreateScoreRequest(BaseModel):
     score_j2: Optional[int] = None  # Optionnel pour jeu solo
 
 
+class BatchCreateScoresRequest(BaseModel):
+    """Envoi groupé de scores par une borne (rejeu après coupure réseau)."""
+    scores: List[CreateScoreRequest]
+
+    @validator('scores')
+    def validate_scores(cls, v):
+        if not v:
+            raise ValueError('At least one score is required')
+        if len(v) > MAX_BATCH_SCORES:
+            raise ValueError(f'Maximum {MAX_BATCH_SCORES} scores can be sent at once')
+        return v
+
+
 class ScoreResponse(BaseModel):
     id: int
     player1_pseudo: str
@@ -40,6 +81,20 @@ class ScoreResponse(BaseModel):
         from_attributes = True
 
 
+class BatchScoreItemResult(BaseModel):
+    index: int
+    success: bool
+    score: Optional[ScoreResponse] = None
+    error: Optional[str] = None
+
+
+class BatchCreateScoresResponse(BaseModel):
+    total: int
+    created: int
+    failed: int
+    results: List[BatchScoreItemResult]
+
+
 @router.post("/", response_model=ScoreResponse)
 async def create_score(
         score_data: CreateScoreRequest,
@@ -160,116 +215,258 @@ async def create_score(
     )
 
 
+@router.post("/batch", response_model=BatchCreateScoresResponse)
+async def create_scores_batch(
+        batch_data: BatchCreateScoresRequest,
+        db: Session = Depends(get_db),
+        _: bool = Depends(verify_arcade_key)
+):
+    """Enregistre plusieurs scores en une fois (authentification par clé API borne).
+
+    Les joueurs, jeux et bornes référencés sont validés avec une requête IN par
+    table, puis tous les scores valides sont insérés en une seule instruction.
+    Chaque élément reçoit son propre résultat : un score invalide n'empêche pas
+    l'enregistrement des autres.
+    """
+
+    items = batch_data.scores
+
+    # Charger en une requête par table toutes les entités référencées
+    player_ids = {item.player1_id for item in items}
+    player_ids.update(item.player2_id for item in items if item.player2_id)
+    game_ids = {item.game_id for item in items}
+    arcade_ids = {item.arcade_id for item in items}
+
+    players = {
+        user.id: user for user in db.query(User).filter(
+            User.id.in_(player_ids),
+            User.is_deleted == False
+        ).all()
+    }
+    games = {
+        game.id: game for game in db.query(Game).filter(
+            Game.id.in_(game_ids),
+            Game.is_deleted == False
+        ).all()
+    }
+    arcades = {
+        arcade.id: arcade for arcade in db.query(Arcade).filter(
+            Arcade.id.in_(arcade_ids),
+            Arcade.is_deleted == False
+        ).all()
+    }
+
+    results: List[Optional[BatchScoreItemResult]] = [None] * len(items)
+    valid_indexes = []
+
+    for index, item in enumerate(items):
+        error = None
+        game = games.get(item.game_id)
+
+        if item.player1_id not in players:
+            error = "Joueur 1 non trouvé"
+        elif item.player2_id and item.player1_id == item.player2_id:
+            error = "Les deux joueurs ne peuvent pas être identiques"
+        elif item.player2_id and item.player2_id not in players:
+            error = "Joueur 2 non trouvé"
+        elif not game:
+            error = "Jeu non trouvé"
+        elif item.arcade_id not in arcades:
+            error = "Borne d'arcade non trouvée"
+        elif item.player2_id is None and game.min_players > 1:
+            error = f"Ce jeu nécessite au minimum {game.min_players} joueurs"
+        elif item.player2_id is not None and game.max_players < 2:
+            error = "Ce jeu ne supporte pas 2 joueurs"
+        elif item.player2_id is not None and item.score_j2 is None:
+            error = "Score du joueur 2 manquant"
+
+        if error:
+            results[index] = BatchScoreItemResult(index=index, success=False, error=error)
+        else:
+            valid_indexes.append(index)
+
+    # Insérer tous les scores valides en une seule instruction
+    if valid_indexes:
+        rows = [
+            {
+                "player1_id": items[index].player1_id,
+                "player2_id": items[index].player2_id,
+                "game_id": items[index].game_id,
+                "arcade_id": items[index].arcade_id,
+                "score_j1": items[index].score_j1,
+                "score_j2": items[index].score_j2
+            }
+            for index in valid_indexes
+        ]
+        inserted = db.execute(
+            insert(Score).returning(Score.id, Score.created_at, sort_by_parameter_order=True),
+            rows
+        ).all()
+        db.commit()
+
+        for index, (score_id, created_at) in zip(valid_indexes, inserted):
+            item = items[index]
+            player1 = players[item.player1_id]
+            player2 = players.get(item.player2_id) if item.player2_id else None
+            is_single_player = item.player2_id is None
+
+            # Déterminer le gagnant
+            winner_pseudo = None
+            if not is_single_player:
+                if item.score_j1 > item.score_j2:
+                    winner_pseudo = player1.pseudo
+                elif item.score_j2 > item.score_j1:
+                    winner_pseudo = player2.pseudo
+                else:
+                    winner_pseudo = "Égalité"
+
+            results[index] = BatchScoreItemResult(
+                index=index,
+                success=True,
+                score=ScoreResponse(
+                    id=score_id,
+                    player1_pseudo=player1.pseudo,
+                    player2_pseudo=player2.pseudo if player2 else None,
+                    game_name=games[item.game_id].nom,
+                    arcade_name=arcades[item.arcade_id].nom,
+                    score_j1=item.score_j1,
+                    score_j2=item.score_j2,
+                    winner_pseudo=winner_pseudo,
+                    is_single_player=is_single_player,
+                    created_at=created_at.isoformat()
+                )
+            )
+
+    return BatchCreateScoresResponse(
+        total=len(items),
+        created=len(valid_indexes),
+        failed=len(items) - len(valid_indexes),
+        results=results
+    )
+
+
 @router.get("/", response_model=List[ScoreResponse])
-async def get_scores(
+# Le filtre par amis dépend de l'utilisateur : sa clé en tient compte
+@singleflight(key=lambda arguments: arguments["current_user"].id if arguments["friends_only"] else None)
+def get_scores(
         game_id: Optional[int] = Query(None, description="Filtrer par jeu"),
         arcade_id: Optional[int] = Query(None, description="Filtrer par borne"),
         friends_only: bool = Query(False, description="Afficher seulement les scores avec mes amis"),
         single_player_only: bool = Query(False, description="Afficher seulement les scores solo"),
         limit: int = Query(50, le=100),
-        db: Session = Depends(get_db),
+        fields: Optional[str] = Query(None, description="Champs à renvoyer, séparés par des virgules"),
+        db: Session = Depends(get_read_db),
         current_user: User = Depends(get_current_user)
 ):
-    """Récupère les scores avec filtres optionnels."""
-
-    Player1 = aliased(User, name="p1")
-    Player2 = aliased(User, name="p2")
-
-    query = db.query(Score).join(
-        Player1, Score.player1_id == Player1.id
-    ).outerjoin(  # LEFT JOIN pour player2 (peut être NULL)
-        Player2, Score.player2_id == Player2.id
-    ).join(
-        Game, Score.game_id == Game.id
-    ).join(
-        Arcade, Score.arcade_id == Arcade.id
-    ).filter(
-        Score.is_deleted == False
-    )
-
-    # Filtrer par jeu si spécifié
-    if game_id:
-        query = query.filter(Score.game_id == game_id)
-
-    # Filtrer par borne si spécifié
-    if arcade_id:
-        query = query.filter(Score.arcade_id == arcade_id)
+    """Récupère les scores avec filtres optionnels.
 
-    # Filtrer solo uniquement
-    if single_player_only:
-        query = query.filter(Score.player2_id.is_(None))
+    ``fields=`` restreint la réponse, ainsi que les colonnes et jointures SQL,
+    aux champs demandés (ex: ``fields=id,player1_pseudo,score_j1``).
+    """
 
-    # Filtrer par amis si demandé
-    if friends_only:
-        friend_ids = []
-        friendships = db.query(Friendship).filter(
-            and_(
-                or_(
-                    Friendship.requester_id == current_user.id,
-                    Friendship.requested_id == current_user.id
-                ),
-                Friendship.status == FriendshipStatus.ACCEPTED,
-                Friendship.is_deleted == False
-            )
-        ).all()
+    selected_fields = parse_fields(fields, ScoreResponse.model_fields)
+    columns = required_columns(selected_fields or list(ScoreResponse.model_fields), SCORE_FIELD_DEPENDENCIES)
 
-        for friendship in friendships:
-            friend_id = friendship.requested_id if friendship.requester_id == current_user.id else friendship.requester_id
-            friend_ids.append(friend_id)
+    def load():
+        query = db.query(*(SCORE_COLUMNS[column] for column in columns)).select_from(Score)
 
-        if not friend_ids:
-            return []
+        # Jointures limitées aux tables dont une colonne est demandée
+        if "player1_pseudo" in columns:
+            query = query.join(Player1, Score.player1_id == Player1.id)
+        if "player2_pseudo" in columns:
+            # LEFT JOIN pour player2 (peut être NULL)
+            query = query.outerjoin(Player2, Score.player2_id == Player2.id)
+        if "game_name" in columns:
+            query = query.join(Game, Score.game_id == Game.id)
+        if "arcade_name" in columns:
+            query = query.join(Arcade, Score.arcade_id == Arcade.id)
 
-        # Filtrer les scores où l'utilisateur actuel joue (solo ou contre un ami)
         query = query.filter(
-            or_(
-                # Scores solo de l'utilisateur
-                and_(Score.player1_id == current_user.id, Score.player2_id.is_(None)),
-                # Scores multi avec amis
-                and_(Score.player1_id == current_user.id, Score.player2_id.in_(friend_ids)),
-                and_(Score.player2_id == current_user.id, Score.player1_id.in_(friend_ids))
-            )
+            Score.is_deleted == False
         )
 
-    scores = query.order_by(Score.created_at.desc()).limit(limit).all()
-
-    result = []
-    for score in scores:
-        # Récupérer les infos des joueurs
-        player1 = db.query(User).filter(User.id == score.player1_id).first()
-        player2 = None
-        if score.player2_id:
-            player2 = db.query(User).filter(User.id == score.player2_id).first()
-
-        game = db.query(Game).filter(Game.id == score.game_id).first()
-        arcade = db.query(Arcade).filter(Arcade.id == score.arcade_id).first()
-
-        # Déterminer le gagnant
-        winner_pseudo = None
-        is_single_player = score.player2_id is None
-
-        if not is_single_player:
-            if score.score_j1 > score.score_j2:
-                winner_pseudo = player1.pseudo
-            elif score.score_j2 > score.score_j1:
-                winner_pseudo = player2.pseudo
-            else:
-                winner_pseudo = "Égalité"
-
-        result.append(ScoreResponse(
-            id=score.id,
-            player1_pseudo=player1.pseudo,
-            player2_pseudo=player2.pseudo if player2 else None,
-            game_name=game.nom,
-            arcade_name=arcade.nom,
-            score_j1=score.score_j1,
-            score_j2=score.score_j2,
-            winner_pseudo=winner_pseudo,
-            is_single_player=is_single_player,
-            created_at=score.created_at.isoformat()
-        ))
-
-    return result
+        # Filtrer par jeu si spécifié
+        if game_id:
+            query = query.filter(Score.game_id == game_id)
+
+        # Filtrer par borne si spécifié
+        if arcade_id:
+            query = query.filter(Score.arcade_id == arcade_id)
+
+        # Filtrer solo uniquement
+        if single_player_only:
+            query = query.filter(Score.player2_id.is_(None))
+
+        # Filtrer par amis si demandé
+        if friends_only:
+            friend_ids = []
+            friendships = db.query(Friendship).filter(
+                and_(
+                    or_(
+                        Friendship.requester_id == current_user.id,
+                        Friendship.requested_id == current_user.id
+                    ),
+                    Friendship.status == FriendshipStatus.ACCEPTED,
+                    Friendship.is_deleted == False
+                )
+            ).all()
+
+            for friendship in friendships:
+                friend_id = friendship.requested_id if friendship.requester_id == current_user.id else friendship.requester_id
+                friend_ids.append(friend_id)
+
+            if not friend_ids:
+                return []
+
+            # Filtrer les scores où l'utilisateur actuel joue (solo ou contre un ami)
+            query = query.filter(
+                or_(
+                    # Scores solo de l'utilisateur
+                    and_(Score.player1_id == current_user.id, Score.player2_id.is_(None)),
+                    # Scores multi avec amis
+                    and_(Score.player1_id == current_user.id, Score.player2_id.in_(friend_ids)),
+                    and_(Score.player2_id == current_user.id, Score.player1_id.in_(friend_ids))
+                )
+            )
+
+        rows = query.order_by(Score.created_at.desc(), Score.id.desc()).limit(limit).all()
+
+        result = []
+        for row in rows:
+            score = row._mapping
+            item = {}
+            for field in selected_fields or ScoreResponse.model_fields:
+                if field == "is_single_player":
+                    item[field] = score["player2_id"] is None
+                elif field == "winner_pseudo":
+                    # Déterminer le gagnant
+                    item[field] = None
+                    if score["player2_id"] is not None:
+                        if score["score_j1"] > score["score_j2"]:
+                            item[field] = score["player1_pseudo"]
+                        elif score["score_j2"] > score["score_j1"]:
+                            item[field] = score["player2_pseudo"]
+                        else:
+                            item[field] = "Égalité"
+                elif field == "created_at":
+                    item[field] = score["created_at"].isoformat()
+                else:
+                    item[field] = score[field]
+            result.append(item)
+        return result
+
+    params = {
+        "game_id": game_id, "arcade_id": arcade_id, "single_player_only": single_player_only,
+        "limit": limit, "fields": selected_fields,
+        # Le filtre par amis dépend de l'utilisateur courant
+        "friends_of": current_user.id if friends_only else None,
+    }
+    tables = ("scores", "users", "games", "arcades") + (("friendships",) if friends_only else ())
+    result = query_cache.get_or_load("scores.list", params, tables, load, db=db)
+
+    if selected_fields:
+        return sparse_response(result, selected_fields)
+    return [ScoreResponse(**item) for item in result]
 
 
 @router.get("/my-stats")
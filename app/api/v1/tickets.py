@@ -1,13 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
-from app.core.database import get_db
+from app.core.database import get_db, SessionReleasingRoute
+from app.core.query_cache import query_cache
 from app.models.user import User
 from app.models.ticket import TicketOffer, TicketPurchase
 from app.api.deps import get_current_user
 from pydantic import BaseModel
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
 
 
 class TicketOfferResponse(BaseModel):
@@ -36,11 +37,13 @@ async def get_ticket_offers(
 ):
     """Récupère les offres de tickets disponibles."""
 
-    offers = db.query(TicketOffer).filter(
-        TicketOffer.is_deleted == False
-    ).all()
+    def load():
+        offers = db.query(TicketOffer).filter(
+            TicketOffer.is_deleted == False
+        ).all()
+        return [TicketOfferResponse.model_validate(offer) for offer in offers]
 
-    return offers
+    return query_cache.get_or_load("tickets.offers", {}, ("ticket_offers",), load)
 
 
 @router.post("/purchase", response_model=PurchaseResponse)
@@ -2,12 +2,20 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timezone
-from app.core.database import get_db
+from app.core.database import get_db, get_read_db, SessionReleasingRoute
 from app.models.user import User
 from app.schemas.user import UserUpdate, UserResponse, UserSearchResponse
 from app.api.deps import get_current_user
+from app.services.friend_service import publish_friendship_change
+from app.services import user_service
+from pydantic import BaseModel
 
-router = APIRouter()
+router = APIRouter(route_class=SessionReleasingRoute)
+
+
+class PseudoAvailabilityResponse(BaseModel):
+    pseudo: str
+    available: bool
 
 
 @router.get("/me", response_model=UserResponse)
@@ -97,6 +105,7 @@ async def delete_my_account(
         friendship.is_deleted = True
         friendship.deleted_at = datetime.now(timezone.utc)
 
+    publish_friendship_change(db, "remove_user", current_user.id)
     db.commit()
 
     return {
@@ -115,17 +124,34 @@ async def search_users(
         db: Session = Depends(get_db),
         current_user: User = Depends(get_current_user)
 ):
-    """Recherche des utilisateurs par pseudo, nom ou prénom."""
-
-    search_term = f"%{q}%"
-    users = db.query(User).filter(
-        User.is_deleted == False,
-        User.id != current_user.id,  # Exclure l'utilisateur actuel
-        (
-                User.pseudo.ilike(search_term) |
-                User.nom.ilike(search_term) |
-                User.prenom.ilike(search_term)
-        )
-    ).limit(limit).all()
+    """Recherche des utilisateurs par pseudo, nom ou prénom, classés par similarité."""
+
+    return user_service.search_users(db, q, limit, exclude_user_id=current_user.id)
+
+
+@router.get("/pseudo-availability", response_model=PseudoAvailabilityResponse)
+async def check_pseudo_availability(
+        q: str = Query(..., min_length=1, description="Pseudo à vérifier"),
+        db: Session = Depends(get_read_db)
+):
+    """Indique si un pseudo est libre (index en mémoire, sans requête après le premier chargement)."""
+
+    user_service.pseudo_index.ensure_loaded(db)
+    return PseudoAvailabilityResponse(pseudo=q, available=user_service.pseudo_index.is_available(q))
+
+
+@router.get("/autocomplete", response_model=List[str])
+async def autocomplete_pseudos(
+        prefix: str = Query(..., min_length=1, description="Début du pseudo"),
+        limit: int = Query(10, ge=1, le=50),
+        db: Session = Depends(get_read_db),
+        current_user: User = Depends(get_current_user)
+):
+    """Pseudos d'utilisateurs actifs commençant par le préfixe donné.
+
+    Réservé aux utilisateurs connectés, comme la recherche : en accès public,
+    les préfixes d'un caractère suffiraient à énumérer tous les pseudos.
+    """
 
-    return users
\ No newline at end of file
+    user_service.pseudo_index.ensure_loaded(db)
+    return user_service.pseudo_index.autocomplete(prefix, limit)
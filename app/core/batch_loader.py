@@ -0,0 +1,81 @@
+"""Chargement groupé d'entités par identifiant, à l'échelle d'une requête.
+
+Dans une boucle, ``get(User, id)`` un par un émet une requête SQL par
+itération (N+1). Le chargeur collecte d'abord les identifiants
+(``prime``), puis les résout au premier ``get`` par une seule requête
+``IN`` par type d'entité ; les entités chargées restent mémorisées pour le
+reste de la requête HTTP.
+
+Le chargeur est rattaché à la session (``batch_loader(db)``) : une session
+par requête, donc un chargeur par requête. Les entités chargées entrent dans
+la carte d'identité de la session : les relations plusieurs-à-un
+(``reservation.player``) vers elles ne déclenchent plus de requête.
+"""
+from typing import Dict, Iterable, Optional, Set, Type
+
+from sqlalchemy.orm import Session
+
+# Taille maximale d'une liste IN (limite de paramètres des pilotes)
+MAX_IN_SIZE = 500
+
+_SESSION_KEY = "batch_loader"
+
+
+class BatchLoader:
+    """Entités chargées par lots ``IN``, mémorisées par type et identifiant."""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._loaded: Dict[type, Dict[int, object]] = {}
+        self._pending: Dict[type, Set[int]] = {}
+
+    def prime(self, model: Type, ids: Iterable[Optional[int]]) -> "BatchLoader":
+        """Annonce des identifiants à charger au prochain ``get`` (``None`` ignoré)."""
+        loaded = self._loaded.setdefault(model, {})
+        pending = self._pending.setdefault(model, set())
+        pending.update(id_ for id_ in ids if id_ is not None and id_ not in loaded)
+        return self
+
+    def get(self, model: Type, id_: Optional[int]):
+        """Entité ``model`` d'identifiant ``id_`` ou ``None`` (absente ou ``id_`` nul).
+
+        Les identifiants annoncés et pas encore chargés sont résolus ensemble.
+        """
+        if id_ is None:
+            return None
+        loaded = self._loaded.setdefault(model, {})
+        if id_ not in loaded:
+            self.prime(model, (id_,))
+            self._load(model)
+        return loaded.get(id_)
+
+    def get_many(self, model: Type, ids: Iterable[Optional[int]]) -> Dict[int, object]:
+        """Entités trouvées parmi ``ids``, par identifiant."""
+        ids = [id_ for id_ in ids if id_ is not None]
+        self.prime(model, ids)
+        self._load(model)
+        loaded = self._loaded[model]
+        return {id_: loaded[id_] for id_ in ids if loaded.get(id_) is not None}
+
+    def _load(self, model: Type) -> None:
+        pending = self._pending.get(model)
+        if not pending:
+            return
+        loaded = self._loaded.setdefault(model, {})
+        ids = sorted(pending)
+        pending.clear()
+        for start in range(0, len(ids), MAX_IN_SIZE):
+            chunk = ids[start:start + MAX_IN_SIZE]
+            for entity in self.db.query(model).filter(model.id.in_(chunk)).all():
+                loaded[entity.id] = entity
+            # Absences mémorisées aussi : pas de nouvelle requête pour le même identifiant
+            for id_ in chunk:
+                loaded.setdefault(id_, None)
+
+
+def batch_loader(db: Session) -> BatchLoader:
+    """Chargeur de la requête en cours (rattaché à sa session)."""
+    loader = db.info.get(_SESSION_KEY)
+    if loader is None:
+        loader = db.info[_SESSION_KEY] = BatchLoader(db)
+    return loader
@@ -0,0 +1,173 @@
+"""Regroupement des lectures identiques simultanées (« singleflight »).
+
+Après une notification push, une même lecture populaire (scores d'un jeu,
+liste des bornes, catalogue des jeux) arrive des dizaines de fois dans la même
+milliseconde. Avec ``@singleflight()``, la première requête exécute la route ;
+celles qui arrivent avec les mêmes paramètres pendant son exécution attendent
+son résultat au lieu de relancer la requête SQL. Le résultat est sérialisé
+une seule fois : chaque requête reçoit une réponse construite sur les mêmes
+octets.
+
+Rien n'est conservé après la fin de l'exécution : ce n'est pas un cache, une
+requête arrivée après coup relit la base.
+
+Une requête en attente rend d'abord au pool la connexion de ses sessions
+(empruntée par l'authentification) : N doublons n'occupent pas N connexions.
+"""
+import asyncio
+import functools
+import inspect
+import threading
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from starlette.responses import Response
+
+from .config import settings
+from .database import release_connection, request_sessions
+from .metrics import http_requests_coalesced
+
+
+class _SharedResponse:
+    """Réponse sérialisée une fois, rejouable pour chaque requête en attente."""
+
+    __slots__ = ("body", "status_code", "media_type", "headers")
+
+    def __init__(self, result: Any):
+        response = result if isinstance(result, Response) else JSONResponse(content=jsonable_encoder(result))
+        self.body = response.body
+        self.status_code = response.status_code
+        self.media_type = response.media_type
+        # Content-Length est recalculé par chaque réponse
+        self.headers = {
+            key: value for key, value in response.headers.items()
+            if key not in ("content-length", "content-type")
+        }
+
+    def response(self) -> Response:
+        return Response(self.body, self.status_code, self.headers, self.media_type)
+
+
+class _Flight:
+    """Exécution en cours, partagée par les requêtes de même clé (threads)."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[_SharedResponse] = None
+        self.error: Optional[BaseException] = None
+
+
+def _release_sessions(args: tuple, kwargs: dict, signature: inspect.Signature) -> None:
+    """Rend les connexions des sessions d'une requête qui va attendre le résultat partagé."""
+    for session in request_sessions(signature.bind(*args, **kwargs).arguments):
+        release_connection(session)
+
+
+def _label(func: Callable) -> str:
+    return f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+
+
+def singleflight(ignore: Iterable[str] = ("db", "current_user"),
+                 key: Optional[Callable[[Dict[str, Any]], Hashable]] = None):
+    """Décorateur de route : les appels simultanés de mêmes paramètres partagent une exécution.
+
+    La clé est formée des arguments de la route, sauf ceux listés dans
+    ``ignore`` (session, utilisateur courant). Si le résultat dépend d'un
+    argument ignoré, ``key`` reçoit les arguments et retourne la partie de clé
+    correspondante. Le résultat doit être une ``Response`` ou un objet
+    sérialisable par ``jsonable_encoder`` (modèles Pydantic, dicts). Une
+    exception de la première exécution est relevée pour toutes les requêtes
+    qui l'attendaient.
+
+    Les routes synchrones (``def``) s'exécutent dans le pool de threads, où les
+    doublons attendent sur un ``threading.Event`` ; les routes ``async def``
+    sont regroupées par ``asyncio.Future`` et doivent céder la main à la
+    boucle (``await``) pour que des doublons puissent arriver pendant leur
+    exécution.
+    """
+    ignored = frozenset(ignore)
+
+    def decorator(func: Callable) -> Callable:
+        label = _label(func)
+        signature = inspect.signature(func)
+
+        def flight_key(args: tuple, kwargs: dict) -> Tuple:
+            arguments = signature.bind(*args, **kwargs).arguments
+            parts = tuple(sorted(
+                (name, repr(value)) for name, value in arguments.items() if name not in ignored
+            ))
+            return parts + ((key(arguments),) if key is not None else ())
+
+        if inspect.iscoroutinefunction(func):
+            flights: Dict[Tuple, asyncio.Future] = {}
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if not settings.REQUEST_COALESCING_ENABLED:
+                    return await func(*args, **kwargs)
+
+                flight_id = (id(asyncio.get_running_loop()),) + flight_key(args, kwargs)
+                future = flights.get(flight_id)
+                if future is not None:
+                    http_requests_coalesced.inc(label, "shared")
+                    _release_sessions(args, kwargs, signature)
+                    return (await asyncio.shield(future)).response()
+
+                future = flights[flight_id] = asyncio.get_running_loop().create_future()
+                http_requests_coalesced.inc(label, "leader")
+                try:
+                    shared = _SharedResponse(await func(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+                    # Évite l'avertissement « exception never retrieved » sans attente
+                    future.exception()
+                    raise
+                else:
+                    future.set_result(shared)
+                    return shared.response()
+                finally:
+                    del flights[flight_id]
+
+            return async_wrapper
+
+        thread_flights: Dict[Tuple, _Flight] = {}
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not settings.REQUEST_COALESCING_ENABLED:
+                return func(*args, **kwargs)
+
+            flight_id = flight_key(args, kwargs)
+            with lock:
+                flight = thread_flights.get(flight_id)
+                leader = flight is None
+                if leader:
+                    flight = thread_flights[flight_id] = _Flight()
+
+            if not leader:
+                http_requests_coalesced.inc(label, "shared")
+                _release_sessions(args, kwargs, signature)
+                flight.done.wait()
+                if flight.error is not None:
+                    raise flight.error
+                return flight.result.response()
+
+            http_requests_coalesced.inc(label, "leader")
+            try:
+                flight.result = _SharedResponse(func(*args, **kwargs))
+                return flight.result.response()
+            except BaseException as e:
+                flight.error = e
+                raise
+            finally:
+                with lock:
+                    del thread_flights[flight_id]
+                flight.done.set()
+
+        return wrapper
+
+    return decorator
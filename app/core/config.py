@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import List, Optional
 import os
 
 
@@ -12,6 +12,23 @@ class Settings(BaseSettings):
     # Database
     DATABASE_URL: str
 
+    # Pool de connexions (ignoré pour SQLite)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 300
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_WARMUP: bool = True
+    # Part du pool empruntée au-delà de laquelle l'instance se déclare non prête
+    DB_POOL_SATURATION_THRESHOLD: float = 0.9
+
+    # Réplicas en lecture (URLs séparées par des virgules, vide = pas de réplica)
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 2.0
+    # Durée pendant laquelle un client qui vient d'écrire lit sur le primaire
+    READ_YOUR_WRITES_WINDOW_SECONDS: float = 10.0
+
     # Firebase - Chemins vers les fichiers JSON
     FIREBASE_USER_CREDENTIALS_PATH: str
     FIREBASE_ADMIN_CREDENTIALS_PATH: str
@@ -24,6 +41,82 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Instrumentation SQL (nombre d'exécutions d'une même instruction signalé comme N+1)
+    QUERY_REPEAT_WARNING_THRESHOLD: int = 5
+
+    # Graphe d'amitiés en mémoire : rechargement complet périodique (autres workers)
+    FRIEND_GRAPH_REFRESH_SECONDS: float = 300.0
+
+    # Tableau de bord : délai global des sections chargées en parallèle
+    DASHBOARD_TIMEOUT_SECONDS: float = 2.0
+    # Threads (donc connexions) au plus occupés par les sections, tous tableaux de bord confondus
+    DASHBOARD_MAX_WORKERS: int = 8
+
+    # Regroupement des lectures identiques simultanées (@singleflight)
+    REQUEST_COALESCING_ENABLED: bool = True
+
+    # Cache des résultats de lecture, invalidé par version de table
+    QUERY_CACHE_ENABLED: bool = True
+    # "memory" (par worker) ou "sqlite" (fichier local partagé par les workers)
+    QUERY_CACHE_BACKEND: str = "memory"
+    QUERY_CACHE_SQLITE_PATH: str = "/tmp/retronova_query_cache.db"
+    QUERY_CACHE_TTL_SECONDS: float = 30.0
+    QUERY_CACHE_MAX_ENTRIES: int = 10000
+    QUERY_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # Bus d'invalidation entre workers (PostgreSQL LISTEN/NOTIFY, local avec SQLite)
+    INVALIDATION_CHANNEL: str = "retronova_invalidation"
+    INVALIDATION_POLL_SECONDS: float = 1.0
+    INVALIDATION_RECONNECT_SECONDS: float = 5.0
+
+    # Compression des réponses (gzip, brotli si le module est installé)
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    # Mémoire maximale des réponses de catalogue conservées compressées (octets)
+    COMPRESSION_CACHE_MAX_BYTES: int = 16 * 1024 * 1024
+
+    # Profilage à la demande (en-tête X-Profile + token admin)
+    PROFILING_ENABLED: bool = True
+    PROFILING_SAMPLE_INTERVAL_SECONDS: float = 0.005
+    PROFILING_MAX_ENTRIES: int = 20
+
+    # Journal des requêtes SQL lentes (0 désactive)
+    SLOW_QUERY_THRESHOLD_MS: float = 200.0
+    SLOW_QUERY_LOG_SIZE: int = 200
+    # Plan d'exécution des SELECT lents, capturé en arrière-plan sur une autre connexion
+    SLOW_QUERY_EXPLAIN: bool = False
+
+    # Limitation de débit par seaux à jetons (débit par seconde, rafale)
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_USER_PER_SECOND: float = 10.0
+    RATE_LIMIT_USER_BURST: float = 40.0
+    # La clé API est partagée par toutes les bornes
+    RATE_LIMIT_API_KEY_PER_SECOND: float = 200.0
+    RATE_LIMIT_API_KEY_BURST: float = 400.0
+    RATE_LIMIT_ANONYMOUS_PER_SECOND: float = 5.0
+    RATE_LIMIT_ANONYMOUS_BURST: float = 20.0
+    # Seaux par adresse IP (clients anonymes, plafond des requêtes à token) : à activer
+    # seulement si l'adresse réelle est connue (FORWARDED_ALLOW_IPS derrière un proxy),
+    # sinon tous les clients partagent l'adresse du répartiteur de charge
+    RATE_LIMIT_BY_ADDRESS: bool = False
+    # Plafond par adresse IP des requêtes portant un token (non vérifié par le limiteur)
+    RATE_LIMIT_ADDRESS_PER_SECOND: float = 50.0
+    RATE_LIMIT_ADDRESS_BURST: float = 200.0
+    # Limites globales par route, hors bornes ("route=débit:rafale", séparées par des virgules)
+    RATE_LIMIT_ROUTES: str = "/api/v1/arcades/=200:400,/api/v1/scores/=200:400"
+    RATE_LIMIT_MAX_KEYS: int = 100000
+
+    # Délestage : requêtes en cours maximum (0 = taille du pool + débordement)
+    LOAD_SHED_MAX_CONCURRENCY: int = 0
+    # Part de cette capacité réservée aux bornes
+    LOAD_SHED_KIOSK_RESERVED: int = 3
+    LOAD_SHED_RETRY_AFTER_SECONDS: float = 1.0
+
+    @property
+    def replica_urls(self) -> List[str]:
+        return [url.strip() for url in self.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -1,23 +1,311 @@
-from sqlalchemy import create_engine
+import time
+import inspect
+import hashlib
+import logging
+import functools
+import itertools
+import threading
+from fastapi import Depends, Request
+from fastapi.routing import APIRoute
+from sqlalchemy import create_engine, event, inspect as sa_inspect, text
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from typing import Any, Callable, Dict, List, Optional
 from .config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_recycle=300
-)
+logger = logging.getLogger(__name__)
+
+
+def engine_options(database_url: str) -> dict:
+    """Options du pool de connexions issues de la configuration."""
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE
+    }
+    # SQLite (tests, développement) utilise des pools sans taille ni débordement
+    if make_url(database_url).get_backend_name() != "sqlite":
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT
+        )
+    return options
+
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
 
-def get_db():
-    """Dependency pour obtenir une session de base de données."""
+def measure_replica_lag(target: Engine) -> float:
+    """Retard de réplication en secondes (0 si la réplica a rejoué tout le WAL reçu)."""
+    if target.dialect.name != "postgresql":
+        return 0.0
+    with target.connect() as connection:
+        lag = connection.execute(text(
+            "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+            "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+        )).scalar()
+    return float(lag or 0.0)
+
+
+class _Replica:
+    """Réplica en lecture et dernier retard mesuré."""
+
+    def __init__(self, replica_engine: Engine):
+        self.engine = replica_engine
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine)
+        self.lag: Optional[float] = None
+        self.checked_at = float("-inf")
+        self._refreshing = threading.Lock()
+
+
+class ReplicaRouter:
+    """Répartit les lectures entre les réplicas, avec repli sur le primaire.
+
+    Une réplica est écartée si son retard dépasse ``max_lag`` ou si elle est
+    injoignable. Le retard est remesuré au plus toutes les ``check_interval``
+    secondes, par un seul thread à la fois (les autres gardent la dernière mesure).
+    Un client qui vient d'écrire lit sur le primaire pendant ``rw_window`` secondes.
+    """
+
+    def __init__(self, replica_engines: List[Engine], max_lag: float, check_interval: float,
+                 rw_window: float, lag_probe: Callable[[Engine], float] = measure_replica_lag):
+        self.replicas = [_Replica(replica_engine) for replica_engine in replica_engines]
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.rw_window = rw_window
+        self.lag_probe = lag_probe
+        self._round_robin = itertools.count()
+        self._recent_writers: Dict[str, float] = {}
+
+    def record_write(self, client_key: str) -> None:
+        now = time.monotonic()
+        self._recent_writers[client_key] = now
+        # Purge opportuniste des écritures trop anciennes pour compter
+        if len(self._recent_writers) > 10000:
+            for key, written_at in list(self._recent_writers.items()):
+                if now - written_at > self.rw_window:
+                    self._recent_writers.pop(key, None)
+
+    def wrote_recently(self, client_key: Optional[str]) -> bool:
+        if not client_key:
+            return False
+        written_at = self._recent_writers.get(client_key)
+        return written_at is not None and time.monotonic() - written_at < self.rw_window
+
+    def _is_fresh(self, replica: _Replica) -> bool:
+        now = time.monotonic()
+        if now - replica.checked_at >= self.check_interval and replica._refreshing.acquire(blocking=False):
+            try:
+                replica.lag = self.lag_probe(replica.engine)
+            except Exception as e:
+                logger.warning(f"Replica lag check failed: {e}")
+                replica.lag = None
+            finally:
+                replica.checked_at = now
+                replica._refreshing.release()
+        return replica.lag is not None and replica.lag <= self.max_lag
+
+    def is_replica(self, bind: Any) -> bool:
+        """Vrai si ``bind`` (moteur d'une session) est celui d'une réplica."""
+        return any(replica.engine is bind for replica in self.replicas)
+
+    def choose(self, client_key: Optional[str] = None) -> Optional[sessionmaker]:
+        """Fabrique de sessions de la réplica à utiliser, ou None pour le primaire."""
+        if not self.replicas or self.wrote_recently(client_key):
+            return None
+        start = next(self._round_robin)
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if self._is_fresh(replica):
+                return replica.session_factory
+        return None
+
+
+replica_router = ReplicaRouter(
+    [create_engine(url, **engine_options(url)) for url in settings.replica_urls],
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+    rw_window=settings.READ_YOUR_WRITES_WINDOW_SECONDS
+)
+
+
+def client_key(request: Request) -> Optional[str]:
+    """Identifiant opaque du client (empreinte de son token ou de sa clé API)."""
+    credential = request.headers.get("authorization") or request.headers.get("x-api-key")
+    if not credential:
+        return None
+    return hashlib.sha256(credential.encode()).hexdigest()[:32]
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _record_client_write(session):
+    key = session.info.get("client_key")
+    if key:
+        replica_router.record_write(key)
+
+
+def get_db(request: Request):
+    """Dependency pour obtenir une session de base de données.
+
+    La session n'emprunte une connexion (et ne la vérifie avec ``pool_pre_ping``)
+    qu'à sa première requête SQL : un handler qui échoue avant, sur une
+    permission par exemple, ne touche pas au pool. Avec ``SessionReleasingRoute``,
+    la connexion est rendue dès le retour du handler.
+    """
     db = SessionLocal()
+    if replica_router.replicas:
+        # Permet de router les lectures suivantes de ce client vers le primaire
+        db.info["client_key"] = client_key(request)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def get_read_session_factory(request: Request) -> sessionmaker:
+    """Dependency de fabrique de sessions en lecture, servie par une réplica si possible.
+
+    Retombe sur le primaire sans réplica configurée, si aucune n'est à jour, ou si
+    le client vient d'écrire (lecture de ses propres écritures). Utilisée telle
+    quelle par les routes qui ouvrent plusieurs sessions en parallèle.
+    """
+    session_factory = replica_router.choose(client_key(request)) if replica_router.replicas else None
+    return session_factory or SessionLocal
+
+
+def get_read_db(session_factory: sessionmaker = Depends(get_read_session_factory)):
+    """Dependency de session en lecture seule (voir ``get_read_session_factory``)."""
+    db = session_factory()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def release_connection(db: Session) -> bool:
+    """Rend au pool la connexion d'une session, sans détacher ni expirer ses objets.
+
+    La transaction en cours est terminée comme le ferait ``db.close()`` (ce qui
+    n'a pas été validé est annulé). Les objets chargés restent lisibles ; un
+    attribut non chargé relance une requête sur une nouvelle connexion.
+
+    Returns:
+        True si une connexion a été rendue
+    """
+    transaction = db.get_transaction()
+    if transaction is None:
+        return False
+    transaction.close()
+    return True
+
+
+def request_sessions(values: Dict[str, Any]) -> List[Session]:
+    """Sessions reçues par un handler, directement ou via un objet chargé (``current_user``)."""
+    sessions = []
+    for value in values.values():
+        if isinstance(value, Session):
+            session = value
+        else:
+            state = sa_inspect(value, raiseerr=False)
+            session = getattr(state, "session", None)
+        if session is not None and session not in sessions:
+            sessions.append(session)
+    return sessions
+
+
+def _releasing_sessions(endpoint: Callable) -> Callable:
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def async_wrapper(**values):
+            try:
+                return await endpoint(**values)
+            finally:
+                for session in request_sessions(values):
+                    release_connection(session)
+        return async_wrapper
+
+    @functools.wraps(endpoint)
+    def wrapper(**values):
+        try:
+            return endpoint(**values)
+        finally:
+            for session in request_sessions(values):
+                release_connection(session)
+    return wrapper
+
+
+class SessionReleasingRoute(APIRoute):
+    """Route qui rend la connexion de ses sessions au pool dès le retour du handler.
+
+    FastAPI ne ferme les sessions des dépendances qu'après la sérialisation de la
+    réponse (validation ``response_model``, encodage JSON) : la connexion reste
+    empruntée sans servir. Ici, elle est rendue quand le handler a terminé sa
+    dernière requête, y compris s'il lève une exception.
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        super().__init__(path, _releasing_sessions(endpoint), **kwargs)
+
+
+def warm_up_pool(target: Engine = engine) -> int:
+    """Ouvre les connexions du pool au démarrage plutôt qu'à la première rafale.
+
+    Returns:
+        Nombre de connexions ouvertes
+    """
+    size = getattr(target.pool, "size", None)
+    if not callable(size) or size() <= 0:
+        return 0
+
+    connections = []
+    try:
+        for _ in range(size()):
+            connections.append(target.connect())
+    except Exception as e:
+        logger.warning(f"Pool warm-up interrupted after {len(connections)} connections: {e}")
+    finally:
+        # Les connexions retournent au pool et restent ouvertes
+        for connection in connections:
+            connection.close()
+
+    return len(connections)
+
+
+def pool_status(target: Engine = engine) -> dict:
+    """État du pool : connexions empruntées, débordement et taux de saturation."""
+    pool = target.pool
+    if not callable(getattr(pool, "size", None)):
+        return {"pool": type(pool).__name__}
+
+    size = pool.size()
+    checked_out = pool.checkedout()
+    # _max_overflow vaut -1 lorsque le débordement est illimité
+    max_overflow = max(getattr(pool, "_max_overflow", 0), 0)
+    capacity = size + max_overflow
+
+    return {
+        "pool": type(pool).__name__,
+        "size": size,
+        "max_overflow": max_overflow,
+        "checked_out": checked_out,
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+        "saturation": round(checked_out / capacity, 3) if capacity else 0.0
+    }
+
+
+def ping_database(target: Engine = engine) -> Optional[float]:
+    """Mesure l'aller-retour vers la base (ms), ou None si elle est injoignable."""
+    start = time.perf_counter()
+    try:
+        with target.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception as e:
+        logger.warning(f"Database ping failed: {e}")
+        return None
+    return round((time.perf_counter() - start) * 1000, 2)
@@ -0,0 +1,140 @@
+"""Instrumentation SQL : nombre de requêtes et temps passé en base par requête HTTP.
+
+Les compteurs sont alimentés par des événements SQLAlchemy enregistrés sur la
+classe ``Engine`` : tous les moteurs (principal, tests) sont donc couverts.
+"""
+import time
+import logging
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class QueryStats:
+    """Statistiques SQL d'une requête HTTP."""
+
+    __slots__ = ("route", "count", "duration", "statements")
+
+    def __init__(self, route: Optional[str] = None):
+        self.route = route
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Counter = Counter()
+
+    def record(self, statement: str, duration: float) -> None:
+        self.count += 1
+        self.duration += duration
+        self.statements[statement] += 1
+
+    def repeated_statements(self, threshold: Optional[int] = None) -> Dict[str, int]:
+        """Instructions identiques exécutées au moins ``threshold`` fois (symptôme N+1)."""
+        threshold = threshold or settings.QUERY_REPEAT_WARNING_THRESHOLD
+        return {
+            statement: count
+            for statement, count in self.statements.items()
+            if count >= threshold
+        }
+
+
+class RouteQueryTotals:
+    """Cumul des statistiques SQL d'une route depuis le démarrage du processus."""
+
+    __slots__ = ("requests", "queries", "duration", "n_plus_one_requests")
+
+    def __init__(self):
+        self.requests = 0
+        self.queries = 0
+        self.duration = 0.0
+        self.n_plus_one_requests = 0
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_route_totals: Dict[str, RouteQueryTotals] = {}
+_capture_sinks: List[List[QueryStats]] = []
+
+
+def current_stats() -> Optional[QueryStats]:
+    """Statistiques de la requête HTTP en cours (None hors requête)."""
+    return _current_stats.get()
+
+
+@contextmanager
+def track_queries(route: Optional[str] = None) -> Iterator[QueryStats]:
+    """Compte les requêtes SQL exécutées dans le contexte courant."""
+    stats = QueryStats(route)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def record_request(stats: QueryStats) -> None:
+    """Ajoute les statistiques d'une requête terminée aux cumuls par route."""
+    totals = _route_totals.get(stats.route)
+    if totals is None:
+        totals = _route_totals.setdefault(stats.route, RouteQueryTotals())
+
+    totals.requests += 1
+    totals.queries += stats.count
+    totals.duration += stats.duration
+
+    repeated = stats.repeated_statements()
+    if repeated:
+        totals.n_plus_one_requests += 1
+        for statement, count in repeated.items():
+            logger.warning(
+                "N+1 suspecté sur %s : instruction exécutée %d fois : %s",
+                stats.route, count, " ".join(statement.split())[:200]
+            )
+
+    for sink in _capture_sinks:
+        sink.append(stats)
+
+
+def route_totals() -> Dict[str, RouteQueryTotals]:
+    """Cumuls par route (lecture seule)."""
+    return dict(_route_totals)
+
+
+@contextmanager
+def capture_requests() -> Iterator[List[QueryStats]]:
+    """Collecte les statistiques des requêtes HTTP terminées pendant le bloc (tests)."""
+    sink: List[QueryStats] = []
+    _capture_sinks.append(sink)
+    try:
+        yield sink
+    finally:
+        _capture_sinks.remove(sink)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+    if stats is None:
+        return
+    start_times = conn.info.get("query_start_time")
+    if start_times:
+        stats.record(statement, time.perf_counter() - start_times.pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    # L'instruction a échoué : after_cursor_execute ne sera pas appelé
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start_time"):
+        connection.info["query_start_time"].pop()
@@ -0,0 +1,236 @@
+"""Bus d'invalidation des caches en mémoire entre workers.
+
+Les caches tenus en mémoire (cache de requêtes, graphe d'amitiés, index de
+recherche et de pseudos) ne voient que les écritures de leur worker. Chaque
+modification qui les concerne est publiée sur le bus sous forme d'un message
+``(sujet, données)`` ; les abonnés de chaque worker l'appliquent à leurs
+structures locales.
+
+- Dans le worker qui écrit, les abonnés sont appelés de façon synchrone après
+  le commit : une requête suivante du même worker lit sa propre écriture.
+- Avec PostgreSQL, le message est aussi émis par ``pg_notify`` dans la
+  transaction d'écriture : il n'est délivré aux autres workers que si elle
+  est validée. Chaque worker écoute le canal dans un thread dédié, sur une
+  connexion sortie du pool, et ignore ses propres messages.
+- Avec SQLite (tests, développement : un seul processus), le bus est purement
+  local.
+
+Un message trop gros pour ``NOTIFY`` et toute reconnexion de l'écoute (des
+messages ont pu être perdus) déclenchent une resynchronisation : les caches
+abonnés sont vidés et rechargés au prochain accès.
+"""
+import json
+import uuid
+import select
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import engine
+
+logger = logging.getLogger(__name__)
+
+# Limite de NOTIFY : 8000 octets, moins l'enveloppe du message
+MAX_PAYLOAD_BYTES = 7500
+RESYNC_TOPIC = "resync"
+
+Handler = Callable[[dict], None]
+
+_PENDING_KEY = "invalidation_messages"
+_SENT_KEY = "invalidation_messages_sent"
+
+
+class InvalidationBus:
+    """Bus local : les messages sont délivrés aux abonnés du processus."""
+
+    # Émission vers d'autres processus
+    remote = False
+
+    def __init__(self):
+        self.origin = uuid.uuid4().hex
+        self._handlers: Dict[str, List[Handler]] = {}
+
+    def subscribe(self, topic: str, handler: Handler) -> None:
+        self._handlers.setdefault(topic, []).append(handler)
+
+    def subscriber(self, topic: str) -> Callable[[Handler], Handler]:
+        """Décorateur : ``@invalidation_bus.subscriber("users")``."""
+        def decorator(handler: Handler) -> Handler:
+            self.subscribe(topic, handler)
+            return handler
+        return decorator
+
+    def dispatch(self, topic: str, payload: dict) -> None:
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(payload)
+            except Exception:
+                logger.exception(f"Invalidation handler failed for topic {topic}")
+
+    def resync(self) -> None:
+        """Vide les caches abonnés (messages perdus ou trop gros)."""
+        self.dispatch(RESYNC_TOPIC, {})
+
+    def publish(self, topic: str, payload: dict, session: Optional[Session] = None) -> None:
+        """Publie un message.
+
+        Avec ``session``, le message suit la transaction : émis vers les autres
+        workers avec elle, appliqué localement après son commit, abandonné en
+        cas de rollback. Sans session (écriture déjà validée), il est émis et
+        appliqué immédiatement.
+        """
+        if session is not None:
+            session.info.setdefault(_PENDING_KEY, []).append((topic, payload))
+            return
+        self.send([(topic, payload)], connection=None)
+        self.dispatch(topic, payload)
+
+    def send(self, messages: List[Tuple[str, dict]], connection=None) -> None:
+        """Émission vers les autres workers (aucune pour le bus local)."""
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class PostgresInvalidationBus(InvalidationBus):
+    """Bus PostgreSQL : ``pg_notify`` transactionnel et écoute ``LISTEN`` en arrière-plan."""
+
+    remote = True
+
+    def __init__(self, target: Engine, channel: str):
+        super().__init__()
+        self.engine = target
+        self.channel = channel
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _encode(self, topic: str, payload: dict) -> str:
+        message = json.dumps({"origin": self.origin, "topic": topic, "payload": payload}, separators=(",", ":"))
+        if len(message.encode()) > MAX_PAYLOAD_BYTES:
+            logger.warning(f"Invalidation message too large for NOTIFY ({topic}), sending resync")
+            message = json.dumps({"origin": self.origin, "topic": RESYNC_TOPIC, "payload": {}})
+        return message
+
+    def send(self, messages: List[Tuple[str, dict]], connection=None) -> None:
+        statement = text("SELECT pg_notify(:channel, :message)")
+        parameters = [{"channel": self.channel, "message": self._encode(topic, payload)}
+                      for topic, payload in messages]
+        if connection is not None:
+            connection.execute(statement, parameters)
+            return
+        try:
+            with self.engine.begin() as own_connection:
+                own_connection.execute(statement, parameters)
+        except Exception as e:
+            logger.warning(f"Invalidation NOTIFY failed: {e}")
+
+    def start(self) -> None:
+        # Identifiant propre à chaque worker, même si l'application a été importée avant le fork
+        self.origin = uuid.uuid4().hex
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._listen_forever, name="invalidation-listener", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=settings.INVALIDATION_POLL_SECONDS * 2)
+            self._thread = None
+
+    def _listen_forever(self) -> None:
+        first = True
+        while not self._stopped.is_set():
+            try:
+                self._listen(resync=not first)
+            except Exception as e:
+                logger.warning(f"Invalidation listener disconnected: {e}")
+            first = False
+            self._stopped.wait(settings.INVALIDATION_RECONNECT_SECONDS)
+
+    def _listen(self, resync: bool) -> None:
+        pooled = self.engine.raw_connection()
+        # Connexion dédiée à l'écoute : elle ne retourne jamais dans le pool
+        pooled.detach()
+        connection = pooled.driver_connection
+        try:
+            connection.autocommit = True
+            with connection.cursor() as cursor:
+                cursor.execute(f'LISTEN "{self.channel}"')
+            if resync:
+                # Des messages ont pu être émis pendant la coupure
+                self.resync()
+            while not self._stopped.is_set():
+                readable, _, _ = select.select([connection], [], [], settings.INVALIDATION_POLL_SECONDS)
+                if not readable:
+                    continue
+                connection.poll()
+                while connection.notifies:
+                    self._receive(connection.notifies.pop(0).payload)
+        finally:
+            connection.close()
+
+    def _receive(self, raw: str) -> None:
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            logger.warning("Invalid invalidation message ignored")
+            return
+        # Messages de ce worker : déjà appliqués au commit
+        if message.get("origin") == self.origin:
+            return
+        self.dispatch(message["topic"], message.get("payload") or {})
+
+
+def create_bus(target: Engine) -> InvalidationBus:
+    if target.dialect.name == "postgresql":
+        if target.dialect.driver != "psycopg2":
+            logger.warning(f"Invalidation bus needs psycopg2 for LISTEN, got {target.dialect.driver}: local only")
+            return InvalidationBus()
+        return PostgresInvalidationBus(target, settings.INVALIDATION_CHANNEL)
+    return InvalidationBus()
+
+
+invalidation_bus = create_bus(engine)
+
+
+def _send_pending(session: Session) -> None:
+    if not invalidation_bus.remote:
+        return
+    pending = session.info.get(_PENDING_KEY)
+    sent = session.info.get(_SENT_KEY, 0)
+    if pending and sent < len(pending):
+        invalidation_bus.send(pending[sent:], connection=session.connection())
+        session.info[_SENT_KEY] = len(pending)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _after_flush_postexec(session, flush_context):
+    # Émis dans la transaction : PostgreSQL ne délivre NOTIFY qu'au commit
+    _send_pending(session)
+
+
+@event.listens_for(Session, "before_commit")
+def _before_commit(session):
+    # Messages publiés hors flush (insert()/update() exécutés par la session)
+    _send_pending(session)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session):
+    session.info.pop(_SENT_KEY, None)
+    for topic, payload in session.info.pop(_PENDING_KEY, ()):
+        invalidation_bus.dispatch(topic, payload)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_SENT_KEY, None)
@@ -0,0 +1,275 @@
+"""Métriques au format d'exposition Prometheus (texte).
+
+Chaque thread écrit dans son propre fragment (``threading.local``) : une
+observation ne prend aucun verrou. Les fragments ne sont fusionnés qu'au
+moment de la collecte, lors d'un appel à ``/metrics``.
+"""
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+# Bornes par défaut des histogrammes de latence (secondes)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    """Base des métriques : un fragment de valeurs par thread."""
+
+    type_name = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards: List[Dict] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> Dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            shard = {}
+            # Verrou pris une seule fois par thread, à la création du fragment
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+            return shard
+
+    def _shard_items(self) -> Iterable[Tuple[Tuple, object]]:
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            # list() sur un dict est atomique sous le GIL
+            yield from list(shard.items())
+
+    def reset(self) -> None:
+        with self._shards_lock:
+            for shard in self._shards:
+                shard.clear()
+
+    def header(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type_name}",
+        ]
+
+    def collect(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        shard = self._shard()
+        shard[labelvalues] = shard.get(labelvalues, 0) + amount
+
+    def values(self) -> Dict[Tuple, float]:
+        totals: Dict[Tuple, float] = {}
+        for labels, value in self._shard_items():
+            totals[labels] = totals.get(labels, 0) + value
+        return totals
+
+    def collect(self) -> List[str]:
+        lines = self.header()
+        for labels, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Gauge(Counter):
+    """Jauge incrémentée/décrémentée (somme des fragments)."""
+
+    type_name = "gauge"
+
+    def dec(self, *labelvalues: str, amount: float = 1) -> None:
+        self.inc(*labelvalues, amount=-amount)
+
+
+class CallbackMetric(_Metric):
+    """Métrique dont les valeurs sont lues au moment de la collecte."""
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], Dict[Tuple, float]],
+                 labelnames: Sequence[str] = (), type_name: str = "gauge"):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+        self.type_name = type_name
+
+    def collect(self) -> List[str]:
+        lines = self.header()
+        for labels, value in sorted(self.callback().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        shard = self._shard()
+        counts = shard.get(labelvalues)
+        if counts is None:
+            # Un compteur par borne, un pour +Inf, puis la somme
+            counts = shard[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def collect(self) -> List[str]:
+        merged: Dict[Tuple, List[float]] = {}
+        for labels, counts in self._shard_items():
+            total = merged.get(labels)
+            if total is None:
+                merged[labels] = list(counts)
+            else:
+                for i, value in enumerate(counts):
+                    total[i] += value
+
+        lines = self.header()
+        label_names = self.labelnames + ("le",)
+        for labels, counts in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(float(bound))
+                lines.append(f"{self.name}_bucket{_format_labels(label_names, labels + (le,))} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(counts[-1])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """Ensemble des métriques exposées par ``/metrics``."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str) -> _Metric:
+        return self._metrics[name]
+
+    def exposition(self) -> str:
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "Durée des requêtes HTTP par route, méthode et statut",
+    ("route", "method", "status")
+))
+http_requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight",
+    "Requêtes HTTP en cours de traitement"
+))
+firebase_verification_duration = registry.register(Histogram(
+    "firebase_token_verification_seconds",
+    "Durée de vérification des tokens Firebase",
+    ("app_type", "result")
+))
+http_requests_rejected = registry.register(Counter(
+    "http_requests_rejected_total",
+    "Requêtes refusées par la limitation de débit (429) ou le délestage (503)",
+    ("reason",)
+))
+http_requests_coalesced = registry.register(Counter(
+    "http_requests_coalesced_total",
+    "Lectures identiques simultanées : exécutées (leader) ou servies par une exécution en cours (shared)",
+    ("function", "result")
+))
+query_cache_requests = registry.register(Counter(
+    "query_cache_requests_total",
+    "Consultations du cache de requêtes : trouvées (hit), absentes (miss), invalidées (stale)",
+    ("query", "result")
+))
+compression_cache_requests = registry.register(Counter(
+    "http_compression_cache_requests_total",
+    "Consultations du cache de réponses précompressées",
+    ("result",)
+))
+
+
+def register_pool_metrics(engine) -> None:
+    """Expose l'état du pool de connexions d'un moteur SQLAlchemy."""
+    pool = engine.pool
+
+    def read(attribute: str) -> Callable[[], Dict[Tuple, float]]:
+        def callback() -> Dict[Tuple, float]:
+            # Tous les types de pool n'exposent pas ces compteurs (ex: SQLite en mémoire)
+            method = getattr(pool, attribute, None)
+            return {(): method()} if callable(method) else {}
+        return callback
+
+    registry.register(CallbackMetric(
+        "db_pool_size", "Taille configurée du pool de connexions", read("size")))
+    registry.register(CallbackMetric(
+        "db_pool_checked_out", "Connexions actuellement empruntées au pool", read("checkedout")))
+    registry.register(CallbackMetric(
+        "db_pool_checked_in", "Connexions disponibles dans le pool", read("checkedin")))
+    registry.register(CallbackMetric(
+        "db_pool_overflow", "Connexions ouvertes au-delà de la taille du pool", read("overflow")))
+
+
+def register_query_metrics(route_totals: Callable[[], Dict]) -> None:
+    """Expose les cumuls SQL par route de l'instrumentation."""
+
+    def read(attribute: str) -> Callable[[], Dict[Tuple, float]]:
+        def callback() -> Dict[Tuple, float]:
+            return {
+                (route,): getattr(totals, attribute)
+                for route, totals in route_totals().items()
+            }
+        return callback
+
+    registry.register(CallbackMetric(
+        "db_queries_total", "Requêtes SQL exécutées par route",
+        read("queries"), ("route",), type_name="counter"))
+    registry.register(CallbackMetric(
+        "db_query_duration_seconds_total", "Temps passé en base par route",
+        read("duration"), ("route",), type_name="counter"))
+    registry.register(CallbackMetric(
+        "db_n_plus_one_requests_total", "Requêtes HTTP avec instructions SQL répétées (N+1) par route",
+        read("n_plus_one_requests"), ("route",), type_name="counter"))
+
+
+def register_query_cache_metrics(cache_stats: Callable[[], dict]) -> None:
+    """Expose la taille du cache de requêtes."""
+
+    def read(key: str) -> Callable[[], Dict[Tuple, float]]:
+        def callback() -> Dict[Tuple, float]:
+            return {(): cache_stats()[key]}
+        return callback
+
+    registry.register(CallbackMetric(
+        "query_cache_entries", "Résultats conservés dans le cache de requêtes", read("entries")))
+    registry.register(CallbackMetric(
+        "query_cache_bytes", "Mémoire occupée par les résultats en cache (octets)", read("bytes")))
@@ -0,0 +1,211 @@
+"""Profilage échantillonné d'une requête HTTP isolée, à la demande.
+
+Un thread échantillonne périodiquement (``sys._current_frames``) la pile des
+threads qui exécutent la requête : le thread de la boucle d'événements, puis
+chaque thread qui exécute du SQL pour son compte. Les piles sont agrégées en
+arbre d'appels. Le temps passé en SQL est mesuré par des événements
+SQLAlchemy qui, sans profilage en cours, s'arrêtent à la lecture d'une
+variable de contexte.
+
+Sous charge, les échantillons du thread de la boucle peuvent inclure d'autres
+requêtes servies en même temps : l'arbre est une indication, pas un compte exact.
+"""
+import sys
+import time
+import uuid
+import threading
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+
+# Profondeur maximale des piles échantillonnées
+MAX_STACK_DEPTH = 128
+# Instructions SQL les plus coûteuses conservées par profil
+TOP_STATEMENTS = 10
+
+_current_profiler: ContextVar[Optional["RequestProfiler"]] = ContextVar("request_profiler", default=None)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+
+
+def _stack(frame) -> Tuple[str, ...]:
+    """Pile d'appels, de la racine vers la fonction en cours."""
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return tuple(reversed(labels))
+
+
+def build_call_tree(samples: Dict[Tuple[str, ...], int], interval: float) -> dict:
+    """Arbre d'appels agrégé ; chaque nœud porte son nombre d'échantillons et le temps estimé."""
+    root = {"function": "<requête>", "samples": 0, "children": {}}
+    for stack, count in samples.items():
+        root["samples"] += count
+        node = root
+        for label in stack:
+            node = node["children"].setdefault(label, {"function": label, "samples": 0, "children": {}})
+            node["samples"] += count
+
+    def finalize(node: dict) -> dict:
+        return {
+            "function": node["function"],
+            "samples": node["samples"],
+            "estimated_ms": round(node["samples"] * interval * 1000, 2),
+            "children": sorted(
+                (finalize(child) for child in node["children"].values()),
+                key=lambda child: -child["samples"]
+            ),
+        }
+
+    return finalize(root)
+
+
+class RequestProfiler:
+    """Échantillonneur de pile d'une requête et temps SQL associé."""
+
+    def __init__(self, interval: Optional[float] = None):
+        self.interval = interval or settings.PROFILING_SAMPLE_INTERVAL_SECONDS
+        self.thread_ids: Set[int] = {threading.get_ident()}
+        self.samples: Counter = Counter()
+        self.sql_count = 0
+        self.sql_duration = 0.0
+        self.sql_statements: Dict[str, List[float]] = {}
+        self.started_at = datetime.now(timezone.utc)
+        self._start = 0.0
+        self.duration = 0.0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._sample, name="request-profiler", daemon=True)
+
+    def _sample(self) -> None:
+        while not self._stopped.wait(self.interval):
+            frames = sys._current_frames()
+            for thread_id in tuple(self.thread_ids):
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.samples[_stack(frame)] += 1
+
+    def record_sql(self, statement: str, duration: float) -> None:
+        self.sql_count += 1
+        self.sql_duration += duration
+        entry = self.sql_statements.setdefault(statement, [0, 0.0])
+        entry[0] += 1
+        entry[1] += duration
+
+    def start(self) -> None:
+        self._start = time.perf_counter()
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self._thread.join()
+        self.duration = time.perf_counter() - self._start
+
+    def report(self, **details) -> dict:
+        statements = sorted(self.sql_statements.items(), key=lambda item: -item[1][1])[:TOP_STATEMENTS]
+        return {
+            **details,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration * 1000, 2),
+            "sample_interval_ms": round(self.interval * 1000, 2),
+            "samples": sum(self.samples.values()),
+            "sql": {
+                "count": self.sql_count,
+                "duration_ms": round(self.sql_duration * 1000, 2),
+                "statements": [
+                    {"statement": " ".join(statement.split()), "count": count,
+                     "duration_ms": round(duration * 1000, 2)}
+                    for statement, (count, duration) in statements
+                ],
+            },
+            "call_tree": build_call_tree(self.samples, self.interval),
+        }
+
+
+class ProfileStore:
+    """Derniers profils capturés (tampon circulaire)."""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self._entries: Deque[dict] = deque(maxlen=max_entries or settings.PROFILING_MAX_ENTRIES)
+        self._lock = threading.Lock()
+
+    def add(self, profile: dict) -> None:
+        with self._lock:
+            self._entries.append(profile)
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        with self._lock:
+            return next((entry for entry in self._entries if entry["id"] == profile_id), None)
+
+    def summaries(self) -> List[dict]:
+        """Profils du plus récent au plus ancien, sans leur arbre d'appels."""
+        with self._lock:
+            entries = list(self._entries)
+        return [
+            {key: value for key, value in entry.items() if key != "call_tree"}
+            for entry in reversed(entries)
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+profile_store = ProfileStore()
+
+
+def new_profile_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+def current_profiler() -> Optional[RequestProfiler]:
+    return _current_profiler.get()
+
+
+def activate(profiler: RequestProfiler):
+    """Rattache le profileur au contexte courant (propagé aux threads du threadpool)."""
+    return _current_profiler.set(profiler)
+
+
+def deactivate(token) -> None:
+    _current_profiler.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profiler = _current_profiler.get()
+    if profiler is not None:
+        # Le thread qui exécute du SQL pour la requête est échantillonné lui aussi
+        profiler.thread_ids.add(threading.get_ident())
+        conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profiler = _current_profiler.get()
+    if profiler is None:
+        return
+    start_times = conn.info.get("profile_query_start")
+    if start_times:
+        profiler.record_sql(statement, time.perf_counter() - start_times.pop())
+
+
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("profile_query_start"):
+        connection.info["profile_query_start"].pop()
+
+
+# Enregistrés une fois pour toutes : modifier les écouteurs d'Engine pendant que
+# d'autres threads exécutent des requêtes n'est pas pris en charge. Sans
+# profilage en cours, ils s'arrêtent à la lecture de la variable de contexte.
+event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+event.listen(Engine, "handle_error", _handle_error)
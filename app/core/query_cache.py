@@ -0,0 +1,347 @@
+"""Cache des résultats de lecture, invalidé par version de table.
+
+Un résultat est indexé par un nom de requête et ses paramètres, et porte les
+versions des tables dont il dépend au moment de sa lecture. Chaque table a
+un compteur de version, incrémenté par les événements de session SQLAlchemy
+(``after_flush``, écritures groupées ``insert()/update()/delete()``, puis de
+nouveau au commit) : une écriture dans ``scores`` invalide exactement les
+résultats qui dépendent de ``scores``, sans toucher aux autres. Les tables
+écrites sont publiées sur le bus d'invalidation : les autres workers
+incrémentent aussi leurs versions.
+
+Les résultats sont conservés sérialisés en JSON : la mémoire occupée est
+mesurée exactement et un résultat lu du cache ne peut pas être modifié par
+l'appelant. Deux stockages :
+
+- ``memory`` : LRU en mémoire du worker, borné en entrées et en octets ;
+- ``sqlite`` : fichier SQLite local partagé par les workers d'une même
+  machine, versions de tables comprises (un worker voit les écritures des
+  autres).
+"""
+import json
+import time
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import chain
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .database import replica_router
+from .invalidation import RESYNC_TOPIC, invalidation_bus
+from .metrics import query_cache_requests
+
+Versions = Dict[str, int]
+
+
+class CacheBackend:
+    """Stockage des résultats et des versions de tables."""
+
+    # Partagé par les workers : les écritures des autres y sont déjà visibles
+    shared = False
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Versions]]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, versions: Versions, ttl: float) -> None:
+        raise NotImplementedError
+
+    def versions(self, tables: Iterable[str]) -> Versions:
+        raise NotImplementedError
+
+    def bump(self, tables: Iterable[str]) -> None:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """LRU en mémoire avec expiration, borné en nombre d'entrées et en octets."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[bytes, Versions, float]]" = OrderedDict()
+        self._versions: Versions = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Versions]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, versions, expires_at = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value, versions
+
+    def set(self, key: str, value: bytes, versions: Versions, ttl: float) -> None:
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, versions, time.monotonic() + ttl)
+            self._bytes += len(value)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        value, _, _ = self._entries.pop(key)
+        self._bytes -= len(value)
+
+    def versions(self, tables: Iterable[str]) -> Versions:
+        with self._lock:
+            return {table: self._versions.get(table, 0) for table in tables}
+
+    def bump(self, tables: Iterable[str]) -> None:
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._bytes = 0
+
+
+class SQLiteBackend(CacheBackend):
+    """Fichier SQLite local partagé par les workers d'une machine (WAL, une connexion par thread)."""
+
+    shared = True
+
+    def __init__(self, path: str, max_entries: int, max_bytes: int):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        with self._transaction() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, "
+                "versions TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS ix_entries_accessed_at ON entries (accessed_at)")
+            connection.execute("CREATE TABLE IF NOT EXISTS versions (name TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=OFF")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def get(self, key: str) -> Optional[Tuple[bytes, Versions]]:
+        # Horloge murale : partagée par les processus, contrairement à monotonic()
+        now = time.time()
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT value, versions FROM entries WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        connection.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0], json.loads(row[1])
+
+    def set(self, key: str, value: bytes, versions: Versions, ttl: float) -> None:
+        if len(value) > self.max_bytes:
+            return
+        now = time.time()
+        with self._transaction() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO entries (key, value, versions, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, json.dumps(versions), now + ttl, now)
+            )
+            connection.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+            count, size = connection.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM entries"
+            ).fetchone()
+            # Éviction des moins récemment lus jusqu'à repasser sous les deux bornes
+            while count > self.max_entries or size > self.max_bytes:
+                old_key, old_size = connection.execute(
+                    "SELECT key, LENGTH(value) FROM entries ORDER BY accessed_at LIMIT 1"
+                ).fetchone()
+                connection.execute("DELETE FROM entries WHERE key = ?", (old_key,))
+                count -= 1
+                size -= old_size
+
+    def versions(self, tables: Iterable[str]) -> Versions:
+        tables = list(tables)
+        placeholders = ",".join("?" * len(tables))
+        rows = self._connection().execute(
+            f"SELECT name, version FROM versions WHERE name IN ({placeholders})", tables
+        ).fetchall()
+        found = dict(rows)
+        return {table: found.get(table, 0) for table in tables}
+
+    def bump(self, tables: Iterable[str]) -> None:
+        with self._transaction() as connection:
+            connection.executemany(
+                "INSERT INTO versions (name, version) VALUES (?, 1) "
+                "ON CONFLICT(name) DO UPDATE SET version = version + 1",
+                [(table,) for table in tables]
+            )
+
+    def stats(self) -> dict:
+        count, size = self._connection().execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM entries"
+        ).fetchone()
+        return {"entries": count, "bytes": size}
+
+    def clear(self) -> None:
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM entries")
+            connection.execute("DELETE FROM versions")
+
+
+def create_backend() -> CacheBackend:
+    if settings.QUERY_CACHE_BACKEND == "sqlite":
+        return SQLiteBackend(settings.QUERY_CACHE_SQLITE_PATH, settings.QUERY_CACHE_MAX_ENTRIES,
+                             settings.QUERY_CACHE_MAX_BYTES)
+    if settings.QUERY_CACHE_BACKEND != "memory":
+        raise ValueError(f"QUERY_CACHE_BACKEND inconnu : {settings.QUERY_CACHE_BACKEND}")
+    return MemoryBackend(settings.QUERY_CACHE_MAX_ENTRIES, settings.QUERY_CACHE_MAX_BYTES)
+
+
+class QueryCache:
+    """Résultats de lecture indexés par nom de requête et paramètres."""
+
+    def __init__(self, backend: Optional[CacheBackend] = None):
+        self._backend = backend
+        self._backend_lock = threading.Lock()
+
+    @property
+    def backend(self) -> CacheBackend:
+        # Créé au premier usage : la configuration peut encore changer à l'import
+        if self._backend is None:
+            with self._backend_lock:
+                if self._backend is None:
+                    self._backend = create_backend()
+        return self._backend
+
+    def get_or_load(self, name: str, params: dict, tables: Iterable[str], loader: Callable[[], Any],
+                    ttl: Optional[float] = None, db: Optional[Session] = None) -> Any:
+        """Résultat en cache s'il est encore valide, sinon ``loader()`` (mis en cache).
+
+        ``tables`` liste toutes les tables lues par ``loader`` : une écriture
+        dans l'une d'elles invalide le résultat. Le résultat est renvoyé sous
+        sa forme JSON (dicts, listes), qu'il vienne du cache ou de ``loader``.
+
+        ``db`` est la session utilisée par ``loader``. Si elle lit une réplica,
+        le résultat est renvoyé sans être mis en cache. Une réplica en retard
+        sur les versions déjà incrémentées par le primaire y enregistrerait
+        d'anciennes données comme fraîches.
+        """
+        if not settings.QUERY_CACHE_ENABLED:
+            return jsonable_encoder(loader())
+
+        key = f"{name}:{json.dumps(params, sort_keys=True, default=str)}"
+        backend = self.backend
+        # Versions lues avant le chargement : une écriture pendant celui-ci rend l'entrée périmée
+        versions = backend.versions(tables)
+        cached = backend.get(key)
+        if cached is not None:
+            value, cached_versions = cached
+            if cached_versions == versions:
+                query_cache_requests.inc(name, "hit")
+                return json.loads(value)
+            query_cache_requests.inc(name, "stale")
+        else:
+            query_cache_requests.inc(name, "miss")
+
+        result = jsonable_encoder(loader())
+        if db is not None and replica_router.is_replica(db.get_bind()):
+            return result
+        backend.set(key, json.dumps(result, separators=(",", ":")).encode(), versions,
+                    settings.QUERY_CACHE_TTL_SECONDS if ttl is None else ttl)
+        return result
+
+    def invalidate_tables(self, tables: Iterable[str]) -> None:
+        tables = set(tables)
+        if tables:
+            self.backend.bump(tables)
+
+    def stats(self) -> dict:
+        """Taille du cache et taux de succès par requête (depuis le démarrage du worker)."""
+        counts: Dict[str, Dict[str, int]] = {}
+        for (name, result), value in query_cache_requests.values().items():
+            counts.setdefault(name, {"hit": 0, "miss": 0, "stale": 0})[result] = int(value)
+        queries = {}
+        for name, by_result in sorted(counts.items()):
+            total = sum(by_result.values())
+            queries[name] = {**by_result, "hit_rate": round(by_result["hit"] / total, 4) if total else 0.0}
+        return {"backend": settings.QUERY_CACHE_BACKEND, **self.backend.stats(), "queries": queries}
+
+    def clear(self) -> None:
+        self.backend.clear()
+
+
+query_cache = QueryCache()
+
+
+def _written_tables(session: Session) -> set:
+    tables = set()
+    for instance in chain(session.new, session.deleted,
+                          (instance for instance in session.dirty if session.is_modified(instance))):
+        tables.update(table.name for table in inspect(instance).mapper.tables)
+    return tables
+
+
+@event.listens_for(Session, "after_flush")
+def _after_flush(session, flush_context):
+    tables = _written_tables(session)
+    if tables:
+        query_cache.invalidate_tables(tables)
+        # Nouvelle invalidation au commit (ici et dans les autres workers) : un
+        # résultat lu entre le flush et le commit (ancien état, nouvelle version) ne survit pas
+        invalidation_bus.publish("tables", {"tables": sorted(tables)}, session=session)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _do_orm_execute(orm_execute_state):
+    # insert()/update()/delete() exécutés par la session, hors unité de travail
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        table = orm_execute_state.statement.table
+        query_cache.invalidate_tables({table.name})
+        invalidation_bus.publish("tables", {"tables": [table.name]}, session=orm_execute_state.session)
+
+
+@invalidation_bus.subscriber("tables")
+def _invalidate_tables(payload: dict) -> None:
+    query_cache.invalidate_tables(payload["tables"])
+
+
+@invalidation_bus.subscriber(RESYNC_TOPIC)
+def _resync(payload: dict) -> None:
+    if not query_cache.backend.shared:
+        query_cache.clear()
@@ -0,0 +1,120 @@
+"""Limitation de débit (seaux à jetons) et délestage par concurrence.
+
+Les seaux sont tenus en mémoire par worker : par utilisateur (token), par clé
+API, par client anonyme (adresse IP) et par route. Le délestage borne le
+nombre de requêtes en cours ; une part de cette capacité est réservée aux
+bornes, dont les appels (file d'attente, statut des réservations) font
+tourner les machines.
+"""
+import math
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from .config import settings
+
+
+class TokenBucket:
+    """Seau à jetons : ``rate`` jetons par seconde, au plus ``capacity`` en réserve."""
+
+    __slots__ = ("rate", "capacity", "tokens", "updated_at")
+
+    def __init__(self, rate: float, capacity: float, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = now
+
+    def take(self, now: float) -> float:
+        """Consomme un jeton ; retourne 0 si accordé, sinon l'attente (s) avant le prochain jeton."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Ensemble de seaux indexés par clé, bornés en nombre (les moins récents sont oubliés)."""
+
+    def __init__(self, max_keys: Optional[int] = None, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys or settings.RATE_LIMIT_MAX_KEYS
+        self.clock = clock
+        self._buckets: "OrderedDict[Tuple[str, str], TokenBucket]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def check(self, kind: str, key: str, rate: float, capacity: float) -> float:
+        """0 si la requête est admise, sinon le délai (s) à indiquer dans Retry-After."""
+        now = self.clock()
+        with self._lock:
+            bucket = self._buckets.get((kind, key))
+            if bucket is None:
+                bucket = self._buckets[(kind, key)] = TokenBucket(rate, capacity, now)
+                if len(self._buckets) > self.max_keys:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end((kind, key))
+            return bucket.take(now)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class ConcurrencyLimiter:
+    """Requêtes en cours, avec une réserve accessible aux seules requêtes prioritaires."""
+
+    def __init__(self, max_concurrency: Optional[int] = None, reserved: Optional[int] = None):
+        self._max_concurrency = max_concurrency
+        self._reserved = reserved
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_concurrency(self) -> int:
+        if self._max_concurrency is not None:
+            return self._max_concurrency
+        # Par défaut : une requête en cours par connexion du pool
+        return settings.LOAD_SHED_MAX_CONCURRENCY or settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW
+
+    @property
+    def reserved(self) -> int:
+        return self._reserved if self._reserved is not None else settings.LOAD_SHED_KIOSK_RESERVED
+
+    def acquire(self, priority: bool) -> bool:
+        limit = self.max_concurrency if priority else self.max_concurrency - self.reserved
+        with self._lock:
+            if self.in_flight >= limit:
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.in_flight = 0
+
+
+def parse_route_limits(value: str) -> Dict[str, Tuple[float, float]]:
+    """``"/api/v1/arcades/=100:200,/api/v1/scores/=100:200"`` -> {route: (débit, rafale)}."""
+    limits = {}
+    for item in value.split(","):
+        route, _, limit = item.strip().rpartition("=")
+        if not route:
+            continue
+        rate, _, burst = limit.partition(":")
+        limits[route] = (float(rate), float(burst or rate))
+    return limits
+
+
+def retry_after_header(delay: float) -> str:
+    return str(max(1, math.ceil(delay)))
+
+
+rate_limiter = RateLimiter()
+concurrency_limiter = ConcurrencyLimiter()
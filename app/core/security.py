@@ -1,9 +1,11 @@
 import firebase_admin
 from firebase_admin import credentials, auth
 from .config import settings
+from .metrics import firebase_verification_duration
 from typing import Optional
 import logging
 import os
+import time
 
 logger = logging.getLogger(__name__)
 
@@ -56,15 +58,18 @@ def verify_firebase_token(token: str, app_type: str = "user") -> Optional[dict]:
     Returns:
         Dict contenant les infos utilisateur ou None si invalide
     """
+    start = time.perf_counter()
     try:
         app = firebase_user_app if app_type == "user" else firebase_admin_app
         decoded_token = auth.verify_id_token(token, app=app)
+        firebase_verification_duration.observe(time.perf_counter() - start, app_type, "valid")
         return {
             "uid": decoded_token["uid"],
             "email": decoded_token.get("email"),
             "email_verified": decoded_token.get("email_verified", False)
         }
     except Exception as e:
+        firebase_verification_duration.observe(time.perf_counter() - start, app_type, "invalid")
         logger.warning(f"Token verification failed: {e}")
         return None
 
@@ -0,0 +1,187 @@
+"""Journal des requêtes SQL lentes.
+
+Toute instruction plus longue que ``SLOW_QUERY_THRESHOLD_MS`` est conservée
+dans un tampon circulaire avec la route HTTP qui l'a émise et ses paramètres
+masqués (les chaînes, qui peuvent contenir des données personnelles, sont
+remplacées par leur type et leur longueur). Si ``SLOW_QUERY_EXPLAIN`` est
+activé, le plan d'exécution des SELECT est capturé en arrière-plan, sur une
+autre connexion, sans ralentir la requête d'origine.
+"""
+import time
+import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+from .instrumentation import QueryStats, current_stats
+
+logger = logging.getLogger(__name__)
+
+# Valeurs conservées telles quelles : identifiants, montants, dates, booléens
+_PLAIN_TYPES = (bool, int, float, Decimal, date, datetime, type(None))
+
+
+def redact(value: Any) -> Any:
+    """Paramètre masqué : les chaînes et binaires sont remplacés par leur longueur."""
+    if isinstance(value, _PLAIN_TYPES):
+        return value.isoformat() if isinstance(value, (date, datetime)) else value
+    if isinstance(value, str):
+        return f"<str len={len(value)}>"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return f"<bytes len={len(value)}>"
+    if isinstance(value, (list, tuple)):
+        return [redact(item) for item in value]
+    if isinstance(value, dict):
+        return {key: redact(item) for key, item in value.items()}
+    return f"<{type(value).__name__}>"
+
+
+class SlowQuery:
+    """Instruction lente ; la route est résolue à la lecture (connue en fin de requête)."""
+
+    __slots__ = ("statement", "parameters", "duration", "executemany", "recorded_at", "_stats", "plan")
+
+    def __init__(self, statement: str, parameters: Any, duration: float, executemany: bool,
+                 stats: Optional[QueryStats]):
+        self.statement = statement
+        self.parameters = parameters
+        self.duration = duration
+        self.executemany = executemany
+        self.recorded_at = datetime.now(timezone.utc)
+        self._stats = stats
+        self.plan: Optional[List[str]] = None
+
+    @property
+    def route(self) -> Optional[str]:
+        return self._stats.route if self._stats is not None else None
+
+    def to_dict(self) -> dict:
+        return {
+            "statement": " ".join(self.statement.split()),
+            "parameters": self.parameters,
+            "duration_ms": round(self.duration * 1000, 2),
+            "executemany": self.executemany,
+            "route": self.route,
+            "recorded_at": self.recorded_at.isoformat(),
+            "plan": self.plan,
+        }
+
+
+class SlowQueryLog:
+    """Dernières requêtes lentes (tampon circulaire)."""
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self._entries: Deque[SlowQuery] = deque(maxlen=max_entries or settings.SLOW_QUERY_LOG_SIZE)
+        self._lock = threading.Lock()
+
+    def add(self, entry: SlowQuery) -> None:
+        with self._lock:
+            self._entries.append(entry)
+
+    def entries(self, route: Optional[str] = None) -> List[SlowQuery]:
+        """Entrées de la plus récente à la plus ancienne, éventuellement filtrées par route."""
+        with self._lock:
+            entries = list(self._entries)
+        return [entry for entry in reversed(entries) if route is None or entry.route == route]
+
+    def summary(self) -> List[dict]:
+        """Instructions lentes regroupées, de la plus coûteuse (temps cumulé) à la moins coûteuse."""
+        groups: Dict[str, dict] = {}
+        for entry in self.entries():
+            statement = " ".join(entry.statement.split())
+            group = groups.setdefault(statement, {
+                "statement": statement, "count": 0, "total_ms": 0.0, "max_ms": 0.0, "routes": set()
+            })
+            duration_ms = entry.duration * 1000
+            group["count"] += 1
+            group["total_ms"] += duration_ms
+            group["max_ms"] = max(group["max_ms"], duration_ms)
+            if entry.route:
+                group["routes"].add(entry.route)
+
+        return [
+            {
+                "statement": group["statement"],
+                "count": group["count"],
+                "total_ms": round(group["total_ms"], 2),
+                "avg_ms": round(group["total_ms"] / group["count"], 2),
+                "max_ms": round(group["max_ms"], 2),
+                "routes": sorted(group["routes"]),
+            }
+            for group in sorted(groups.values(), key=lambda group: -group["total_ms"])
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+slow_query_log = SlowQueryLog()
+
+# Un seul thread : les EXPLAIN passent l'un après l'autre, sans saturer le pool
+_explain_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+# File bornée : base lente, chaque SELECT est lent ; au-delà, le plan n'est pas capturé
+_EXPLAIN_MAX_PENDING = 16
+_explain_slots = threading.BoundedSemaphore(_EXPLAIN_MAX_PENDING)
+
+
+def _explain(engine: Engine, entry: SlowQuery, raw_parameters: Any) -> None:
+    prefix = "EXPLAIN QUERY PLAN" if engine.dialect.name == "sqlite" else "EXPLAIN"
+    try:
+        with engine.connect() as connection:
+            rows = connection.exec_driver_sql(f"{prefix} {entry.statement}", raw_parameters).fetchall()
+        # SQLite : (id, parent, notused, detail) ; PostgreSQL : une ligne de texte par nœud
+        entry.plan = [str(row[-1]) for row in rows]
+    except Exception as e:
+        logger.warning(f"Slow query EXPLAIN failed: {e}")
+    finally:
+        _explain_slots.release()
+
+
+def flush_explains(timeout: Optional[float] = None) -> None:
+    """Attend la fin des EXPLAIN en cours (tests, arrêt propre)."""
+    _explain_executor.submit(lambda: None).result(timeout)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+        conn.info.setdefault("slow_query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get("slow_query_start")
+    if not start_times:
+        return
+    duration = time.perf_counter() - start_times.pop()
+    if duration * 1000 < settings.SLOW_QUERY_THRESHOLD_MS or statement.lstrip().upper().startswith("EXPLAIN"):
+        return
+
+    # executemany : seul le premier jeu de paramètres est conservé
+    shown = parameters[0] if executemany and parameters else parameters
+    entry = SlowQuery(statement, redact(shown), duration, executemany, current_stats())
+    slow_query_log.add(entry)
+    logger.warning(
+        "Requête lente (%.1f ms) : %s", duration * 1000, " ".join(statement.split())[:200]
+    )
+
+    if settings.SLOW_QUERY_EXPLAIN and not executemany and statement.lstrip().upper().startswith("SELECT"):
+        if _explain_slots.acquire(blocking=False):
+            _explain_executor.submit(_explain, conn.engine, entry, parameters)
+        else:
+            logger.debug("File des EXPLAIN pleine, plan non capturé")
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("slow_query_start"):
+        connection.info["slow_query_start"].pop()
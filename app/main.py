@@ -1,30 +1,82 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from app.core.config import settings
+from app.core.database import engine, warm_up_pool, pool_status, ping_database
+from app.core.instrumentation import route_totals
+from app.core.metrics import registry, register_pool_metrics, register_query_metrics, register_query_cache_metrics
+from app.core.query_cache import query_cache
+from app.core.invalidation import invalidation_bus
 from app.core.security import init_firebase
-from app.api.v1 import auth, users, friends, tickets, games, arcades, reservations, scores, promos, admin
+from app.api.middleware import (
+    QueryStatsMiddleware, MetricsMiddleware, ProfilingMiddleware, CompressionMiddleware, RateLimitMiddleware
+)
+from app.api.v1 import auth, users, me, friends, tickets, games, arcades, reservations, scores, promos, admin
 
 # Initialisation Firebase
 init_firebase()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Ouvrir les connexions du pool avant de recevoir du trafic
+    if settings.DB_POOL_WARMUP:
+        await run_in_threadpool(warm_up_pool, engine)
+    # Écoute des invalidations publiées par les autres workers
+    invalidation_bus.start()
+    yield
+    invalidation_bus.stop()
+
+
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.VERSION,
-    debug=settings.DEBUG
+    debug=settings.DEBUG,
+    lifespan=lifespan
 )
 
-# CORS
+# Instrumentation SQL par requête
+app.add_middleware(QueryStatsMiddleware)
+
+# Métriques de latence par route
+app.add_middleware(MetricsMiddleware)
+register_pool_metrics(engine)
+register_query_metrics(route_totals)
+register_query_cache_metrics(lambda: query_cache.backend.stats())
+
+# Profilage d'une requête à la demande d'un administrateur
+app.add_middleware(ProfilingMiddleware)
+
+# Compression des réponses ; le catalogue public est gardé précompressé
+app.add_middleware(
+    CompressionMiddleware,
+    cacheable_routes={"/api/v1/games/", "/api/v1/arcades/", "/api/v1/tickets/offers"}
+)
+
+# Limitation de débit et délestage en premier : une requête refusée ne coûte presque rien
+app.add_middleware(
+    RateLimitMiddleware,
+    pool_saturation=lambda: pool_status(engine).get("saturation", 0.0)
+)
+
+# CORS en dernier, donc le plus à l'extérieur : les 429/503 du limiteur portent
+# les en-têtes CORS et les requêtes préliminaires OPTIONS ne consomment pas de jetons
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Lisibles par le navigateur : curseur de pagination des amis, délai des 429/503
+    expose_headers=["X-Next-Cursor", "Retry-After"],
 )
 
 # Routes
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["users"])
+app.include_router(me.router, prefix="/api/v1/me", tags=["me"])
 app.include_router(friends.router, prefix="/api/v1/friends", tags=["friends"])
 app.include_router(tickets.router, prefix="/api/v1/tickets", tags=["tickets"])
 app.include_router(games.router, prefix="/api/v1/games", tags=["games"])
@@ -42,4 +94,38 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+@app.get("/health/ready")
+def readiness_check(response: Response):
+    """Indique si l'instance peut recevoir du trafic (pool non saturé, base joignable).
+
+    Répond 503 lorsque le pool est saturé ou la base injoignable, afin que le
+    load balancer retire l'instance de la rotation.
+    """
+    pool = pool_status(engine)
+    saturated = pool.get("saturation", 0.0) >= settings.DB_POOL_SATURATION_THRESHOLD
+
+    # Inutile d'attendre une connexion d'un pool déjà saturé
+    round_trip_ms = None if saturated else ping_database(engine)
+    ready = not saturated and round_trip_ms is not None
+
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    return {
+        "status": "ready" if ready else "not_ready",
+        "pool": pool,
+        "pool_saturated": saturated,
+        "database_round_trip_ms": round_trip_ms
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Exposition des métriques au format texte Prometheus."""
+    return PlainTextResponse(
+        registry.exposition(),
+        media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Float, Integer, ForeignKey
+from sqlalchemy import Column, String, Float, Integer, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
@@ -22,6 +22,14 @@ class Arcade(BaseModel):
 class ArcadeGame(BaseModel):
     """Table d'association entre Arcade et Game avec slot."""
     __tablename__ = "arcade_games"
+    __table_args__ = (
+        # Index des filtres chauds (voir migration 005)
+        Index(
+            "ix_arcade_games_arcade_id_slot_number", "arcade_id", "slot_number",
+            postgresql_where=text("is_deleted = false"),
+            sqlite_where=text("is_deleted = 0")
+        ),
+    )
 
     arcade_id = Column(Integer, ForeignKey("arcades.id"), nullable=False)
     game_id = Column(Integer, ForeignKey("games.id"), nullable=False)
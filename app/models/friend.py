@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, Enum, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, Enum, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 import enum
@@ -12,6 +12,19 @@ class FriendshipStatus(str, enum.Enum):
 
 class Friendship(BaseModel):
     __tablename__ = "friendships"
+    __table_args__ = (
+        # Index des filtres chauds (voir migration 005)
+        Index(
+            "ix_friendships_requester_id_status", "requester_id", "status",
+            postgresql_where=text("is_deleted = false"),
+            sqlite_where=text("is_deleted = 0")
+        ),
+        Index(
+            "ix_friendships_requested_id_status", "requested_id", "status",
+            postgresql_where=text("is_deleted = false"),
+            sqlite_where=text("is_deleted = 0")
+        ),
+    )
 
     requester_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     requested_id = Column(Integer, ForeignKey("users.id"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, String, Integer, Boolean, ForeignKey, DateTime, Index, text
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 from datetime import datetime, timezone
@@ -81,6 +81,14 @@ class PromoCode(BaseModel):
 
 class PromoUse(BaseModel):
     __tablename__ = "promo_uses"
+    __table_args__ = (
+        # Index des filtres chauds (voir migration 005)
+        Index(
+            "ix_promo_uses_user_id_promo_code_id", "user_id", "promo_code_id",
+            postgresql_where=text("is_deleted = false"),
+            sqlite_where=text("is_deleted = 0")
+        ),
+    )
 
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     promo_code_id = Column(Integer, ForeignKey("promo_codes.id"), nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, String, Enum
+from sqlalchemy import Column, Integer, ForeignKey, String, Enum, Index, text
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 import enum
@@ -13,6 +13,17 @@ class ReservationStatus(str, enum.Enum):
 
 class Reservation(BaseModel):
     __tablename__ = "reservations"
+    __table_args__ = (
+        # Index des filtres chauds (voir migration 005)
+        Index("ix_reservations_arcade_status_created_at", "arcade_id", "status", "created_at"),
+        Index(
+            "ix_reservations_waiting_queue", "arcade_id", "created_at",
+            postgresql_where=text("status = 'WAITING' AND is_deleted = false"),
+            sqlite_where=text("status = 'WAITING' AND is_deleted = 0")
+        ),
+        Index("ix_reservations_player_id", "player_id"),
+        Index("ix_reservations_player2_id", "player2_id"),
+    )
 
     player_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     player2_id = Column(Integer, ForeignKey("users.id"), nullable=True)
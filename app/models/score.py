@@ -1,10 +1,30 @@
-from sqlalchemy import Column, Integer, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index, text
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
 
 class Score(BaseModel):
     __tablename__ = "scores"
+    __table_args__ = (
+        # Index des filtres chauds (voir migration 005)
+        Index(
+            "ix_scores_player1_id_created_at", "player1_id", "created_at",
+            postgresql_where=text("is_deleted = false"),
+            sqlite_where=text("is_deleted = 0")
+        ),
+        Index(
+            "ix_scores_player2_id_created_at", "player2_id", "created_at",
+            postgresql_where=text("is_deleted = false"),
+            sqlite_where=text("is_deleted = 0")
+        ),
+        Index("ix_scores_game_id_created_at", "game_id", "created_at"),
+        Index("ix_scores_arcade_id_created_at", "arcade_id", "created_at"),
+        Index(
+            "ix_scores_created_at_active", "created_at",
+            postgresql_where=text("is_deleted = false"),
+            sqlite_where=text("is_deleted = 0")
+        ),
+    )
 
     player1_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     player2_id = Column(Integer, ForeignKey("users.id"), nullable=True)
@@ -1,10 +1,20 @@
-from sqlalchemy import Column, String, Date, Integer
+from sqlalchemy import Column, String, Date, Integer, Index, text
 from sqlalchemy.orm import relationship
 from .base import BaseModel
 
 
 class User(BaseModel):
     __tablename__ = "users"
+    __table_args__ = tuple(
+        # Index trigrammes de la recherche d'utilisateurs (voir migration 006, PostgreSQL uniquement)
+        Index(
+            f"ix_users_{column}_trgm", column,
+            postgresql_using="gin",
+            postgresql_ops={column: "gin_trgm_ops"},
+            postgresql_where=text("is_deleted = false")
+        ).ddl_if(dialect="postgresql")
+        for column in ("pseudo", "nom", "prenom")
+    )
 
     firebase_uid = Column(String, unique=True, index=True, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+from typing import Optional
+from app.models.reservation import ReservationStatus
+
+
+class ReservationResponse(BaseModel):
+    id: int
+    unlock_code: str
+    status: ReservationStatus
+    arcade_name: str
+    game_name: str
+    player_pseudo: str
+    player2_pseudo: Optional[str]
+    tickets_used: int
+    position_in_queue: Optional[int]
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,182 @@
+"""Graphe d'amitiés en mémoire : listes d'adjacence par identifiant d'utilisateur.
+
+Le graphe est chargé une fois depuis ``friendships`` puis tenu à jour par les
+routes qui acceptent ou retirent une amitié : elles publient la modification
+sur le bus d'invalidation (``publish_friendship_change``), appliquée par chaque
+worker. Un rechargement complet a lieu au plus toutes les
+``FRIEND_GRAPH_REFRESH_SECONDS`` secondes, par sécurité.
+"""
+import time
+import heapq
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.config import settings
+from app.core.invalidation import RESYNC_TOPIC, invalidation_bus
+from app.models.friend import Friendship, FriendshipStatus
+
+
+class FriendGraph:
+    """Amitiés acceptées sous forme d'ensembles d'identifiants d'amis."""
+
+    def __init__(self, refresh_interval: Optional[float] = None):
+        self.refresh_interval = refresh_interval
+        self._adjacency: Dict[int, Set[int]] = {}
+        self._loaded_at: Optional[float] = None
+        # Modifications reçues pendant un chargement en cours (un journal par
+        # chargement), rejouées après la bascule : la lecture de ``friendships``
+        # se fait hors verrou et peut précéder leur commit.
+        self._journals: List[List[Tuple[str, int, Optional[int]]]] = []
+        self._lock = threading.Lock()
+
+    def _is_stale(self) -> bool:
+        if self._loaded_at is None:
+            return True
+        interval = self.refresh_interval
+        if interval is None:
+            interval = settings.FRIEND_GRAPH_REFRESH_SECONDS
+        return time.monotonic() - self._loaded_at > interval
+
+    def ensure_loaded(self, db: Session) -> None:
+        """Charge (ou recharge si trop ancien) le graphe depuis la base."""
+        if not self._is_stale():
+            return
+
+        journal: List[Tuple[str, int, Optional[int]]] = []
+        with self._lock:
+            self._journals.append(journal)
+        try:
+            rows = db.execute(
+                select(Friendship.requester_id, Friendship.requested_id).where(
+                    Friendship.status == FriendshipStatus.ACCEPTED,
+                    Friendship.is_deleted == False
+                )
+            ).all()
+        except BaseException:
+            with self._lock:
+                self._journals.remove(journal)
+            raise
+
+        adjacency: Dict[int, Set[int]] = {}
+        for requester_id, requested_id in rows:
+            adjacency.setdefault(requester_id, set()).add(requested_id)
+            adjacency.setdefault(requested_id, set()).add(requester_id)
+
+        with self._lock:
+            self._journals.remove(journal)
+            self._adjacency = adjacency
+            self._loaded_at = time.monotonic()
+            for change in journal:
+                self._apply(*change)
+
+    def reset(self) -> None:
+        """Vide le graphe : il sera rechargé au prochain accès."""
+        with self._lock:
+            self._adjacency = {}
+            self._loaded_at = None
+
+    def add_friendship(self, user_id: int, friend_id: int) -> None:
+        self._record("add", user_id, friend_id)
+
+    def remove_friendship(self, user_id: int, friend_id: int) -> None:
+        self._record("remove", user_id, friend_id)
+
+    def remove_user(self, user_id: int) -> None:
+        """Retire un utilisateur supprimé et toutes ses amitiés."""
+        self._record("remove_user", user_id)
+
+    def _record(self, action: str, user_id: int, friend_id: Optional[int] = None) -> None:
+        with self._lock:
+            for journal in self._journals:
+                journal.append((action, user_id, friend_id))
+            if self._loaded_at is not None:
+                self._apply(action, user_id, friend_id)
+
+    def _apply(self, action: str, user_id: int, friend_id: Optional[int]) -> None:
+        """Applique une modification ; appelée verrou tenu, idempotente."""
+        if action == "add":
+            self._adjacency.setdefault(user_id, set()).add(friend_id)
+            self._adjacency.setdefault(friend_id, set()).add(user_id)
+        elif action == "remove":
+            self._discard(user_id, friend_id)
+            self._discard(friend_id, user_id)
+        elif action == "remove_user":
+            for other_id in self._adjacency.pop(user_id, set()):
+                self._discard(other_id, user_id)
+
+    def _discard(self, user_id: int, friend_id: int) -> None:
+        friends = self._adjacency.get(user_id)
+        if friends is not None:
+            friends.discard(friend_id)
+            if not friends:
+                del self._adjacency[user_id]
+
+    def friends_of(self, user_id: int) -> Set[int]:
+        with self._lock:
+            return set(self._adjacency.get(user_id, ()))
+
+    def suggestions(self, user_id: int, limit: int = 10,
+                    exclude: Iterable[int] = ()) -> List[Tuple[int, int]]:
+        """Amis d'amis classés par nombre d'amis en commun.
+
+        Retourne des couples ``(user_id, amis_en_commun)``, du plus grand nombre
+        d'amis en commun au plus petit (identifiant croissant à égalité).
+        """
+        with self._lock:
+            friends = set(self._adjacency.get(user_id, ()))
+            mutual_counts: Counter = Counter()
+            for friend_id in friends:
+                mutual_counts.update(self._adjacency.get(friend_id, ()))
+
+        mutual_counts.pop(user_id, None)
+        for candidate_id in friends:
+            mutual_counts.pop(candidate_id, None)
+        for candidate_id in exclude:
+            mutual_counts.pop(candidate_id, None)
+
+        return heapq.nsmallest(limit, mutual_counts.items(), key=lambda item: (-item[1], item[0]))
+
+
+friend_graph = FriendGraph()
+
+
+def publish_friendship_change(db: Session, action: str, user_id: int, friend_id: Optional[int] = None) -> None:
+    """Modification du graphe appliquée par chaque worker au commit de ``db``.
+
+    ``action`` : ``add``, ``remove`` (amitié entre ``user_id`` et ``friend_id``)
+    ou ``remove_user`` (utilisateur supprimé).
+    """
+    invalidation_bus.publish("friendships", {"action": action, "user_id": user_id, "friend_id": friend_id},
+                             session=db)
+
+
+@invalidation_bus.subscriber("friendships")
+def _apply_friendship_change(payload: dict) -> None:
+    action = payload["action"]
+    if action == "add":
+        friend_graph.add_friendship(payload["user_id"], payload["friend_id"])
+    elif action == "remove":
+        friend_graph.remove_friendship(payload["user_id"], payload["friend_id"])
+    elif action == "remove_user":
+        friend_graph.remove_user(payload["user_id"])
+
+
+@invalidation_bus.subscriber(RESYNC_TOPIC)
+def _resync_graph(payload: dict) -> None:
+    friend_graph.reset()
+
+
+def pending_friend_requests(db: Session, user_id: int) -> List[Friendship]:
+    """Demandes d'amis reçues en attente, avec les deux utilisateurs chargés."""
+    return db.query(Friendship).options(
+        joinedload(Friendship.requester),
+        joinedload(Friendship.requested)
+    ).filter(
+        Friendship.requested_id == user_id,
+        Friendship.status == FriendshipStatus.PENDING,
+        Friendship.is_deleted == False
+    ).all()
@@ -0,0 +1,54 @@
+"""Codes promo disponibles, partagés par les routes promo et le tableau de bord."""
+from datetime import datetime, timezone
+from typing import List
+from sqlalchemy.orm import Session
+
+from app.models.promo import PromoCode, PromoUse
+
+
+def available_promo_codes(db: Session, user_id: int) -> List[dict]:
+    """Codes promo valides que l'utilisateur peut encore utiliser (sans révéler le code)."""
+
+    # Cette route pourrait être utilisée pour afficher des codes publics
+    # ou des indices sur les codes disponibles
+    now = datetime.now(timezone.utc)
+
+    available_codes = db.query(PromoCode).filter(
+        PromoCode.is_deleted == False,
+        PromoCode.is_active == True,
+        # Codes actuellement valides
+        (PromoCode.valid_from.is_(None) | (PromoCode.valid_from <= now)),
+        (PromoCode.valid_until.is_(None) | (PromoCode.valid_until > now)),
+        # Codes qui ont encore des utilisations disponibles
+        (PromoCode.usage_limit.is_(None) | (PromoCode.current_uses < PromoCode.usage_limit))
+    ).all()
+
+    # Codes à usage unique déjà utilisés par l'utilisateur : une requête pour tous
+    single_use_ids = [code.id for code in available_codes if code.is_single_use_per_user]
+    used_ids = set()
+    if single_use_ids:
+        used_ids = {
+            promo_code_id for promo_code_id, in db.query(PromoUse.promo_code_id).filter(
+                PromoUse.user_id == user_id,
+                PromoUse.promo_code_id.in_(single_use_ids),
+                PromoUse.is_deleted == False
+            ).all()
+        }
+
+    # Filtrer ceux déjà utilisés par l'utilisateur si single_use_per_user
+    result = []
+    for code in available_codes:
+        if code.is_single_use_per_user and code.id in used_ids:
+            continue  # Skip ce code, déjà utilisé
+
+        # Ne pas révéler le code exact, juste des infos générales
+        result.append({
+            "id": code.id,
+            "tickets_reward": code.tickets_reward,
+            "usage_limit": code.usage_limit,
+            "current_uses": code.current_uses,
+            "valid_until": code.valid_until.isoformat() if code.valid_until else None,
+            "days_until_expiry": code.days_until_expiry()
+        })
+
+    return result
@@ -0,0 +1,74 @@
+"""Lecture des réservations, partagée par les routes de réservation et le tableau de bord."""
+from bisect import bisect_right
+from typing import List
+from sqlalchemy.orm import Session
+
+from app.core.batch_loader import batch_loader
+from app.models.user import User
+from app.models.arcade import Arcade
+from app.models.game import Game
+from app.models.reservation import Reservation, ReservationStatus
+from app.schemas.reservation import ReservationResponse
+
+
+def list_user_reservations(db: Session, user_id: int) -> List[ReservationResponse]:
+    """Réservations d'un joueur (joueur 1 ou 2), de la plus récente à la plus ancienne."""
+
+    reservations = db.query(Reservation).join(
+        Arcade, Reservation.arcade_id == Arcade.id
+    ).join(
+        Game, Reservation.game_id == Game.id
+    ).filter(
+        (Reservation.player_id == user_id) | (Reservation.player2_id == user_id),
+        Reservation.is_deleted == False
+    ).order_by(Reservation.created_at.desc()).all()
+
+    # Joueurs, bornes et jeux chargés en une requête par type, pas une par réservation
+    loader = batch_loader(db)
+    loader.prime(User, (reservation.player_id for reservation in reservations))
+    loader.prime(User, (reservation.player2_id for reservation in reservations))
+    loader.prime(Arcade, (reservation.arcade_id for reservation in reservations))
+    loader.prime(Game, (reservation.game_id for reservation in reservations))
+
+    # Files d'attente des bornes concernées, lues en une requête
+    waiting_arcade_ids = {
+        reservation.arcade_id for reservation in reservations
+        if reservation.status == ReservationStatus.WAITING
+    }
+    queue_times = {}
+    if waiting_arcade_ids:
+        queued = db.query(Reservation.arcade_id, Reservation.created_at).filter(
+            Reservation.arcade_id.in_(waiting_arcade_ids),
+            Reservation.status == ReservationStatus.WAITING,
+            Reservation.is_deleted == False
+        ).order_by(Reservation.created_at).all()
+        for arcade_id, created_at in queued:
+            queue_times.setdefault(arcade_id, []).append(created_at)
+
+    result = []
+    for reservation in reservations:
+        # Récupérer le joueur 2 si nécessaire
+        player2_pseudo = None
+        player2 = loader.get(User, reservation.player2_id)
+        if player2:
+            player2_pseudo = player2.pseudo
+
+        # Calculer la position dans la file si en attente
+        position_in_queue = None
+        if reservation.status == ReservationStatus.WAITING:
+            # Réservations en attente créées au plus tard en même temps que celle-ci
+            position_in_queue = bisect_right(queue_times[reservation.arcade_id], reservation.created_at)
+
+        result.append(ReservationResponse(
+            id=reservation.id,
+            unlock_code=reservation.unlock_code,
+            status=reservation.status,
+            arcade_name=loader.get(Arcade, reservation.arcade_id).nom,
+            game_name=loader.get(Game, reservation.game_id).nom,
+            player_pseudo=loader.get(User, reservation.player_id).pseudo,
+            player2_pseudo=player2_pseudo,
+            tickets_used=reservation.tickets_used,
+            position_in_queue=position_in_queue
+        ))
+
+    return result
@@ -0,0 +1,303 @@
+"""Recherche d'utilisateurs et index des pseudos.
+
+Sur PostgreSQL, la recherche s'appuie sur les index trigrammes (pg_trgm, voir
+migration 006) et classe les résultats par similarité. Sur les autres bases
+(SQLite en développement et en test), un index n-grammes en mémoire fournit
+les candidats ; il est tenu à jour par les événements d'écriture du modèle ``User``,
+diffusés aux autres workers par le bus d'invalidation.
+
+L'index des pseudos (liste triée) sert la disponibilité et l'autocomplétion
+sans requête SQL une fois chargé, quelle que soit la base.
+"""
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from sqlalchemy import event, func, inspect, or_, select
+from sqlalchemy.orm import Session
+
+from app.core.invalidation import RESYNC_TOPIC, invalidation_bus
+from app.models.user import User
+
+
+class UserSnapshot(NamedTuple):
+    """Valeurs indexées d'un utilisateur, relevées au moment du flush."""
+    id: int
+    pseudo: str
+    nom: str
+    prenom: str
+    is_deleted: bool
+
+    @classmethod
+    def of(cls, user: User) -> "UserSnapshot":
+        return cls(user.id, user.pseudo, user.nom, user.prenom, bool(user.is_deleted))
+
+# Tailles de n-grammes indexées : les requêtes de 2 caractères utilisent les bigrammes
+GRAM_SIZES = (2, 3)
+SEARCH_FIELDS = ("pseudo", "nom", "prenom")
+
+
+def ngrams(value: str, size: int) -> Set[str]:
+    return {value[i:i + size] for i in range(len(value) - size + 1)}
+
+
+def trigram_similarity(left: str, right: str) -> float:
+    """Similarité trigrammes à la manière de ``pg_trgm.similarity``."""
+    left_grams = ngrams(f"  {left.lower()} ", 3)
+    right_grams = ngrams(f"  {right.lower()} ", 3)
+    if not left_grams or not right_grams:
+        return 0.0
+    return len(left_grams & right_grams) / len(left_grams | right_grams)
+
+
+class UserSearchIndex:
+    """Index n-grammes en mémoire des utilisateurs actifs."""
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}
+        self._fields: Dict[int, Tuple[str, ...]] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self._loaded:
+            return
+        rows = db.execute(
+            select(User.id, User.pseudo, User.nom, User.prenom).where(User.is_deleted == False)
+        ).all()
+        with self._lock:
+            self._postings = {}
+            self._fields = {}
+            for user_id, *fields in rows:
+                self._add(user_id, fields)
+            self._loaded = True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._postings = {}
+            self._fields = {}
+            self._loaded = False
+
+    @staticmethod
+    def _grams(fields: Iterable[str]) -> Set[str]:
+        grams: Set[str] = set()
+        for field in fields:
+            for size in GRAM_SIZES:
+                grams |= ngrams(field, size)
+        return grams
+
+    def _add(self, user_id: int, fields: Iterable[str]) -> None:
+        lowered = tuple((field or "").lower() for field in fields)
+        self._fields[user_id] = lowered
+        for gram in self._grams(lowered):
+            self._postings.setdefault(gram, set()).add(user_id)
+
+    def _remove(self, user_id: int) -> None:
+        lowered = self._fields.pop(user_id, None)
+        if lowered is None:
+            return
+        for gram in self._grams(lowered):
+            postings = self._postings.get(gram)
+            if postings is not None:
+                postings.discard(user_id)
+                if not postings:
+                    del self._postings[gram]
+
+    def update_user(self, user: UserSnapshot) -> None:
+        """Réindexe un utilisateur (ou le retire s'il est supprimé)."""
+        with self._lock:
+            if not self._loaded:
+                return
+            self._remove(user.id)
+            if not user.is_deleted:
+                self._add(user.id, (user.pseudo, user.nom, user.prenom))
+
+    def search(self, q: str, limit: int, exclude_user_id: Optional[int] = None) -> List[int]:
+        """Identifiants des utilisateurs dont un champ contient ``q``, classés par similarité."""
+        term = q.lower()
+        size = max(s for s in GRAM_SIZES if s <= len(term)) if len(term) >= GRAM_SIZES[0] else None
+
+        with self._lock:
+            if size is None:
+                candidates = set(self._fields)
+            else:
+                # Intersection des listes de n-grammes, en commençant par la plus courte
+                postings = sorted(
+                    (self._postings.get(gram, set()) for gram in ngrams(term, size)),
+                    key=len
+                )
+                candidates = set(postings[0])
+                for posting in postings[1:]:
+                    candidates &= posting
+            matches = [
+                (user_id, self._fields[user_id])
+                for user_id in candidates
+                if user_id != exclude_user_id and any(term in field for field in self._fields[user_id])
+            ]
+
+        ranked = sorted(
+            matches,
+            key=lambda item: (-max(trigram_similarity(term, field) for field in item[1]), item[0])
+        )
+        return [user_id for user_id, _ in ranked[:limit]]
+
+
+class PseudoIndex:
+    """Pseudos réservés et pseudos des utilisateurs actifs, triés pour les recherches par préfixe.
+
+    ``users.pseudo`` est unique sur toute la table et un compte supprimé
+    (suppression logique) garde son pseudo : la disponibilité porte sur tous
+    les comptes, l'autocomplétion sur les seuls comptes actifs.
+
+    La disponibilité est indicative : une inscription concurrente sur un autre
+    worker n'est visible qu'à la vérification faite lors de l'enregistrement.
+    """
+
+    def __init__(self):
+        # Couples (pseudo en minuscules, pseudo) des comptes actifs, triés : préfixe insensible à la casse
+        self._sorted: List[Tuple[str, str]] = []
+        # Pseudo de chaque compte, supprimé ou non
+        self._by_user: Dict[int, str] = {}
+        self._taken: Set[str] = set()
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def ensure_loaded(self, db: Session) -> None:
+        if self._loaded:
+            return
+        rows = db.execute(select(User.id, User.pseudo, User.is_deleted)).all()
+        with self._lock:
+            self._by_user = {user_id: pseudo for user_id, pseudo, _ in rows}
+            self._taken = set(self._by_user.values())
+            self._sorted = sorted((pseudo.lower(), pseudo) for _, pseudo, is_deleted in rows if not is_deleted)
+            self._loaded = True
+
+    def reset(self) -> None:
+        with self._lock:
+            self._sorted = []
+            self._by_user = {}
+            self._taken = set()
+            self._loaded = False
+
+    def _remove(self, user_id: int) -> None:
+        pseudo = self._by_user.pop(user_id, None)
+        if pseudo is None:
+            return
+        self._taken.discard(pseudo)
+        entry = (pseudo.lower(), pseudo)
+        position = bisect_left(self._sorted, entry)
+        if position < len(self._sorted) and self._sorted[position] == entry:
+            del self._sorted[position]
+
+    def update_user(self, user: UserSnapshot) -> None:
+        with self._lock:
+            if not self._loaded:
+                return
+            self._remove(user.id)
+            self._by_user[user.id] = user.pseudo
+            self._taken.add(user.pseudo)
+            if not user.is_deleted:
+                insort(self._sorted, (user.pseudo.lower(), user.pseudo))
+
+    def is_available(self, pseudo: str) -> bool:
+        return pseudo not in self._taken
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Pseudos commençant par ``prefix`` (sans tenir compte de la casse), par ordre alphabétique."""
+        key = prefix.lower()
+        with self._lock:
+            position = bisect_left(self._sorted, (key,))
+            results = []
+            for lowered, pseudo in self._sorted[position:position + limit]:
+                if not lowered.startswith(key):
+                    break
+                results.append(pseudo)
+        return results
+
+
+user_search_index = UserSearchIndex()
+pseudo_index = PseudoIndex()
+
+
+# Les index ne sont modifiés qu'après le commit : une écriture annulée ne les touche pas
+def _queue_reindex(target: User) -> None:
+    session = inspect(target).session
+    if session is not None:
+        invalidation_bus.publish("users", UserSnapshot.of(target)._asdict(), session=session)
+
+
+@event.listens_for(User, "after_insert")
+def _index_new_user(mapper, connection, target):
+    _queue_reindex(target)
+
+
+@event.listens_for(User, "after_update")
+def _reindex_user(mapper, connection, target):
+    # Les mises à jour fréquentes (solde de tickets...) ne touchent pas les index
+    state = inspect(target)
+    if any(state.attrs[field].history.has_changes() for field in SEARCH_FIELDS + ("is_deleted",)):
+        _queue_reindex(target)
+
+
+@invalidation_bus.subscriber("users")
+def _apply_reindex(payload: dict) -> None:
+    snapshot = UserSnapshot(**payload)
+    user_search_index.update_user(snapshot)
+    pseudo_index.update_user(snapshot)
+
+
+@invalidation_bus.subscriber(RESYNC_TOPIC)
+def _resync_indexes(payload: dict) -> None:
+    user_search_index.reset()
+    pseudo_index.reset()
+
+
+def _search_filter(q: str):
+    # ILIKE sur la colonne brute (et non lower(colonne)) : c'est ce que sert l'index gin_trgm_ops
+    escaped = q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    pattern = f"%{escaped}%"
+    return or_(
+        User.pseudo.ilike(pattern, escape="\\"),
+        User.nom.ilike(pattern, escape="\\"),
+        User.prenom.ilike(pattern, escape="\\")
+    )
+
+
+def postgresql_search_query(q: str, limit: int, exclude_user_id: Optional[int] = None):
+    """Recherche servie par les index GIN trigrammes, classée par similarité."""
+    similarity = func.greatest(
+        func.similarity(User.pseudo, q),
+        func.similarity(User.nom, q),
+        func.similarity(User.prenom, q)
+    )
+    return select(User).where(
+        User.is_deleted == False,
+        User.id != exclude_user_id,
+        _search_filter(q)
+    ).order_by(similarity.desc(), User.id).limit(limit)
+
+
+def search_users(db: Session, q: str, limit: int, exclude_user_id: Optional[int] = None) -> List[User]:
+    """Utilisateurs actifs dont le pseudo, le nom ou le prénom contient ``q``."""
+    if db.get_bind().dialect.name == "postgresql":
+        return list(db.scalars(postgresql_search_query(q, limit, exclude_user_id)))
+
+    user_search_index.ensure_loaded(db)
+    user_ids = user_search_index.search(q, limit, exclude_user_id)
+    if not user_ids:
+        return []
+
+    # Relecture par clé primaire : écarte les entrées devenues obsolètes (écriture annulée, suppression)
+    users = {
+        user.id: user
+        for user in db.query(User).filter(
+            User.id.in_(user_ids),
+            User.is_deleted == False,
+            _search_filter(q)
+        )
+    }
+    return [users[user_id] for user_id in user_ids if user_id in users]
@@ -0,0 +1,51 @@
+from fastapi import HTTPException, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from typing import Dict, Iterable, List, Optional, Sequence
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[List[str]]:
+    """Champs demandés via le paramètre ``fields=`` (liste séparée par des virgules).
+
+    Returns:
+        Les champs demandés sans doublon, ou None si le paramètre est absent (tous les champs)
+
+    Raises:
+        HTTPException 400 si un champ est inconnu ou si la liste est vide
+    """
+    if fields is None:
+        return None
+
+    allowed = list(allowed)
+    requested = list(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+    if not requested:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Aucun champ demandé"
+        )
+
+    unknown = [field for field in requested if field not in allowed]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Champs inconnus : {', '.join(unknown)}. Champs disponibles : {', '.join(allowed)}"
+        )
+    return requested
+
+
+def required_columns(fields: Sequence[str], dependencies: Dict[str, Sequence[str]]) -> List[str]:
+    """Colonnes SQL nécessaires au calcul des champs demandés (ordre stable, sans doublon)."""
+    columns: List[str] = []
+    for field in fields:
+        for column in dependencies.get(field, (field,)):
+            if column not in columns:
+                columns.append(column)
+    return columns
+
+
+def sparse_response(items: Iterable[dict], fields: Sequence[str]) -> JSONResponse:
+    """Réponse réduite aux champs demandés (contourne le response_model complet de la route)."""
+    return JSONResponse(content=jsonable_encoder([
+        {field: item[field] for field in fields}
+        for item in items
+    ]))
@@ -0,0 +1,6 @@
+"""Benchmarks de performance de l'API sur un jeu de données synthétique.
+
+- ``dataset`` : génération reproductible (graine) de volumes réalistes
+- ``harness`` : application branchée sur la base de benchmark, Firebase simulé
+- ``run`` : chronométrage des routes (p50/p95/p99), résultats JSON et comparaison
+"""
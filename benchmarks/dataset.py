@@ -0,0 +1,321 @@
+"""Génération d'un jeu de données synthétique reproductible.
+
+Les lignes sont insérées par lots via SQLAlchemy Core (``executemany``), sans
+passer par l'ORM ni ses événements. Les identifiants sont attribués par le
+générateur : l'utilisateur ``BENCH_USER_ID`` (UID ``bench_uid_1``) possède
+toujours des amis, des demandes en attente, des réservations et des scores.
+"""
+import random
+import datetime
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.core.database import Base
+from app.models import (
+    User, Arcade, ArcadeGame, Game, Reservation, ReservationStatus, Score,
+    TicketOffer, TicketPurchase, Friendship, FriendshipStatus, PromoCode, PromoUse
+)
+
+BENCH_USER_ID = 1
+BATCH_SIZE = 10000
+
+
+@dataclass(frozen=True)
+class Scale:
+    users: int
+    friendships: int
+    arcades: int
+    games: int
+    scores: int
+    reservations: int
+    promo_codes: int
+    promo_uses: int
+    ticket_purchases: int
+    # Amis, demandes reçues et réservations garantis à l'utilisateur de benchmark
+    bench_friends: int = 50
+    bench_pending: int = 10
+    bench_reservations: int = 20
+
+
+SCALES: Dict[str, Scale] = {
+    "smoke": Scale(users=60, friendships=150, arcades=5, games=8, scores=500, reservations=100,
+                   promo_codes=10, promo_uses=30, ticket_purchases=50,
+                   bench_friends=10, bench_pending=3, bench_reservations=5),
+    "medium": Scale(users=20000, friendships=60000, arcades=300, games=60, scores=200000, reservations=20000,
+                    promo_codes=200, promo_uses=20000, ticket_purchases=20000),
+    "large": Scale(users=300000, friendships=900000, arcades=3000, games=200, scores=3000000, reservations=200000,
+                   promo_codes=2000, promo_uses=300000, ticket_purchases=300000),
+}
+
+FIRST_NAMES = ("Alice", "Bruno", "Carla", "Denis", "Emma", "Farid", "Gaëlle", "Hugo", "Inès", "Jules",
+               "Karim", "Léa", "Marc", "Nina", "Oscar", "Paul", "Quentin", "Rose", "Sami", "Théo")
+LAST_NAMES = ("Martin", "Bernard", "Dubois", "Thomas", "Robert", "Richard", "Petit", "Durand", "Leroy",
+              "Moreau", "Simon", "Laurent", "Lefebvre", "Michel", "Garcia", "David", "Bertrand", "Roux")
+CITIES = (("Toulouse", 43.6047, 1.4442), ("Paris", 48.8566, 2.3522), ("Lyon", 45.764, 4.8357),
+          ("Bordeaux", 44.8378, -0.5792), ("Lille", 50.6292, 3.0573), ("Nantes", 47.2184, -1.5536))
+
+
+@dataclass
+class DatasetInfo:
+    """Résumé du jeu de données : volumes et identifiants utiles aux routes."""
+    scale: str
+    seed: int
+    counts: Dict[str, int] = field(default_factory=dict)
+    bench_user_id: int = BENCH_USER_ID
+    bench_user_uid: str = "bench_uid_1"
+    game_ids: List[int] = field(default_factory=list)
+    arcade_ids: List[int] = field(default_factory=list)
+    bench_reservation_ids: List[int] = field(default_factory=list)
+    other_user_id: int = 2
+    search_term: str = "ali"
+
+
+def _batches(rows: Iterable[dict], size: int = BATCH_SIZE) -> Iterator[List[dict]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class DatasetGenerator:
+    """Charge un jeu de données à l'échelle ``scale`` dans une base vide."""
+
+    def __init__(self, engine: Engine, scale: str = "smoke", seed: int = 42):
+        if scale not in SCALES:
+            raise ValueError(f"Échelle inconnue : {scale} (disponibles : {', '.join(SCALES)})")
+        self.engine = engine
+        self.scale_name = scale
+        self.scale = SCALES[scale]
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.now = datetime.datetime(2025, 1, 1, tzinfo=datetime.timezone.utc)
+        # Identifiants déterministes : connus sans relire la base (--skip-generate)
+        self.info = DatasetInfo(
+            scale=scale,
+            seed=seed,
+            game_ids=list(range(1, self.scale.games + 1)),
+            arcade_ids=list(range(1, self.scale.arcades + 1)),
+            bench_reservation_ids=list(range(1, self.scale.bench_reservations + 1))
+        )
+
+    def _timestamp(self, max_days: int = 365) -> datetime.datetime:
+        return self.now - datetime.timedelta(seconds=self.random.randrange(max_days * 86400))
+
+    def _insert(self, connection, model, rows: Iterable[dict]) -> None:
+        count = 0
+        for batch in _batches(rows):
+            connection.execute(model.__table__.insert(), batch)
+            count += len(batch)
+        self.info.counts[model.__tablename__] = self.info.counts.get(model.__tablename__, 0) + count
+
+    def generate(self) -> DatasetInfo:
+        """Crée le schéma puis insère toutes les tables dans une seule transaction."""
+        with self.engine.begin() as connection:
+            if connection.dialect.name == "postgresql":
+                connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            Base.metadata.create_all(connection)
+
+            self._insert(connection, User, self._users())
+            self._insert(connection, Game, self._games())
+            self._insert(connection, Arcade, self._arcades())
+            self._insert(connection, ArcadeGame, self._arcade_games())
+            self._insert(connection, Friendship, self._friendships())
+            self._insert(connection, Score, self._scores())
+            self._insert(connection, Reservation, self._reservations())
+            self._insert(connection, TicketOffer, self._ticket_offers())
+            self._insert(connection, TicketPurchase, self._ticket_purchases())
+            self._insert(connection, PromoCode, self._promo_codes())
+            self._insert(connection, PromoUse, self._promo_uses())
+
+        # Statistiques à jour pour le planificateur avant de chronométrer
+        with self.engine.connect() as connection:
+            connection.execution_options(isolation_level="AUTOCOMMIT").execute(text("ANALYZE"))
+        return self.info
+
+    def _users(self) -> Iterator[dict]:
+        for user_id in range(1, self.scale.users + 1):
+            prenom = self.random.choice(FIRST_NAMES)
+            nom = self.random.choice(LAST_NAMES)
+            created_at = self._timestamp(730)
+            yield {
+                "id": user_id,
+                "firebase_uid": f"bench_uid_{user_id}",
+                "email": f"user{user_id}@example.com",
+                "nom": nom,
+                "prenom": prenom,
+                "pseudo": f"{prenom.lower()}{user_id}",
+                "date_naissance": datetime.date(1970, 1, 1) + datetime.timedelta(days=self.random.randrange(15000)),
+                "numero_telephone": f"+336{user_id:08d}",
+                "tickets_balance": self.random.randrange(0, 200),
+                "created_at": created_at,
+                "updated_at": created_at,
+                "is_deleted": False,
+            }
+
+    def _games(self) -> Iterator[dict]:
+        for game_id in self.info.game_ids:
+            yield {
+                "id": game_id,
+                "nom": f"Jeu {game_id}",
+                "description": f"Jeu d'arcade numéro {game_id}",
+                "min_players": 1,
+                "max_players": self.random.choice((1, 2)),
+                "ticket_cost": self.random.randrange(1, 4),
+                "created_at": self._timestamp(),
+                "is_deleted": False,
+            }
+
+    def _arcades(self) -> Iterator[dict]:
+        for arcade_id in self.info.arcade_ids:
+            city, latitude, longitude = self.random.choice(CITIES)
+            yield {
+                "id": arcade_id,
+                "nom": f"Borne {city} {arcade_id}",
+                "description": f"Borne d'arcade de {city}",
+                "api_key": f"bench_arcade_key_{arcade_id}",
+                "localisation": city,
+                "latitude": latitude + self.random.uniform(-0.1, 0.1),
+                "longitude": longitude + self.random.uniform(-0.1, 0.1),
+                "created_at": self._timestamp(),
+                "is_deleted": False,
+            }
+
+    def _arcade_games(self) -> Iterator[dict]:
+        row_id = 0
+        for arcade_id in self.info.arcade_ids:
+            for slot_number, game_id in enumerate(self.random.sample(self.info.game_ids, 2), start=1):
+                row_id += 1
+                yield {"id": row_id, "arcade_id": arcade_id, "game_id": game_id,
+                       "slot_number": slot_number, "is_deleted": False}
+
+    def _friendships(self) -> Iterator[dict]:
+        users = self.scale.users
+        pairs = set()
+        rows = []
+
+        # Relations garanties de l'utilisateur de benchmark (amis puis demandes reçues)
+        others = self.random.sample(range(2, users + 1), self.scale.bench_friends + self.scale.bench_pending)
+        for index, other_id in enumerate(others):
+            accepted = index < self.scale.bench_friends
+            pairs.add((BENCH_USER_ID, other_id))
+            rows.append((other_id if not accepted else BENCH_USER_ID,
+                         BENCH_USER_ID if not accepted else other_id,
+                         FriendshipStatus.ACCEPTED if accepted else FriendshipStatus.PENDING))
+
+        while len(rows) < self.scale.friendships:
+            requester_id, requested_id = self.random.sample(range(2, users + 1), 2)
+            pair = (min(requester_id, requested_id), max(requester_id, requested_id))
+            if pair in pairs:
+                continue
+            pairs.add(pair)
+            status = FriendshipStatus.ACCEPTED if self.random.random() < 0.8 else FriendshipStatus.PENDING
+            rows.append((requester_id, requested_id, status))
+
+        for friendship_id, (requester_id, requested_id, status) in enumerate(rows, start=1):
+            yield {
+                "id": friendship_id,
+                "requester_id": requester_id,
+                "requested_id": requested_id,
+                "status": status,
+                "created_at": self._timestamp(),
+                "is_deleted": False,
+            }
+
+    def _scores(self) -> Iterator[dict]:
+        for score_id in range(1, self.scale.scores + 1):
+            # Une partie sur cinquante concerne l'utilisateur de benchmark
+            player1_id = BENCH_USER_ID if score_id % 50 == 0 else self.random.randrange(1, self.scale.users + 1)
+            duo = self.random.random() < 0.5
+            created_at = self._timestamp()
+            yield {
+                "id": score_id,
+                "player1_id": player1_id,
+                "player2_id": self.random.randrange(1, self.scale.users + 1) if duo else None,
+                "game_id": self.random.choice(self.info.game_ids),
+                "arcade_id": self.random.choice(self.info.arcade_ids),
+                "score_j1": self.random.randrange(0, 100000),
+                "score_j2": self.random.randrange(0, 100000) if duo else None,
+                "created_at": created_at,
+                "updated_at": created_at,
+                "is_deleted": self.random.random() < 0.01,
+            }
+
+    def _reservations(self) -> Iterator[dict]:
+        statuses = (ReservationStatus.COMPLETED, ReservationStatus.CANCELLED,
+                    ReservationStatus.WAITING, ReservationStatus.PLAYING)
+        weights = (70, 10, 15, 5)
+        for reservation_id in range(1, self.scale.reservations + 1):
+            bench = reservation_id <= self.scale.bench_reservations
+            status = ReservationStatus.WAITING if bench else self.random.choices(statuses, weights)[0]
+            yield {
+                "id": reservation_id,
+                "player_id": BENCH_USER_ID if bench else self.random.randrange(1, self.scale.users + 1),
+                "player2_id": None,
+                "arcade_id": self.random.choice(self.info.arcade_ids),
+                "game_id": self.random.choice(self.info.game_ids),
+                "unlock_code": str(self.random.randrange(1, 9)),
+                "status": status,
+                "tickets_used": self.random.randrange(1, 4),
+                "created_at": self._timestamp(30),
+                "is_deleted": False,
+            }
+
+    def _ticket_offers(self) -> Iterator[dict]:
+        offers = ((2, 1.0, "Petit pack"), (15, 10.0, "Pack moyen"), (40, 20.0, "Gros pack"))
+        for offer_id, (tickets_amount, price_euros, name) in enumerate(offers, start=1):
+            yield {"id": offer_id, "tickets_amount": tickets_amount, "price_euros": price_euros,
+                   "name": name, "is_deleted": False}
+
+    def _ticket_purchases(self) -> Iterator[dict]:
+        for purchase_id in range(1, self.scale.ticket_purchases + 1):
+            offer_id = self.random.randrange(1, 4)
+            yield {
+                "id": purchase_id,
+                "user_id": BENCH_USER_ID if purchase_id % 100 == 0 else self.random.randrange(1, self.scale.users + 1),
+                "offer_id": offer_id,
+                "tickets_received": (2, 15, 40)[offer_id - 1],
+                "amount_paid": (1.0, 10.0, 20.0)[offer_id - 1],
+                "created_at": self._timestamp(),
+                "is_deleted": False,
+            }
+
+    def _promo_codes(self) -> Iterator[dict]:
+        for promo_id in range(1, self.scale.promo_codes + 1):
+            expired = self.random.random() < 0.2
+            yield {
+                "id": promo_id,
+                "code": f"BENCH{promo_id:05d}",
+                "tickets_reward": self.random.randrange(1, 20),
+                "is_single_use_global": False,
+                "is_single_use_per_user": True,
+                "usage_limit": None,
+                "current_uses": 0,
+                "valid_from": None,
+                "valid_until": datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc) if expired else None,
+                "is_active": True,
+                "created_at": self._timestamp(),
+                "is_deleted": False,
+            }
+
+    def _promo_uses(self) -> Iterator[dict]:
+        for use_id in range(1, self.scale.promo_uses + 1):
+            yield {
+                "id": use_id,
+                "user_id": BENCH_USER_ID if use_id % 1000 == 0 else self.random.randrange(1, self.scale.users + 1),
+                "promo_code_id": self.random.randrange(1, self.scale.promo_codes + 1),
+                "tickets_received": self.random.randrange(1, 20),
+                "created_at": self._timestamp(),
+                "is_deleted": False,
+            }
+
+
+def generate_dataset(engine: Engine, scale: str = "smoke", seed: int = 42) -> DatasetInfo:
+    """Crée le schéma et charge le jeu de données ``scale`` (reproductible pour une graine donnée)."""
+    return DatasetGenerator(engine, scale, seed).generate()
@@ -0,0 +1,108 @@
+"""Application FastAPI prête pour les benchmarks, sans accès réseau.
+
+Les tokens Firebase ne sont pas vérifiés : le token porté par l'en-tête
+``Authorization`` est directement l'UID Firebase de l'utilisateur simulé
+(``Bearer bench_uid_42``). Les routes d'administration acceptent n'importe
+quel token.
+"""
+import os
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from unittest.mock import patch
+
+from sqlalchemy.orm import sessionmaker
+
+ADMIN_UID = "bench_admin"
+
+
+def configure_environment(database_url: Optional[str] = None) -> None:
+    """Renseigne les paramètres obligatoires avant le premier import de ``app``."""
+    if database_url:
+        os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("DATABASE_URL", "sqlite:///./benchmark.db")
+    os.environ.setdefault("FIREBASE_USER_CREDENTIALS_PATH", "/dev/null")
+    os.environ.setdefault("FIREBASE_ADMIN_CREDENTIALS_PATH", "/dev/null")
+    os.environ.setdefault("ARCADE_API_KEY", "benchmark-arcade-key")
+    os.environ.setdefault("SECRET_KEY", "benchmark-secret-key")
+
+
+def load_app():
+    """Importe l'application sans initialiser les SDK Firebase."""
+    configure_environment()
+    with patch("app.core.security.init_firebase"):
+        from app.main import app
+    return app
+
+
+def fake_verify_token(token: str, app_type: str = "user") -> dict:
+    """Remplace ``verify_firebase_token`` : le token est l'UID de l'utilisateur."""
+    uid = ADMIN_UID if app_type == "admin" else token
+    return {"uid": uid, "email": f"{uid}@example.com", "email_verified": True}
+
+
+def auth_headers(uid: str) -> dict:
+    """En-têtes d'un client : token utilisateur (ou admin) et clé API des bornes."""
+    from app.core.config import settings
+    return {"Authorization": f"Bearer {uid}", "X-API-Key": settings.ARCADE_API_KEY}
+
+
+def user_headers(uid: str) -> dict:
+    """En-têtes de l'application mobile (token seul, sans priorité de borne)."""
+    return {"Authorization": f"Bearer {uid}"}
+
+
+def kiosk_headers() -> dict:
+    """En-têtes d'une borne (clé API seule)."""
+    from app.core.config import settings
+    return {"X-API-Key": settings.ARCADE_API_KEY}
+
+
+@contextmanager
+def bound_app(session_factory: Optional[sessionmaker] = None, rate_limiting: bool = True,
+              caching: bool = False) -> Iterator:
+    """Application avec Firebase simulé, branchée sur ``session_factory`` si fournie.
+
+    Sans fabrique, l'application utilise sa base configurée (``DATABASE_URL``).
+    ``rate_limiting=False`` désactive la limitation de débit et le délestage.
+    Sans ``caching``, le cache de requêtes et le regroupement des lectures sont
+    désactivés : des appels répétés mesurent la route et ses requêtes SQL, pas
+    un succès de cache.
+    """
+    app = load_app()
+    from app.core.config import settings
+    from app.core.database import get_db, get_read_db, get_read_session_factory
+
+    previous = dict(app.dependency_overrides)
+    if session_factory is not None:
+        def override_get_db():
+            db = session_factory()
+            try:
+                yield db
+            finally:
+                db.close()
+
+        app.dependency_overrides[get_db] = override_get_db
+        app.dependency_overrides[get_read_db] = override_get_db
+        app.dependency_overrides[get_read_session_factory] = lambda: session_factory
+
+    try:
+        with patch("app.api.deps.verify_firebase_token", side_effect=fake_verify_token), \
+                patch.object(settings, "RATE_LIMIT_ENABLED", settings.RATE_LIMIT_ENABLED and rate_limiting), \
+                patch.object(settings, "QUERY_CACHE_ENABLED", settings.QUERY_CACHE_ENABLED and caching), \
+                patch.object(settings, "REQUEST_COALESCING_ENABLED", settings.REQUEST_COALESCING_ENABLED and caching):
+            yield app
+    finally:
+        app.dependency_overrides.clear()
+        app.dependency_overrides.update(previous)
+
+
+@contextmanager
+def benchmark_client(session_factory: Optional[sessionmaker] = None, caching: bool = False) -> Iterator:
+    """Client de test synchrone, sans limitation de débit (ni caches, sauf ``caching``).
+
+    Les erreurs serveur sont des réponses 500 (comptées), pas des exceptions.
+    """
+    from fastapi.testclient import TestClient
+
+    with bound_app(session_factory, rate_limiting=False, caching=caching) as app, TestClient(app, raise_server_exceptions=False) as client:
+        yield client
@@ -0,0 +1,312 @@
+"""Scénarios de charge reproduisant le trafic des bornes et de l'application.
+
+Les arrivées sont en boucle ouverte (processus de Poisson) : une requête lente
+ne retarde pas les suivantes, comme en production. Trois scénarios tournent en
+parallèle :
+
+- ``kiosk_poll`` : les bornes interrogent leur file d'attente
+- ``reservation_burst`` : rafales de réservations simultanées (sortie de cours, soirée)
+- ``score_submission`` : les bornes envoient les scores des parties terminées
+
+L'application est pilotée en mémoire (transport ASGI de httpx) ou via un
+serveur uvicorn local démarré dans un thread (``--socket``), avec Firebase
+simulé dans les deux cas. Exemple ::
+
+    python -m benchmarks.loadtest --database-url sqlite:///./benchmark.db --scale medium \\
+        --users 2000 --kiosks 100 --duration 60 --kiosk-rate 50 --reservation-rate 2 \\
+        --reservation-burst 20 --score-rate 10 --output load.json
+"""
+import sys
+import json
+import time
+import random
+import socket
+import asyncio
+import argparse
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from benchmarks.harness import bound_app, configure_environment, kiosk_headers, user_headers
+from benchmarks.run import percentile
+
+# Délai au-delà duquel une requête est comptée en erreur
+REQUEST_TIMEOUT_SECONDS = 10.0
+
+
+@dataclass
+class LoadContext:
+    """Population simulée : utilisateurs actifs et bornes avec leurs jeux."""
+    user_ids: List[int]
+    kiosks: List[Tuple[int, List[int]]]
+
+    @staticmethod
+    def user_headers(user_id: int) -> dict:
+        return user_headers(f"bench_uid_{user_id}")
+
+
+Action = Callable[[httpx.AsyncClient, LoadContext, random.Random], Awaitable[httpx.Response]]
+
+
+async def kiosk_poll(client: httpx.AsyncClient, context: LoadContext, rng: random.Random) -> httpx.Response:
+    arcade_id, _ = rng.choice(context.kiosks)
+    return await client.get(f"/api/v1/arcades/{arcade_id}/queue", headers=kiosk_headers())
+
+
+async def reservation(client: httpx.AsyncClient, context: LoadContext, rng: random.Random) -> httpx.Response:
+    arcade_id, game_ids = rng.choice(context.kiosks)
+    return await client.post(
+        "/api/v1/reservations/",
+        json={"arcade_id": arcade_id, "game_id": rng.choice(game_ids)},
+        headers=context.user_headers(rng.choice(context.user_ids))
+    )
+
+
+async def score_submission(client: httpx.AsyncClient, context: LoadContext, rng: random.Random) -> httpx.Response:
+    arcade_id, game_ids = rng.choice(context.kiosks)
+    player1_id, player2_id = rng.sample(context.user_ids, 2)
+    duo = rng.random() < 0.5
+    return await client.post(
+        "/api/v1/scores/",
+        json={
+            "player1_id": player1_id,
+            "player2_id": player2_id if duo else None,
+            "game_id": rng.choice(game_ids),
+            "arcade_id": arcade_id,
+            "score_j1": rng.randrange(100000),
+            "score_j2": rng.randrange(100000) if duo else None,
+        },
+        headers=kiosk_headers()
+    )
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """Arrivées de ``burst`` requêtes simultanées, ``rate`` fois par seconde en moyenne."""
+    name: str
+    action: Action
+    rate: float
+    burst: int = 1
+
+
+@dataclass
+class ScenarioResult:
+    latencies_ms: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    # Réponses 5xx, délais dépassés et erreurs de transport
+    errors: int = 0
+
+    def record(self, latency_ms: float, status: Optional[int]) -> None:
+        self.latencies_ms.append(latency_ms)
+        self.statuses[str(status) if status is not None else "exception"] += 1
+        if status is None or status >= 500:
+            self.errors += 1
+
+    def summary(self, elapsed: float) -> dict:
+        total = len(self.latencies_ms)
+        summary = {
+            "requests": total,
+            "throughput_rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "errors": self.errors,
+            "error_rate": round(self.errors / total, 4) if total else 0.0,
+            # Refus métier (tickets insuffisants, 429...) : ni succès ni erreur serveur
+            "rejected": sum(count for status, count in self.statuses.items() if status.startswith("4")),
+            # Délestage (503) : compté dans les erreurs, détaillé ici
+            "shed": self.statuses.get("503", 0),
+            "statuses": dict(sorted(self.statuses.items())),
+        }
+        if total:
+            summary.update(
+                p50_ms=round(percentile(self.latencies_ms, 0.50), 3),
+                p95_ms=round(percentile(self.latencies_ms, 0.95), 3),
+                p99_ms=round(percentile(self.latencies_ms, 0.99), 3),
+                max_ms=round(max(self.latencies_ms), 3),
+            )
+        return summary
+
+
+async def _timed(client: httpx.AsyncClient, scenario: Scenario, context: LoadContext,
+                 rng: random.Random, result: ScenarioResult) -> None:
+    start = time.perf_counter()
+    try:
+        response = await asyncio.wait_for(scenario.action(client, context, rng), REQUEST_TIMEOUT_SECONDS)
+        status = response.status_code
+    except Exception:
+        status = None
+    result.record((time.perf_counter() - start) * 1000, status)
+
+
+async def _drive(client: httpx.AsyncClient, scenario: Scenario, context: LoadContext,
+                 duration: float, rng: random.Random, result: ScenarioResult) -> None:
+    if scenario.rate <= 0:
+        return
+    tasks = []
+    deadline = time.perf_counter() + duration
+    while True:
+        await asyncio.sleep(rng.expovariate(scenario.rate))
+        if time.perf_counter() >= deadline:
+            break
+        tasks.extend(
+            asyncio.create_task(_timed(client, scenario, context, rng, result))
+            for _ in range(scenario.burst)
+        )
+    await asyncio.gather(*tasks)
+
+
+async def run_load(client: httpx.AsyncClient, context: LoadContext, scenarios: Sequence[Scenario],
+                   duration: float, seed: int = 42) -> dict:
+    """Exécute les scénarios en parallèle pendant ``duration`` secondes."""
+    results = {scenario.name: ScenarioResult() for scenario in scenarios}
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _drive(client, scenario, context, duration, random.Random(f"{seed}-{scenario.name}"), results[scenario.name])
+        for scenario in scenarios
+    ))
+    elapsed = time.perf_counter() - started
+    return {
+        "duration_s": round(elapsed, 3),
+        "scenarios": {name: result.summary(elapsed) for name, result in results.items()},
+    }
+
+
+def load_context(session_factory, users: int, kiosks: int) -> LoadContext:
+    """Population tirée du jeu de données : les ``users`` premiers utilisateurs, les ``kiosks`` premières bornes."""
+    from sqlalchemy import select
+    from app.models import User, ArcadeGame
+
+    db = session_factory()
+    try:
+        user_ids = list(db.scalars(
+            select(User.id).where(User.is_deleted == False).order_by(User.id).limit(users)
+        ))
+        games_by_arcade: Dict[int, List[int]] = {}
+        for arcade_id, game_id in db.execute(
+            select(ArcadeGame.arcade_id, ArcadeGame.game_id)
+            .where(ArcadeGame.is_deleted == False, ArcadeGame.arcade_id <= kiosks)
+            .order_by(ArcadeGame.arcade_id, ArcadeGame.slot_number)
+        ):
+            games_by_arcade.setdefault(arcade_id, []).append(game_id)
+    finally:
+        db.close()
+    return LoadContext(user_ids=user_ids, kiosks=sorted(games_by_arcade.items()))
+
+
+def default_scenarios(kiosk_rate: float = 20.0, reservation_rate: float = 1.0, reservation_burst: int = 10,
+                      score_rate: float = 5.0) -> List[Scenario]:
+    return [
+        Scenario("kiosk_poll", kiosk_poll, kiosk_rate),
+        Scenario("reservation_burst", reservation, reservation_rate, reservation_burst),
+        Scenario("score_submission", score_submission, score_rate),
+    ]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class LocalServer:
+    """Serveur uvicorn sur 127.0.0.1, dans un thread, pour mesurer aussi la couche HTTP."""
+
+    def __init__(self, app):
+        import uvicorn
+
+        self.port = _free_port()
+        self.server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=self.port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "LocalServer":
+        self.thread.start()
+        while not self.server.started:
+            if not self.thread.is_alive():
+                raise RuntimeError("Le serveur uvicorn n'a pas démarré")
+            time.sleep(0.05)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.server.should_exit = True
+        self.thread.join()
+
+
+async def _run_in_process(app, context, scenarios, duration, seed) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest") as client:
+        return await run_load(client, context, scenarios, duration, seed)
+
+
+async def _run_over_socket(base_url, context, scenarios, duration, seed) -> dict:
+    limits = httpx.Limits(max_connections=200, max_keepalive_connections=50)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits) as client:
+        return await run_load(client, context, scenarios, duration, seed)
+
+
+def format_report(report: dict) -> str:
+    lines = [f"{'scénario':<20} {'req':>7} {'req/s':>8} {'p50':>9} {'p95':>9} {'p99':>9} {'err%':>7} {'4xx':>6}"]
+    for name, stats in report["scenarios"].items():
+        lines.append(
+            f"{name:<20} {stats['requests']:>7} {stats['throughput_rps']:>8.1f} "
+            f"{stats.get('p50_ms', 0):>9.2f} {stats.get('p95_ms', 0):>9.2f} {stats.get('p99_ms', 0):>9.2f} "
+            f"{stats['error_rate'] * 100:>6.2f}% {stats['rejected']:>6}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Scénarios de charge bornes / application")
+    parser.add_argument("--database-url", default="sqlite:///./benchmark.db")
+    parser.add_argument("--scale", default="medium", help="Échelle du jeu de données (smoke, medium, large)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-generate", action="store_true", help="Réutiliser le jeu de données déjà chargé")
+    parser.add_argument("--socket", action="store_true", help="Passer par un serveur uvicorn local plutôt qu'en mémoire")
+    parser.add_argument("--duration", type=float, default=30.0, help="Durée de l'essai (secondes)")
+    parser.add_argument("--users", type=int, default=1000, help="Utilisateurs actifs simulés")
+    parser.add_argument("--kiosks", type=int, default=50, help="Bornes simulées")
+    parser.add_argument("--kiosk-rate", type=float, default=20.0, help="Interrogations de file par seconde")
+    parser.add_argument("--reservation-rate", type=float, default=1.0, help="Rafales de réservations par seconde")
+    parser.add_argument("--reservation-burst", type=int, default=10, help="Réservations simultanées par rafale")
+    parser.add_argument("--score-rate", type=float, default=5.0, help="Scores envoyés par seconde")
+    parser.add_argument("--no-rate-limit", action="store_true",
+                        help="Désactiver la limitation de débit et le délestage")
+    parser.add_argument("--output", help="Fichier JSON du rapport")
+    args = parser.parse_args(argv)
+
+    configure_environment(args.database_url)
+    from sqlalchemy import create_engine
+    from app.core.database import Base, SessionLocal
+    from benchmarks.dataset import generate_dataset
+
+    if not args.skip_generate:
+        engine = create_engine(args.database_url)
+        Base.metadata.drop_all(engine)
+        generate_dataset(engine, args.scale, args.seed)
+        engine.dispose()
+
+    context = load_context(SessionLocal, args.users, args.kiosks)
+    scenarios = default_scenarios(args.kiosk_rate, args.reservation_rate, args.reservation_burst, args.score_rate)
+
+    # Trafic mixte avec écritures : caches actifs, comme en production
+    with bound_app(rate_limiting=not args.no_rate_limit, caching=True) as app:
+        if args.socket:
+            with LocalServer(app) as server:
+                report = asyncio.run(_run_over_socket(server.base_url, context, scenarios, args.duration, args.seed))
+        else:
+            report = asyncio.run(_run_in_process(app, context, scenarios, args.duration, args.seed))
+
+    report["config"] = {key: value for key, value in vars(args).items() if key != "output"}
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,219 @@
+"""Chronométrage des routes de lecture sur un jeu de données synthétique.
+
+Exemples ::
+
+    # Base SQLite locale, échelle moyenne
+    python -m benchmarks.run --database-url sqlite:///./benchmark.db --scale medium --output results.json
+
+    # PostgreSQL, comparaison avec une exécution de référence (code 1 en cas de régression)
+    python -m benchmarks.run --database-url postgresql://... --scale large \\
+        --output results.json --baseline baseline.json --tolerance 0.2
+
+Les routes d'écriture ne sont pas chronométrées ici (elles modifieraient le jeu
+de données d'une itération à l'autre) : elles sont couvertes par ``benchmarks.loadtest``.
+"""
+import sys
+import json
+import math
+import time
+import argparse
+import platform
+import datetime
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence
+
+from benchmarks.harness import ADMIN_UID, auth_headers, benchmark_client, configure_environment
+
+# Écart absolu minimal (ms) pour signaler une régression : évite le bruit des routes très rapides
+MIN_REGRESSION_MS = 1.0
+
+
+@dataclass(frozen=True)
+class BenchRoute:
+    """Route chronométrée : nom stable (clé des résultats) et construction du chemin."""
+    name: str
+    path: Callable[..., str]
+    admin: bool = False
+
+
+ROUTES: Sequence[BenchRoute] = (
+    BenchRoute("GET /health", lambda info: "/health"),
+    BenchRoute("GET /api/v1/games/", lambda info: "/api/v1/games/"),
+    BenchRoute("GET /api/v1/games/{game_id}", lambda info: f"/api/v1/games/{info.game_ids[0]}"),
+    BenchRoute("GET /api/v1/arcades/", lambda info: "/api/v1/arcades/"),
+    BenchRoute("GET /api/v1/arcades/{arcade_id}", lambda info: f"/api/v1/arcades/{info.arcade_ids[0]}"),
+    BenchRoute("GET /api/v1/arcades/{arcade_id}/queue", lambda info: f"/api/v1/arcades/{info.arcade_ids[0]}/queue"),
+    BenchRoute("GET /api/v1/arcades/{arcade_id}/config", lambda info: f"/api/v1/arcades/{info.arcade_ids[0]}/config"),
+    BenchRoute("GET /api/v1/tickets/offers", lambda info: "/api/v1/tickets/offers"),
+    BenchRoute("GET /api/v1/tickets/balance", lambda info: "/api/v1/tickets/balance"),
+    BenchRoute("GET /api/v1/tickets/history", lambda info: "/api/v1/tickets/history"),
+    BenchRoute("GET /api/v1/auth/me", lambda info: "/api/v1/auth/me"),
+    BenchRoute("GET /api/v1/users/me", lambda info: "/api/v1/users/me"),
+    BenchRoute("GET /api/v1/users/search", lambda info: f"/api/v1/users/search?q={info.search_term}"),
+    BenchRoute("GET /api/v1/users/pseudo-availability",
+               lambda info: f"/api/v1/users/pseudo-availability?q={info.search_term}"),
+    BenchRoute("GET /api/v1/users/autocomplete", lambda info: f"/api/v1/users/autocomplete?prefix={info.search_term}"),
+    BenchRoute("GET /api/v1/me/dashboard", lambda info: "/api/v1/me/dashboard"),
+    BenchRoute("GET /api/v1/friends/", lambda info: "/api/v1/friends/"),
+    BenchRoute("GET /api/v1/friends/suggestions", lambda info: "/api/v1/friends/suggestions"),
+    BenchRoute("GET /api/v1/friends/requests", lambda info: "/api/v1/friends/requests"),
+    BenchRoute("GET /api/v1/reservations/", lambda info: "/api/v1/reservations/"),
+    BenchRoute("GET /api/v1/reservations/{reservation_id}",
+               lambda info: f"/api/v1/reservations/{info.bench_reservation_ids[0]}"),
+    BenchRoute("GET /api/v1/reservations/{reservation_id}/status",
+               lambda info: f"/api/v1/reservations/{info.bench_reservation_ids[0]}/status"),
+    BenchRoute("GET /api/v1/scores/", lambda info: "/api/v1/scores/"),
+    BenchRoute("GET /api/v1/scores/?game_id", lambda info: f"/api/v1/scores/?game_id={info.game_ids[0]}"),
+    BenchRoute("GET /api/v1/scores/?friends_only", lambda info: "/api/v1/scores/?friends_only=true"),
+    BenchRoute("GET /api/v1/scores/my-stats", lambda info: "/api/v1/scores/my-stats"),
+    BenchRoute("GET /api/v1/promos/history", lambda info: "/api/v1/promos/history"),
+    BenchRoute("GET /api/v1/promos/available", lambda info: "/api/v1/promos/available"),
+    BenchRoute("GET /api/v1/admin/promo-codes/", lambda info: "/api/v1/admin/promo-codes/", admin=True),
+    BenchRoute("GET /api/v1/admin/promo-codes/expiring-soon",
+               lambda info: "/api/v1/admin/promo-codes/expiring-soon", admin=True),
+    BenchRoute("GET /api/v1/admin/users/deleted", lambda info: "/api/v1/admin/users/deleted", admin=True),
+    BenchRoute("GET /api/v1/admin/users/{user_id}/deletion-impact",
+               lambda info: f"/api/v1/admin/users/{info.other_user_id}/deletion-impact", admin=True),
+    BenchRoute("GET /api/v1/admin/stats", lambda info: "/api/v1/admin/stats", admin=True),
+    BenchRoute("GET /api/v1/admin/arcades/deleted", lambda info: "/api/v1/admin/arcades/deleted", admin=True),
+)
+
+
+def percentile(samples: Sequence[float], fraction: float) -> float:
+    """Percentile au rang le plus proche d'une série de mesures."""
+    ordered = sorted(samples)
+    rank = max(math.ceil(fraction * len(ordered)), 1)
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def summarize(samples_ms: Sequence[float], errors: int) -> dict:
+    return {
+        "samples": len(samples_ms),
+        "errors": errors,
+        "mean_ms": round(sum(samples_ms) / len(samples_ms), 3),
+        "p50_ms": round(percentile(samples_ms, 0.50), 3),
+        "p95_ms": round(percentile(samples_ms, 0.95), 3),
+        "p99_ms": round(percentile(samples_ms, 0.99), 3),
+    }
+
+
+def time_route(client, route: BenchRoute, info, iterations: int, warmup: int) -> dict:
+    """Chronomètre ``iterations`` appels (après ``warmup`` appels non comptés)."""
+    path = route.path(info)
+    headers = auth_headers(ADMIN_UID if route.admin else info.bench_user_uid)
+
+    for _ in range(warmup):
+        client.get(path, headers=headers)
+
+    samples_ms: List[float] = []
+    errors = 0
+    for _ in range(iterations):
+        start = time.perf_counter()
+        response = client.get(path, headers=headers)
+        samples_ms.append((time.perf_counter() - start) * 1000)
+        if response.status_code >= 400:
+            errors += 1
+    return summarize(samples_ms, errors)
+
+
+def run_benchmarks(client, info, iterations: int = 50, warmup: int = 5,
+                   routes: Sequence[BenchRoute] = ROUTES, caching: bool = False) -> dict:
+    """Résultats JSON-sérialisables de toutes les routes (``caching`` : réglage du client, noté dans meta)."""
+    return {
+        "meta": {
+            "scale": info.scale,
+            "seed": info.seed,
+            "counts": info.counts,
+            "iterations": iterations,
+            "warmup": warmup,
+            # Avec caches, les appels répétés mesurent des succès de cache : résultats non comparables
+            "caching": caching,
+            "python": platform.python_version(),
+            "started_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        },
+        "routes": {route.name: time_route(client, route, info, iterations, warmup) for route in routes},
+    }
+
+
+def compare(current: dict, baseline: dict, tolerance: float = 0.2,
+            min_delta_ms: float = MIN_REGRESSION_MS) -> List[str]:
+    """Régressions de p95 (et nouvelles erreurs) par rapport à une exécution de référence.
+
+    Une route régresse si son p95 dépasse celui de la référence de plus de
+    ``tolerance`` (fraction) et d'au moins ``min_delta_ms``.
+    """
+    regressions = []
+    for name, stats in current["routes"].items():
+        reference = baseline.get("routes", {}).get(name)
+        if reference is None:
+            continue
+        limit = reference["p95_ms"] * (1 + tolerance)
+        if stats["p95_ms"] > limit and stats["p95_ms"] - reference["p95_ms"] >= min_delta_ms:
+            regressions.append(f"{name} : p95 {stats['p95_ms']} ms (référence {reference['p95_ms']} ms)")
+        if stats["errors"] > reference["errors"]:
+            regressions.append(f"{name} : {stats['errors']} erreurs (référence {reference['errors']})")
+    return regressions
+
+
+def format_table(results: dict) -> str:
+    lines = [f"{'route':<60} {'p50':>9} {'p95':>9} {'p99':>9} {'err':>5}"]
+    for name, stats in results["routes"].items():
+        lines.append(
+            f"{name:<60} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f} {stats['errors']:>5}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks des routes de l'API")
+    parser.add_argument("--database-url", default="sqlite:///./benchmark.db",
+                        help="Base de benchmark (vidée et rechargée sauf --skip-generate)")
+    parser.add_argument("--scale", default="medium", help="Échelle du jeu de données (smoke, medium, large)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--skip-generate", action="store_true",
+                        help="Réutiliser le jeu de données déjà chargé (même échelle et même graine)")
+    parser.add_argument("--output", help="Fichier JSON des résultats")
+    parser.add_argument("--baseline", help="Résultats de référence à comparer")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Hausse de p95 tolérée (fraction)")
+    parser.add_argument("--cache", action="store_true",
+                        help="Garder le cache de requêtes et le regroupement des lectures (désactivés par défaut)")
+    args = parser.parse_args(argv)
+
+    # L'application lit sa configuration au premier import
+    configure_environment(args.database_url)
+    from sqlalchemy import create_engine
+    from app.core.database import Base
+    from benchmarks.dataset import DatasetGenerator
+
+    engine = create_engine(args.database_url)
+    generator = DatasetGenerator(engine, args.scale, args.seed)
+    if args.skip_generate:
+        info = generator.info
+    else:
+        Base.metadata.drop_all(engine)
+        started = time.perf_counter()
+        info = generator.generate()
+        print(f"Jeu de données '{args.scale}' chargé en {time.perf_counter() - started:.1f} s : {info.counts}")
+
+    with benchmark_client(caching=args.cache) as client:
+        results = run_benchmarks(client, info, args.iterations, args.warmup, caching=args.cache)
+
+    print(format_table(results))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.tolerance)
+        for regression in regressions:
+            print(f"RÉGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,6 +7,7 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 import tempfile
+from contextlib import contextmanager
 from unittest.mock import patch, MagicMock
 import datetime
 
@@ -17,7 +18,14 @@ if str(root_dir) not in sys.path:
 
 # Maintenant on peut importer les modules de l'app
 from app.main import app
-from app.core.database import get_db, Base
+from app.core.database import get_db, get_read_db, get_read_session_factory, Base
+from app.core.instrumentation import capture_requests
+from app.core.profiling import profile_store
+from app.core.slow_queries import slow_query_log
+from app.core.rate_limit import rate_limiter, concurrency_limiter
+from app.core.query_cache import query_cache
+from app.services.friend_service import friend_graph
+from app.services.user_service import user_search_index, pseudo_index
 from app.models import User, Game, Arcade, TicketOffer, PromoCode
 
 # Base de données de test en mémoire
@@ -44,6 +52,14 @@ def override_get_db():
 def setup_test_db():
     """Créer les tables de test."""
     Base.metadata.create_all(bind=engine)
+    friend_graph.reset()
+    user_search_index.reset()
+    pseudo_index.reset()
+    profile_store.clear()
+    slow_query_log.clear()
+    rate_limiter.reset()
+    concurrency_limiter.reset()
+    query_cache.clear()
     yield
     Base.metadata.drop_all(bind=engine)
 
@@ -52,6 +68,8 @@ def setup_test_db():
 def client():
     """Client de test FastAPI."""
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_read_session_factory] = lambda: TestingSessionLocal
     with TestClient(app) as test_client:
         yield test_client
     app.dependency_overrides.clear()
@@ -71,6 +89,22 @@ def db():
     connection.close()
 
 
+@pytest.fixture
+def query_budget():
+    """Vérifie que chaque requête HTTP du bloc reste dans un budget de requêtes SQL."""
+    @contextmanager
+    def check(max_queries):
+        with capture_requests() as requests:
+            yield requests
+        assert requests, "Aucune requête HTTP instrumentée"
+        for stats in requests:
+            assert stats.count <= max_queries, (
+                f"{stats.route} : {stats.count} requêtes SQL pour un budget de {max_queries}"
+            )
+
+    return check
+
+
 @pytest.fixture
 def mock_firebase():
     with patch("app.api.deps.verify_firebase_token") as mock_verify:
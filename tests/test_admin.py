@@ -145,6 +145,32 @@ class TestAdmin:
         codes = [promo["code"] for promo in data]
         assert sample_promo_code.code in codes
 
+    def test_list_promo_codes_sparse_fields(self, client, auth_headers_admin, sample_promo_code):
+        """Test de fields= sur la liste des codes promo, champs calculés compris."""
+        code = sample_promo_code.code
+
+        response = client.get("/api/v1/admin/promo-codes/?fields=code,is_valid_now", headers=auth_headers_admin)
+
+        assert response.status_code == 200
+        assert response.json() == [{"code": code, "is_valid_now": True}]
+
+    def test_list_promo_codes_unknown_field(self, client, auth_headers_admin):
+        """Test de fields= avec un champ inconnu."""
+        response = client.get("/api/v1/admin/promo-codes/?fields=secret", headers=auth_headers_admin)
+
+        assert response.status_code == 400
+
+    def test_list_deleted_users_sparse_fields(self, client, auth_headers_admin, sample_user, db):
+        """Test de fields= sur la liste des utilisateurs supprimés."""
+        sample_user.is_deleted = True
+        db.commit()
+        user_id, pseudo = sample_user.id, sample_user.pseudo
+
+        response = client.get("/api/v1/admin/users/deleted?fields=id,pseudo", headers=auth_headers_admin)
+
+        assert response.status_code == 200
+        assert response.json() == [{"id": user_id, "pseudo": pseudo}]
+
     def test_update_user_tickets_add(self, client, auth_headers_admin, sample_user, db):
         """Test d'ajout de tickets à un utilisateur."""
         initial_balance = sample_user.tickets_balance
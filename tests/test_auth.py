@@ -100,6 +100,62 @@ class TestAuth:
         assert response.status_code == 400
         assert "déjà enregistré" in response.json()["detail"]
 
+    def test_register_user_two_round_trips(self, client, db, query_budget):
+        """L'inscription fait une requête de vérification puis l'INSERT."""
+        user_data = {
+            "firebase_uid": "budget_uid",
+            "email": "budget@example.com",
+            "nom": "Budget",
+            "prenom": "Requetes",
+            "pseudo": "budgetuser",
+            "date_naissance": "1995-05-15",
+            "numero_telephone": "0123456780"
+        }
+
+        with query_budget(2):
+            response = client.post("/api/v1/auth/register", json=user_data)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["id"]
+        assert data["created_at"]
+
+    def test_register_user_duplicate_email(self, client, db, sample_user):
+        """La contrainte d'unicité sur l'email est le garde-fou final."""
+        user_data = {
+            "firebase_uid": "email_dup_uid",
+            "email": sample_user.email,
+            "nom": "Email",
+            "prenom": "Doublon",
+            "pseudo": "emaildoublon",
+            "date_naissance": "1995-05-15",
+            "numero_telephone": "0123456781"
+        }
+
+        response = client.post("/api/v1/auth/register", json=user_data)
+
+        assert response.status_code == 400
+        assert "email est déjà utilisé" in response.json()["detail"]
+
+    def test_register_user_pseudo_of_deleted_account(self, client, db, sample_user):
+        """Un pseudo encore réservé par un compte supprimé renvoie une erreur 400."""
+        sample_user.is_deleted = True
+        db.commit()
+        user_data = {
+            "firebase_uid": "deleted_pseudo_uid",
+            "email": "deletedpseudo@example.com",
+            "nom": "Pseudo",
+            "prenom": "Supprime",
+            "pseudo": sample_user.pseudo,
+            "date_naissance": "1995-05-15",
+            "numero_telephone": "0123456782"
+        }
+
+        response = client.post("/api/v1/auth/register", json=user_data)
+
+        assert response.status_code == 400
+        assert "pseudo est déjà utilisé" in response.json()["detail"]
+
     def test_get_current_user_success(self, client, auth_headers_user, sample_user):
         """Test de récupération des infos utilisateur connecté."""
         response = client.get("/api/v1/auth/me", headers=auth_headers_user)
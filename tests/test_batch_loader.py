@@ -0,0 +1,136 @@
+import datetime
+import pytest
+from sqlalchemy import event
+from app.core.batch_loader import BatchLoader, batch_loader
+from app.models import Game, User
+
+
+@pytest.fixture
+def count_selects(db):
+    """Nombre de SELECT émis sur la connexion de la session de test."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+
+    connection = db.connection()
+    event.listen(connection, "before_cursor_execute", record)
+    yield statements
+    event.remove(connection, "before_cursor_execute", record)
+
+
+class TestBatchLoader:
+    """Tests du chargeur groupé d'entités par identifiant."""
+
+    @pytest.fixture
+    def players(self, db):
+        players = [
+            User(
+                firebase_uid=f"batch_uid_{index}",
+                email=f"batch{index}@example.com",
+                nom="Joueur",
+                prenom=str(index),
+                pseudo=f"batch{index}",
+                date_naissance=datetime.date(1990, 1, 1),
+                numero_telephone=f"06000000{index:02d}"
+            )
+            for index in range(6)
+        ]
+        db.add_all(players)
+        db.commit()
+        return players
+
+    @pytest.fixture
+    def queue(self, db, players, sample_arcade, sample_game):
+        """Six réservations en attente, la moitié à deux joueurs."""
+        from app.models import Reservation
+        db.add_all([
+            Reservation(
+                player_id=players[index].id,
+                player2_id=players[(index + 1) % len(players)].id if index % 2 else None,
+                arcade_id=sample_arcade.id,
+                game_id=sample_game.id,
+                unlock_code=str(index + 1),
+                tickets_used=sample_game.ticket_cost
+            )
+            for index in range(len(players))
+        ])
+        db.commit()
+
+    def test_primed_ids_loaded_in_one_query(self, db, players, count_selects):
+        """Les identifiants annoncés sont résolus ensemble au premier ``get``."""
+        ids = [player.id for player in players]
+        db.expunge_all()
+        count_selects.clear()
+        loader = BatchLoader(db)
+        loader.prime(User, ids)
+
+        pseudos = [loader.get(User, id_).pseudo for id_ in ids]
+
+        assert pseudos == [f"batch{index}" for index in range(6)]
+        assert len(count_selects) == 1
+
+    def test_missing_and_null_ids_memoized(self, db, players, count_selects):
+        """Un identifiant absent est mémorisé ; ``None`` ne déclenche pas de requête."""
+        loader = BatchLoader(db)
+
+        assert loader.get(User, None) is None
+        assert loader.get(User, 999999) is None
+        assert loader.get(User, 999999) is None
+        assert len(count_selects) == 1
+
+    def test_get_many_per_model(self, db, players, sample_game, count_selects):
+        """Une requête par type d'entité ; les entités déjà chargées ne sont pas relues."""
+        first, second, game_id = players[0].id, players[1].id, sample_game.id
+        db.expunge_all()
+        count_selects.clear()
+        loader = BatchLoader(db)
+
+        users = loader.get_many(User, [first, second, 999999])
+        games = loader.get_many(Game, [game_id])
+        loader.get_many(User, [first])
+
+        assert set(users) == {first, second}
+        assert list(games) == [game_id]
+        assert len(count_selects) == 2
+
+    def test_loader_scoped_to_session(self, db):
+        """Un chargeur par session, donc par requête HTTP."""
+        assert batch_loader(db) is batch_loader(db)
+
+    def test_arcade_queue_constant_queries(self, client, arcade_api_headers, sample_arcade, queue, query_budget):
+        """La file d'attente ne fait plus une requête par joueur 2."""
+        with query_budget(5):
+            response = client.get(f"/api/v1/arcades/{sample_arcade.id}/queue", headers=arcade_api_headers)
+
+        assert response.status_code == 200
+        queue = response.json()
+        assert [item["position"] for item in queue] == [1, 2, 3, 4, 5, 6]
+        assert [item["player2_pseudo"] for item in queue] == [None, "batch2", None, "batch4", None, "batch0"]
+
+    def test_my_reservations_constant_queries(self, client, auth_headers_user, sample_user, sample_arcade,
+                                              sample_game, players, db, query_budget):
+        """Réservations d'un joueur : joueurs, bornes, jeux et positions lus par lots."""
+        from app.models import Reservation
+        created_at = datetime.datetime(2024, 1, 1, 12, 0)
+        minute = datetime.timedelta(minutes=1)
+        db.add_all([
+            Reservation(player_id=players[0].id, arcade_id=sample_arcade.id, game_id=sample_game.id,
+                        unlock_code="1", tickets_used=1, created_at=created_at),
+            Reservation(player_id=sample_user.id, player2_id=players[1].id, arcade_id=sample_arcade.id,
+                        game_id=sample_game.id, unlock_code="2", tickets_used=1, created_at=created_at + minute),
+            Reservation(player_id=players[2].id, player2_id=sample_user.id, arcade_id=sample_arcade.id,
+                        game_id=sample_game.id, unlock_code="3", tickets_used=1,
+                        created_at=created_at + 2 * minute),
+        ])
+        db.commit()
+        pseudo = sample_user.pseudo
+
+        with query_budget(6):
+            response = client.get("/api/v1/reservations/", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        reservations = sorted(response.json(), key=lambda reservation: reservation["position_in_queue"])
+        assert [reservation["position_in_queue"] for reservation in reservations] == [2, 3]
+        assert [reservation["player2_pseudo"] for reservation in reservations] == ["batch1", pseudo]
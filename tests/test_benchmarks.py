@@ -0,0 +1,170 @@
+import pytest
+import asyncio
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.models import User, Friendship, Score
+from benchmarks.dataset import generate_dataset, BENCH_USER_ID
+from benchmarks.harness import benchmark_client, bound_app
+from benchmarks.loadtest import Scenario, ScenarioResult, default_scenarios, load_context, run_load, _run_in_process
+from benchmarks.run import ROUTES, run_benchmarks, compare, percentile
+
+
+class TestBenchmarks:
+    """Test de fumée du harnais de benchmark (échelle « smoke »)."""
+
+    @pytest.fixture
+    def bench_engine(self):
+        """Base dédiée, distincte de la base de test."""
+        engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        yield engine
+        engine.dispose()
+
+    def test_dataset_is_reproducible(self, bench_engine):
+        """Une même graine produit les mêmes données."""
+        info = generate_dataset(bench_engine, "smoke", seed=7)
+
+        with bench_engine.connect() as connection:
+            pseudos = connection.execute(select(User.pseudo).order_by(User.id).limit(5)).scalars().all()
+            bench_friends = connection.execute(
+                select(func.count()).select_from(Friendship).where(Friendship.requester_id == BENCH_USER_ID)
+            ).scalar()
+
+        other_engine = create_engine("sqlite:///:memory:", poolclass=StaticPool)
+        generate_dataset(other_engine, "smoke", seed=7)
+        with other_engine.connect() as connection:
+            assert connection.execute(select(User.pseudo).order_by(User.id).limit(5)).scalars().all() == pseudos
+
+        assert info.counts["users"] == 60
+        assert info.counts["scores"] == 500
+        assert bench_friends == 10
+
+    def test_every_route_answers(self, bench_engine):
+        """Toutes les routes chronométrées répondent sans erreur, avec p50 <= p95 <= p99."""
+        info = generate_dataset(bench_engine, "smoke")
+
+        with benchmark_client(sessionmaker(bind=bench_engine)) as client:
+            results = run_benchmarks(client, info, iterations=3, warmup=0)
+
+        assert set(results["routes"]) == {route.name for route in ROUTES}
+        for name, stats in results["routes"].items():
+            assert stats["errors"] == 0, name
+            assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+        assert results["meta"]["counts"]["scores"] == 500
+        assert results["meta"]["caching"] is False
+
+    def test_timed_calls_bypass_query_cache(self, bench_engine):
+        """Sans --cache, les appels répétés relisent la base au lieu du cache de requêtes."""
+        from app.core.metrics import query_cache_requests
+        info = generate_dataset(bench_engine, "smoke")
+        route = next(route for route in ROUTES if route.name == "GET /api/v1/games/")
+        hits = query_cache_requests.values().get(("games.list", "hit"), 0)
+
+        with benchmark_client(sessionmaker(bind=bench_engine)) as client:
+            run_benchmarks(client, info, iterations=3, warmup=1, routes=[route])
+
+        assert query_cache_requests.values().get(("games.list", "hit"), 0) == hits
+
+    def test_compare_flags_regressions(self):
+        """Une hausse de p95 au-delà de la tolérance ou de nouvelles erreurs sont signalées."""
+        baseline = {"routes": {
+            "GET /a": {"p95_ms": 10.0, "errors": 0},
+            "GET /b": {"p95_ms": 10.0, "errors": 0},
+            "GET /c": {"p95_ms": 0.2, "errors": 0},
+        }}
+        current = {"routes": {
+            "GET /a": {"p95_ms": 11.0, "errors": 0},
+            "GET /b": {"p95_ms": 15.0, "errors": 1},
+            "GET /c": {"p95_ms": 0.5, "errors": 0},
+            "GET /new": {"p95_ms": 100.0, "errors": 0},
+        }}
+
+        regressions = compare(current, baseline, tolerance=0.2)
+
+        assert len(regressions) == 2
+        assert all(regression.startswith("GET /b") for regression in regressions)
+
+    def test_percentile_nearest_rank(self):
+        """Percentile au rang le plus proche."""
+        samples = list(range(1, 101))
+
+        assert percentile(samples, 0.50) == 50
+        assert percentile(samples, 0.95) == 95
+        assert percentile(samples, 0.99) == 99
+        assert percentile([3.0], 0.99) == 3.0
+
+
+class TestLoadTest:
+    """Test de fumée des scénarios de charge."""
+
+    @pytest.fixture
+    def bench_factory(self):
+        engine = create_engine(
+            "sqlite:///:memory:",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool,
+        )
+        generate_dataset(engine, "smoke")
+        yield sessionmaker(bind=engine)
+        engine.dispose()
+
+    def test_scenarios_run_in_process(self, bench_factory):
+        """Les trois scénarios tournent en mémoire, Firebase simulé, sans erreur serveur."""
+        context = load_context(bench_factory, users=20, kiosks=3)
+        scenarios = default_scenarios(kiosk_rate=30, reservation_rate=5, reservation_burst=3, score_rate=20)
+
+        with bound_app(bench_factory) as app:
+            report = asyncio.run(_run_in_process(app, context, scenarios, duration=0.5, seed=1))
+
+        assert set(report["scenarios"]) == {"kiosk_poll", "reservation_burst", "score_submission"}
+        for name, stats in report["scenarios"].items():
+            assert stats["requests"] > 0, name
+            assert stats["errors"] == 0, stats["statuses"]
+            assert stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"]
+
+        with bench_factory() as db:
+            assert db.scalar(select(func.count()).select_from(Score)) > 500
+
+    def test_population_from_dataset(self, bench_factory):
+        """La population reprend les premiers utilisateurs et les bornes avec leurs deux jeux."""
+        context = load_context(bench_factory, users=10, kiosks=2)
+
+        assert context.user_ids == list(range(1, 11))
+        assert [arcade_id for arcade_id, _ in context.kiosks] == [1, 2]
+        assert all(len(game_ids) == 2 for _, game_ids in context.kiosks)
+
+    def test_errors_and_rejections_counted(self):
+        """Les 5xx et exceptions sont des erreurs ; les 4xx sont des refus."""
+        result = ScenarioResult()
+        for latency, status in ((1.0, 200), (2.0, 400), (3.0, 500), (4.0, None)):
+            result.record(latency, status)
+
+        summary = result.summary(elapsed=2.0)
+
+        assert summary["requests"] == 4
+        assert summary["throughput_rps"] == 2.0
+        assert summary["errors"] == 2
+        assert summary["error_rate"] == 0.5
+        assert summary["rejected"] == 1
+        assert summary["statuses"] == {"200": 1, "400": 1, "500": 1, "exception": 1}
+
+    def test_bursts_fire_together(self):
+        """Chaque arrivée d'un scénario en rafale déclenche ``burst`` requêtes."""
+        calls = []
+
+        async def action(client, context, rng):
+            calls.append(rng)
+
+            class Response:
+                status_code = 200
+            return Response()
+
+        scenario = Scenario("burst", action, rate=50, burst=4)
+        report = asyncio.run(run_load(None, None, [scenario], duration=0.2))
+
+        assert report["scenarios"]["burst"]["requests"] == len(calls)
+        assert len(calls) % 4 == 0
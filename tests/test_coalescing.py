@@ -0,0 +1,175 @@
+import asyncio
+import json
+import threading
+import time
+from fastapi import HTTPException
+from app.core.coalescing import singleflight
+from app.core.config import settings
+from app.core.metrics import http_requests_coalesced
+
+
+def _shared_count(label):
+    return http_requests_coalesced.values().get((label, "shared"), 0)
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "délai dépassé"
+        time.sleep(0.001)
+
+
+class TestCoalescing:
+    """Tests du regroupement des lectures identiques simultanées."""
+
+    def _run_concurrently(self, func, calls, release, shared):
+        """Lance ``calls`` (kwargs) en parallèle ; libère l'exécution une fois ``shared`` appels en attente."""
+        label = f"{func.__module__.rsplit('.', 1)[-1]}.{func.__name__}"
+        before = _shared_count(label)
+        results = [None] * len(calls)
+
+        def call(index):
+            try:
+                results[index] = func(**calls[index])
+            except Exception as e:
+                results[index] = e
+
+        threads = [threading.Thread(target=call, args=(index,)) for index in range(len(calls))]
+        for thread in threads:
+            thread.start()
+        _wait_for(lambda: _shared_count(label) - before >= shared)
+        release.set()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def test_identical_calls_share_one_execution(self):
+        """Les appels simultanés de mêmes paramètres n'exécutent la fonction qu'une fois."""
+        executions = []
+        release = threading.Event()
+
+        @singleflight()
+        def popular_read(game_id: int, db=None):
+            executions.append(game_id)
+            release.wait(5)
+            return [{"game_id": game_id}]
+
+        results = self._run_concurrently(
+            popular_read, [{"game_id": 1, "db": object()} for _ in range(5)], release, shared=4)
+
+        assert executions == [1]
+        assert {response.body for response in results} == {b'[{"game_id":1}]'}
+        assert all(response.headers["content-type"] == "application/json" for response in results)
+
+    def test_waiters_return_their_connection(self, db):
+        """Une requête en attente du résultat partagé ne garde pas de connexion empruntée."""
+        from sqlalchemy import text
+        release = threading.Event()
+        leader_started = threading.Event()
+        waiting = []
+
+        @singleflight()
+        def popular_read(game_id: int, db=None):
+            leader_started.set()
+            release.wait(5)
+            return {"game_id": game_id}
+
+        leader = threading.Thread(target=popular_read, kwargs={"game_id": 1})
+        leader.start()
+        leader_started.wait(5)
+        db.execute(text("SELECT 1"))
+        assert db.in_transaction()
+
+        follower = threading.Thread(target=lambda: waiting.append(popular_read(game_id=1, db=db)))
+        follower.start()
+        _wait_for(lambda: not db.in_transaction())
+        release.set()
+        leader.join()
+        follower.join()
+
+        assert json.loads(waiting[0].body) == {"game_id": 1}
+
+    def test_different_parameters_not_shared(self):
+        """Des paramètres différents donnent des exécutions distinctes."""
+        executions = []
+
+        @singleflight()
+        def popular_read(game_id: int):
+            executions.append(game_id)
+            return {"game_id": game_id}
+
+        assert json.loads(popular_read(1).body) == {"game_id": 1}
+        assert json.loads(popular_read(2).body) == {"game_id": 2}
+        # Rien n'est conservé une fois l'exécution terminée
+        popular_read(1)
+        assert executions == [1, 2, 1]
+
+    def test_error_raised_for_all_waiters(self):
+        """L'exception de l'exécution partagée est relevée pour chaque requête en attente."""
+        release = threading.Event()
+
+        @singleflight()
+        def failing_read(arcade_id: int):
+            release.wait(5)
+            raise HTTPException(status_code=404, detail="Borne d'arcade non trouvée")
+
+        results = self._run_concurrently(
+            failing_read, [{"arcade_id": 7} for _ in range(3)], release, shared=2)
+
+        assert all(isinstance(result, HTTPException) and result.status_code == 404 for result in results)
+
+    def test_custom_key_separates_users(self):
+        """Un argument ignoré peut compter dans la clé via ``key``."""
+        executions = []
+        release = threading.Event()
+
+        @singleflight(key=lambda arguments: arguments["current_user"])
+        def friends_read(limit: int, current_user=None):
+            executions.append(current_user)
+            release.wait(5)
+            return {"user": current_user}
+
+        results = self._run_concurrently(
+            friends_read, [{"limit": 10, "current_user": user} for user in ("a", "a", "b", "b")], release, shared=2)
+
+        assert sorted(executions) == ["a", "b"]
+        assert sorted(json.loads(response.body)["user"] for response in results) == ["a", "a", "b", "b"]
+
+    def test_async_calls_share_one_execution(self):
+        """Les routes ``async def`` sont regroupées sur la boucle d'événements."""
+        executions = []
+
+        @singleflight()
+        async def async_read(game_id: int):
+            executions.append(game_id)
+            await asyncio.sleep(0.01)
+            return {"game_id": game_id}
+
+        async def main():
+            return await asyncio.gather(*(async_read(game_id=3) for _ in range(4)), async_read(game_id=4))
+
+        responses = asyncio.run(main())
+
+        assert sorted(executions) == [3, 4]
+        assert [json.loads(response.body)["game_id"] for response in responses] == [3, 3, 3, 3, 4]
+
+    def test_disabled(self, monkeypatch):
+        """Désactivé, la fonction est appelée telle quelle et son résultat renvoyé tel quel."""
+        monkeypatch.setattr(settings, "REQUEST_COALESCING_ENABLED", False)
+
+        @singleflight()
+        def popular_read(game_id: int):
+            return {"game_id": game_id}
+
+        assert popular_read(1) == {"game_id": 1}
+
+    def test_games_route_response_unchanged(self, client, sample_game):
+        """La route décorée renvoie le même contenu que son response_model."""
+        response = client.get("/api/v1/games/")
+
+        assert response.status_code == 200
+        assert response.json() == [{
+            "id": sample_game.id, "nom": sample_game.nom, "description": sample_game.description,
+            "min_players": sample_game.min_players, "max_players": sample_game.max_players,
+            "ticket_cost": sample_game.ticket_cost,
+        }]
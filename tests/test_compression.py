@@ -0,0 +1,140 @@
+import gzip
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+from app.api import middleware
+from app.api.middleware import CompressionMiddleware, CompressedBodyCache, negotiate_encoding
+from app.models.game import Game
+
+
+class TestCompression:
+    """Tests de la compression des réponses."""
+
+    @pytest.fixture
+    def many_games(self, db):
+        """Catalogue assez volumineux pour dépasser le seuil de compression."""
+        for index in range(30):
+            db.add(Game(
+                nom=f"Jeu {index}",
+                description="Un jeu de test avec une description assez longue " * 3,
+                min_players=1,
+                max_players=2,
+                ticket_cost=1
+            ))
+        db.commit()
+
+    @pytest.fixture
+    def small_app(self):
+        """Application minimale : une route cataloguée, une route libre et un flux."""
+        app = FastAPI()
+        cache = CompressedBodyCache(max_bytes=1024 * 1024)
+
+        @app.get("/catalog")
+        async def catalog():
+            return PlainTextResponse("catalogue " * 200)
+
+        @app.get("/other")
+        async def other(size: int = 2000):
+            return PlainTextResponse("x" * size)
+
+        @app.get("/stream")
+        async def stream():
+            return StreamingResponse(iter([b"a" * 2000, b"b" * 2000]), media_type="text/plain")
+
+        app.add_middleware(CompressionMiddleware, minimum_size=1024, cacheable_routes={"/catalog"}, cache=cache)
+        return TestClient(app), cache
+
+    def test_catalog_compressed_with_gzip(self, client, many_games):
+        """Le catalogue des jeux est compressé en gzip et décodé de façon transparente."""
+        response = client.get("/api/v1/games/", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert len(response.json()) == 30
+
+    def test_small_response_not_compressed(self, client):
+        """Une réponse sous le seuil est renvoyée telle quelle."""
+        response = client.get("/health", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+
+    def test_no_accept_encoding(self, small_app):
+        """Sans Accept-Encoding compatible, la réponse n'est pas compressée."""
+        client, _ = small_app
+
+        response = client.get("/other", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert response.text == "x" * 2000
+
+    def test_content_length_matches_compressed_body(self, small_app):
+        """Content-Length correspond au corps compressé."""
+        client, _ = small_app
+
+        response = client.get("/other", headers={"Accept-Encoding": "gzip"})
+
+        assert response.headers["content-encoding"] == "gzip"
+        assert int(response.headers["content-length"]) < 2000
+
+    def test_catalog_body_compressed_once(self, small_app, monkeypatch):
+        """Un corps de catalogue identique est servi depuis le cache précompressé."""
+        client, _ = small_app
+        calls = []
+        original = middleware.compress
+        monkeypatch.setattr(middleware, "compress", lambda body, encoding: calls.append(encoding) or original(body, encoding))
+
+        first = client.get("/catalog", headers={"Accept-Encoding": "gzip"})
+        second = client.get("/catalog", headers={"Accept-Encoding": "gzip"})
+
+        assert first.text == second.text == "catalogue " * 200
+        assert calls == ["gzip"]
+
+    def test_uncached_route_compressed_each_time(self, small_app, monkeypatch):
+        """Les routes hors catalogue ne sont pas conservées en cache."""
+        client, _ = small_app
+        calls = []
+        original = middleware.compress
+        monkeypatch.setattr(middleware, "compress", lambda body, encoding: calls.append(encoding) or original(body, encoding))
+
+        client.get("/other", headers={"Accept-Encoding": "gzip"})
+        client.get("/other", headers={"Accept-Encoding": "gzip"})
+
+        assert calls == ["gzip", "gzip"]
+
+    def test_streaming_response_passthrough(self, small_app):
+        """Les réponses en flux ne sont pas compressées."""
+        client, _ = small_app
+
+        response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+
+        assert "content-encoding" not in response.headers
+        assert response.text == "a" * 2000 + "b" * 2000
+
+    def test_cache_bounded_in_bytes(self):
+        """Le cache évince les entrées les plus anciennes au-delà de sa taille maximale."""
+        cache = CompressedBodyCache(max_bytes=60)
+        first = cache.get_or_compress(b"premier", "gzip")
+        cache.get_or_compress(b"second", "gzip")
+        cache.get_or_compress(b"troisieme", "gzip")
+
+        assert gzip.decompress(first) == b"premier"
+        assert cache._size <= 60
+        assert len(cache._entries) < 3
+
+    def test_negotiate_encoding(self, monkeypatch):
+        """La qualité la plus haute l'emporte, brotli à égalité s'il est disponible ; q=0 refuse un encodage."""
+        monkeypatch.setattr(middleware, "brotli", None)
+        assert negotiate_encoding("gzip, deflate, br") == "gzip"
+        assert negotiate_encoding("gzip;q=0, br") is None
+        assert negotiate_encoding("*") == "gzip"
+        assert negotiate_encoding("") is None
+
+        monkeypatch.setattr(middleware, "brotli", object())
+        assert negotiate_encoding("gzip, br") == "br"
+        assert negotiate_encoding("gzip, br;q=0") == "gzip"
+        assert negotiate_encoding("gzip;q=1, br;q=0.1") == "gzip"
+        assert negotiate_encoding("gzip;q=0.5, br;q=0.8") == "br"
+        assert negotiate_encoding("br;q=0.5, *;q=0.9") == "gzip"
@@ -212,6 +212,187 @@ class TestFriends:
         assert len(data) == 1
         assert data[0]["id"] == friend_user_id
 
+    @pytest.fixture
+    def many_friends(self, db, sample_user):
+        """Trois amis acceptés, dans les deux sens de la relation."""
+        from app.models import User, Friendship, FriendshipStatus
+        friends = []
+        for i, pseudo in enumerate(["alice", "albert", "bruno"]):
+            friend = User(
+                firebase_uid=f"many_friend_uid_{i}",
+                email=f"{pseudo}@example.com",
+                nom="Ami",
+                prenom=pseudo.capitalize(),
+                pseudo=pseudo,
+                date_naissance=datetime.date(1990, 1, 1),
+                numero_telephone=f"070000000{i}",
+                tickets_balance=0
+            )
+            db.add(friend)
+            db.flush()
+            if i % 2 == 0:
+                friendship = Friendship(requester_id=sample_user.id, requested_id=friend.id,
+                                        status=FriendshipStatus.ACCEPTED)
+            else:
+                friendship = Friendship(requester_id=friend.id, requested_id=sample_user.id,
+                                        status=FriendshipStatus.ACCEPTED)
+            db.add(friendship)
+            friends.append(friend)
+        db.commit()
+        return sorted(friend.id for friend in friends)
+
+    def test_get_friends_cursor_pagination(self, client, auth_headers_user, many_friends):
+        """Test de la pagination par curseur de la liste d'amis."""
+        response = client.get("/api/v1/friends/?limit=2", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        first_page = [friend["id"] for friend in response.json()]
+        assert first_page == many_friends[:2]
+        assert response.headers["X-Next-Cursor"] == str(many_friends[1])
+
+    def test_next_cursor_exposed_to_browsers(self, client, auth_headers_user, many_friends):
+        """Le curseur est lisible par un client navigateur (CORS)."""
+        response = client.get("/api/v1/friends/?limit=2",
+                              headers={**auth_headers_user, "Origin": "https://app.example.com"})
+
+        exposed = response.headers["access-control-expose-headers"].lower()
+        assert "x-next-cursor" in exposed
+        assert "retry-after" in exposed
+
+    def test_get_friends_last_page(self, client, auth_headers_user, many_friends):
+        """Test de la dernière page : pas de curseur suivant."""
+        response = client.get(f"/api/v1/friends/?limit=2&cursor={many_friends[1]}", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        assert [friend["id"] for friend in response.json()] == many_friends[2:]
+        assert "X-Next-Cursor" not in response.headers
+
+    def test_get_friends_pseudo_prefix(self, client, auth_headers_user, many_friends):
+        """Test du filtre par début de pseudo."""
+        response = client.get("/api/v1/friends/?pseudo_prefix=AL", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        assert sorted(friend["pseudo"] for friend in response.json()) == ["albert", "alice"]
+
+    def test_get_friends_single_query(self, client, auth_headers_user, many_friends, query_budget):
+        """La liste d'amis ne dépend pas du nombre d'amis en nombre de requêtes."""
+        with query_budget(2):
+            response = client.get("/api/v1/friends/", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        assert len(response.json()) == 3
+
+    @staticmethod
+    def make_user(db, pseudo):
+        from app.models import User
+        user = User(
+            firebase_uid=f"{pseudo}_uid",
+            email=f"{pseudo}@example.com",
+            nom="Test",
+            prenom=pseudo.capitalize(),
+            pseudo=pseudo,
+            date_naissance=datetime.date(1990, 1, 1),
+            numero_telephone=f"06{abs(hash(pseudo)) % 10 ** 8:08d}",
+            tickets_balance=0
+        )
+        db.add(user)
+        db.flush()
+        return user
+
+    @pytest.fixture
+    def friends_of_friends(self, db, sample_user, many_friends):
+        """Amis d'amis : carla (2 amis en commun), denis (1), emma (demande en attente)."""
+        from app.models import Friendship, FriendshipStatus
+        alice_id, albert_id, bruno_id = many_friends
+        carla = self.make_user(db, "carla")
+        denis = self.make_user(db, "denis")
+        emma = self.make_user(db, "emma")
+        db.add_all([
+            Friendship(requester_id=carla.id, requested_id=alice_id, status=FriendshipStatus.ACCEPTED),
+            Friendship(requester_id=albert_id, requested_id=carla.id, status=FriendshipStatus.ACCEPTED),
+            Friendship(requester_id=denis.id, requested_id=bruno_id, status=FriendshipStatus.ACCEPTED),
+            Friendship(requester_id=emma.id, requested_id=alice_id, status=FriendshipStatus.ACCEPTED),
+            Friendship(requester_id=sample_user.id, requested_id=emma.id, status=FriendshipStatus.PENDING),
+        ])
+        db.commit()
+        return {"carla": carla.id, "denis": denis.id, "emma": emma.id}
+
+    def test_friend_suggestions_ranked_by_mutual_friends(self, client, auth_headers_user, friends_of_friends):
+        """Test des suggestions d'amis classées par amis en commun."""
+        response = client.get("/api/v1/friends/suggestions", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert [(item["pseudo"], item["mutual_friends"]) for item in data] == [("carla", 2), ("denis", 1)]
+
+    def test_friend_suggestions_limit(self, client, auth_headers_user, friends_of_friends):
+        """Test de la limite du nombre de suggestions."""
+        response = client.get("/api/v1/friends/suggestions?limit=1", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        assert [item["id"] for item in response.json()] == [friends_of_friends["carla"]]
+
+    def test_friend_suggestions_empty(self, client, auth_headers_user):
+        """Test des suggestions sans aucun ami."""
+        response = client.get("/api/v1/friends/suggestions", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        assert response.json() == []
+
+    def test_accept_updates_friend_graph(self, client, auth_headers_user, sample_user, friend_user, db):
+        """L'acceptation d'une demande met à jour le graphe chargé en mémoire."""
+        from app.models import Friendship
+        from app.services.friend_service import friend_graph
+
+        friendship = Friendship(requester_id=friend_user.id, requested_id=sample_user.id)
+        db.add(friendship)
+        db.commit()
+        friend_graph.ensure_loaded(db)
+
+        response = client.put(f"/api/v1/friends/request/{friendship.id}/accept", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        assert friend_graph.friends_of(sample_user.id) == {friend_user.id}
+
+    def test_remove_friend_updates_friend_graph(self, client, auth_headers_user, sample_user, many_friends, db):
+        """Le retrait d'un ami met à jour le graphe chargé en mémoire."""
+        from app.services.friend_service import friend_graph
+
+        friend_graph.ensure_loaded(db)
+        response = client.delete(f"/api/v1/friends/{many_friends[0]}", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        assert friend_graph.friends_of(sample_user.id) == set(many_friends[1:])
+
+    def test_friendship_statuses(self, client, auth_headers_user, sample_user, friends_of_friends, many_friends,
+                                 db, query_budget):
+        """Test du statut de relation pour une liste d'utilisateurs."""
+        from app.models import Friendship
+        db.add(Friendship(requester_id=friends_of_friends["denis"], requested_id=sample_user.id))
+        db.commit()
+        user_ids = [many_friends[1], friends_of_friends["emma"], friends_of_friends["denis"],
+                    friends_of_friends["carla"], sample_user.id, many_friends[1]]
+
+        with query_budget(2):
+            response = client.post("/api/v1/friends/status", json={"user_ids": user_ids},
+                                   headers=auth_headers_user)
+
+        assert response.status_code == 200
+        assert response.json() == [
+            {"user_id": many_friends[1], "status": "friend"},
+            {"user_id": friends_of_friends["emma"], "status": "pending_sent"},
+            {"user_id": friends_of_friends["denis"], "status": "pending_received"},
+            {"user_id": friends_of_friends["carla"], "status": "none"},
+            {"user_id": sample_user.id, "status": "self"},
+        ]
+
+    def test_friendship_statuses_too_many_ids(self, client, auth_headers_user):
+        """Test du nombre maximum d'identifiants par appel."""
+        response = client.post("/api/v1/friends/status", json={"user_ids": list(range(1, 502))},
+                               headers=auth_headers_user)
+
+        assert response.status_code == 422
+
     def test_remove_friend_success(self, client, auth_headers_user, sample_user, friend_user, db):
         """Test de suppression d'un ami."""
         from app.models import Friendship, FriendshipStatus
@@ -278,6 +459,8 @@ class TestFriends:
         protected_endpoints = [
             ("GET", "/api/v1/friends/", None),
             ("GET", "/api/v1/friends/requests", None),
+            ("GET", "/api/v1/friends/suggestions", None),
+            ("POST", "/api/v1/friends/status", {"user_ids": [friend_user.id]}),
             ("POST", "/api/v1/friends/request", {"user_id": friend_user.id}),
             ("PUT", "/api/v1/friends/request/1/accept", None),
             ("PUT", "/api/v1/friends/request/1/reject", None),
@@ -294,4 +477,68 @@ class TestFriends:
             elif method == "DELETE":
                 response = client.delete(endpoint)
 
-            assert response.status_code == 403
\ No newline at end of file
+            assert response.status_code == 403
+
+class TestFriendGraph:
+    """Tests du graphe d'amitiés en mémoire."""
+
+    @pytest.fixture
+    def graph(self, db):
+        from app.services.friend_service import FriendGraph
+        graph = FriendGraph(refresh_interval=3600)
+        graph.ensure_loaded(db)
+        for user_id, friend_id in [(1, 2), (1, 3), (2, 4), (3, 4), (3, 5)]:
+            graph.add_friendship(user_id, friend_id)
+        return graph
+
+    def test_suggestions_ranked(self, graph):
+        """Les amis d'amis sont classés par amis en commun puis par identifiant."""
+        assert graph.suggestions(1) == [(4, 2), (5, 1)]
+
+    def test_suggestions_exclude(self, graph):
+        """Les identifiants exclus ne sont pas suggérés."""
+        assert graph.suggestions(1, exclude={4}) == [(5, 1)]
+
+    def test_remove_friendship(self, graph):
+        """Le retrait d'une amitié est symétrique."""
+        graph.remove_friendship(3, 1)
+
+        assert graph.friends_of(1) == {2}
+        assert 1 not in graph.friends_of(3)
+        assert graph.suggestions(1) == [(4, 1)]
+
+    def test_remove_user(self, graph):
+        """Un utilisateur supprimé disparaît du graphe et des suggestions."""
+        graph.remove_user(4)
+
+        assert graph.friends_of(4) == set()
+        assert graph.suggestions(1) == [(5, 1)]
+
+    def test_updates_ignored_before_load(self):
+        """Tant que le graphe n'est pas chargé, les mises à jour sont ignorées."""
+        from app.services.friend_service import FriendGraph
+        graph = FriendGraph()
+        graph.add_friendship(1, 2)
+
+        assert graph.friends_of(1) == set()
+
+    def test_changes_during_reload_kept(self, db):
+        """Une modification reçue pendant la lecture de ``friendships`` survit à la bascule."""
+        from app.services.friend_service import FriendGraph
+        graph = FriendGraph(refresh_interval=3600)
+
+        class ConcurrentWrites:
+            """Session dont la lecture est doublée par des modifications publiées par un autre worker."""
+
+            def execute(self, statement):
+                result = db.execute(statement)
+                graph.add_friendship(7, 8)
+                graph.add_friendship(9, 10)
+                graph.remove_friendship(10, 9)
+                return result
+
+        graph.ensure_loaded(ConcurrentWrites())
+
+        assert graph.friends_of(7) == {8}
+        assert graph.friends_of(9) == set()
+        assert graph._journals == []
@@ -114,6 +114,45 @@ class TestArcades:
         assert data["games"][0]["id"] == sample_id
         assert data["games"][0]["slot_number"] == 1
 
+    def test_get_arcades_sparse_fields(self, client, sample_arcade, sample_game, db, query_budget):
+        """Test de fields= sans les jeux : pas de requête sur les jeux installés."""
+        from app.models import ArcadeGame
+        db.add(ArcadeGame(arcade_id=sample_arcade.id, game_id=sample_game.id, slot_number=1))
+        db.commit()
+        nom, latitude = sample_arcade.nom, sample_arcade.latitude
+
+        with query_budget(1) as requests:
+            response = client.get("/api/v1/arcades/?fields=nom,latitude")
+
+        assert response.status_code == 200
+        assert response.json() == [{"nom": nom, "latitude": latitude}]
+        assert not any("arcade_games" in statement for statement in requests[0].statements)
+
+    def test_get_arcades_with_games_single_query(self, client, sample_arcade, sample_game, db, query_budget):
+        """Les jeux de toutes les bornes sont chargés en une requête."""
+        from app.models import Arcade, ArcadeGame
+        other = Arcade(
+            nom="Autre borne",
+            description="Deuxième borne",
+            api_key="other_arcade_key",
+            localisation="Lyon",
+            latitude=45.75,
+            longitude=4.85
+        )
+        db.add(other)
+        db.flush()
+        db.add_all([
+            ArcadeGame(arcade_id=sample_arcade.id, game_id=sample_game.id, slot_number=1),
+            ArcadeGame(arcade_id=other.id, game_id=sample_game.id, slot_number=2),
+        ])
+        db.commit()
+
+        with query_budget(2):
+            response = client.get("/api/v1/arcades/?fields=id,games")
+
+        assert response.status_code == 200
+        assert [[game["slot_number"] for game in arcade["games"]] for arcade in response.json()] == [[1], [2]]
+
     def test_get_arcade_queue_unauthorized(self, client, sample_arcade):
         """Test d'accès à la file sans clé API."""
         response = client.get(f"/api/v1/arcades/{sample_arcade.id}/queue")
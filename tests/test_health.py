@@ -0,0 +1,77 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
+from app.core.database import pool_status, ping_database, warm_up_pool
+
+
+class TestHealth:
+    """Tests des endpoints de santé et de l'état du pool."""
+
+    @pytest.fixture
+    def queue_pool_engine(self, tmp_path):
+        """Moteur avec un pool borné (2 connexions, pas de débordement)."""
+        engine = create_engine(
+            f"sqlite:///{tmp_path / 'pool.db'}",
+            poolclass=QueuePool,
+            pool_size=2,
+            max_overflow=0,
+            pool_timeout=0.1
+        )
+        yield engine
+        engine.dispose()
+
+    def test_health(self, client):
+        """Test du endpoint de santé statique."""
+        response = client.get("/health")
+
+        assert response.status_code == 200
+        assert response.json() == {"status": "healthy"}
+
+    def test_pool_status_reports_saturation(self, queue_pool_engine):
+        """La saturation correspond à la part du pool empruntée."""
+        assert pool_status(queue_pool_engine)["saturation"] == 0.0
+
+        connection = queue_pool_engine.connect()
+        status = pool_status(queue_pool_engine)
+        assert status["checked_out"] == 1
+        assert status["saturation"] == 0.5
+        connection.close()
+
+    def test_warm_up_pool(self, queue_pool_engine):
+        """Le préchauffage ouvre toutes les connexions du pool puis les rend."""
+        assert warm_up_pool(queue_pool_engine) == 2
+
+        status = pool_status(queue_pool_engine)
+        assert status["checked_in"] == 2
+        assert status["checked_out"] == 0
+
+    def test_ping_database(self, queue_pool_engine):
+        """Le ping mesure l'aller-retour vers la base."""
+        assert ping_database(queue_pool_engine) >= 0
+
+    def test_readiness_ok(self, client, queue_pool_engine, monkeypatch):
+        """L'instance est prête lorsque le pool a de la marge."""
+        monkeypatch.setattr("app.main.engine", queue_pool_engine)
+
+        response = client.get("/health/ready")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "ready"
+        assert data["pool_saturated"] is False
+        assert data["database_round_trip_ms"] is not None
+
+    def test_readiness_saturated_pool(self, client, queue_pool_engine, monkeypatch):
+        """Un pool saturé rend l'instance non prête (503) sans attendre de connexion."""
+        monkeypatch.setattr("app.main.engine", queue_pool_engine)
+        connections = [queue_pool_engine.connect() for _ in range(2)]
+
+        response = client.get("/health/ready")
+
+        for connection in connections:
+            connection.close()
+        assert response.status_code == 503
+        data = response.json()
+        assert data["status"] == "not_ready"
+        assert data["pool_saturated"] is True
+        assert data["database_round_trip_ms"] is None
@@ -0,0 +1,108 @@
+import pytest
+import re
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class TestIndexes:
+    """Vérifie via EXPLAIN que les routes chaudes utilisent les index de la migration 005."""
+
+    @pytest.fixture
+    def captured_selects(self):
+        """Capture les SELECT réellement émis par les routes."""
+        statements = []
+
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.lstrip().upper().startswith("SELECT"):
+                statements.append((statement, parameters))
+
+        event.listen(Engine, "before_cursor_execute", capture)
+        yield statements
+        event.remove(Engine, "before_cursor_execute", capture)
+
+    @staticmethod
+    def plans_for(db, statements, table):
+        """Plans d'exécution (EXPLAIN QUERY PLAN) des requêtes portant sur une table."""
+        pattern = re.compile(rf"\bFROM {table}\b")
+        plans = []
+        for statement, parameters in statements:
+            if pattern.search(statement):
+                rows = db.connection().exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()
+                plans.append(" | ".join(row[3] for row in rows))
+        assert plans, f"Aucune requête sur {table} capturée"
+        return plans
+
+    def test_scores_feed_uses_created_at_index(self, client, auth_headers_user, db, captured_selects):
+        """Le fil des scores parcourt l'index partiel sur created_at."""
+        response = client.get("/api/v1/scores/", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        plans = self.plans_for(db, captured_selects, "scores")
+        assert any("ix_scores_created_at_active" in plan for plan in plans)
+
+    def test_scores_by_game_uses_composite_index(self, client, auth_headers_user, sample_game, db,
+                                                 captured_selects):
+        """Le filtre par jeu utilise l'index (game_id, created_at)."""
+        response = client.get(f"/api/v1/scores/?game_id={sample_game.id}", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        plans = self.plans_for(db, captured_selects, "scores")
+        assert any("ix_scores_game_id_created_at" in plan for plan in plans)
+
+    def test_scores_by_arcade_uses_composite_index(self, client, auth_headers_user, sample_arcade, db,
+                                                   captured_selects):
+        """Le filtre par borne utilise l'index (arcade_id, created_at)."""
+        response = client.get(f"/api/v1/scores/?arcade_id={sample_arcade.id}", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        plans = self.plans_for(db, captured_selects, "scores")
+        assert any("ix_scores_arcade_id_created_at" in plan for plan in plans)
+
+    def test_my_stats_uses_player_indexes(self, client, auth_headers_user, db, captured_selects):
+        """Les statistiques personnelles utilisent les index par joueur."""
+        response = client.get("/api/v1/scores/my-stats", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        plans = self.plans_for(db, captured_selects, "scores")
+        assert any("ix_scores_player1_id_created_at" in plan for plan in plans)
+        assert any("ix_scores_player2_id_created_at" in plan for plan in plans)
+
+    def test_arcade_queue_uses_reservation_index(self, client, arcade_api_headers, sample_arcade, db,
+                                                 captured_selects):
+        """La file d'attente d'une borne utilise l'index (arcade_id, status, created_at)."""
+        response = client.get(f"/api/v1/arcades/{sample_arcade.id}/queue", headers=arcade_api_headers)
+
+        assert response.status_code == 200
+        plans = self.plans_for(db, captured_selects, "reservations")
+        assert any("ix_reservations_arcade_status_created_at" in plan for plan in plans)
+
+    def test_friends_list_uses_friendship_indexes(self, client, auth_headers_user, db, captured_selects):
+        """La liste d'amis utilise les index des deux sens de la relation."""
+        response = client.get("/api/v1/friends/", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        plans = self.plans_for(db, captured_selects, "friendships")
+        assert any(
+            "ix_friendships_requester_id_status" in plan and "ix_friendships_requested_id_status" in plan
+            for plan in plans
+        )
+
+    def test_available_promos_uses_promo_use_index(self, client, auth_headers_user, sample_promo_code, db,
+                                                   captured_selects):
+        """La vérification "déjà utilisé" utilise l'index (user_id, promo_code_id)."""
+        response = client.get("/api/v1/promos/available", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        plans = self.plans_for(db, captured_selects, "promo_uses")
+        assert any("ix_promo_uses_user_id_promo_code_id" in plan for plan in plans)
+
+    def test_friendship_statuses_use_friendship_indexes(self, client, auth_headers_user, db, captured_selects):
+        """Le statut des relations interroge les deux sens via leurs index."""
+        response = client.post("/api/v1/friends/status", json={"user_ids": [2, 3]}, headers=auth_headers_user)
+
+        assert response.status_code == 200
+        plans = self.plans_for(db, captured_selects, "friendships")
+        assert any(
+            "ix_friendships_requester_id_status" in plan and "ix_friendships_requested_id_status" in plan
+            for plan in plans
+        )
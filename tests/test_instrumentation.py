@@ -0,0 +1,83 @@
+import pytest
+import logging
+from app.core.config import settings
+
+
+class TestInstrumentation:
+    """Tests de l'instrumentation SQL par requête."""
+
+    @pytest.fixture
+    def many_scores(self, db, sample_user, sample_game, sample_arcade):
+        """Scores solo en nombre suffisant pour révéler un N+1."""
+        from app.models import Score
+        for i in range(6):
+            db.add(Score(
+                player1_id=sample_user.id,
+                game_id=sample_game.id,
+                arcade_id=sample_arcade.id,
+                score_j1=100 + i
+            ))
+        db.commit()
+
+    def test_query_headers_in_debug(self, client, monkeypatch):
+        """En mode DEBUG, le nombre de requêtes et le temps SQL sont renvoyés en en-têtes."""
+        monkeypatch.setattr(settings, "DEBUG", True)
+
+        response = client.get("/api/v1/games/")
+
+        assert response.status_code == 200
+        assert response.headers["X-DB-Query-Count"] == "1"
+        assert float(response.headers["X-DB-Query-Time-Ms"]) >= 0
+
+    def test_no_query_headers_in_production(self, client, monkeypatch):
+        """Hors DEBUG, les compteurs ne sont pas exposés."""
+        monkeypatch.setattr(settings, "DEBUG", False)
+
+        response = client.get("/api/v1/games/")
+
+        assert response.status_code == 200
+        assert "X-DB-Query-Count" not in response.headers
+
+    def test_route_template_recorded(self, client, sample_game, query_budget):
+        """Les statistiques sont rattachées au chemin déclaré de la route."""
+        with query_budget(1) as requests:
+            client.get(f"/api/v1/games/{sample_game.id}")
+
+        assert requests[0].route == "/api/v1/games/{game_id}"
+
+    def test_my_stats_query_budget(self, client, auth_headers_user, query_budget):
+        """Les statistiques personnelles restent dans leur budget de requêtes."""
+        with query_budget(5):
+            response = client.get("/api/v1/scores/my-stats", headers=auth_headers_user)
+
+        assert response.status_code == 200
+
+    def test_query_budget_exceeded(self, client, auth_headers_user, query_budget):
+        """Un dépassement de budget fait échouer le test."""
+        with pytest.raises(AssertionError, match="budget"):
+            with query_budget(1):
+                client.get("/api/v1/scores/my-stats", headers=auth_headers_user)
+
+    def test_repeated_statements_flagged(self, db, sample_user, caplog):
+        """Les instructions identiques répétées sont signalées comme N+1."""
+        from app.models import User
+        from app.core.instrumentation import track_queries, record_request, route_totals
+
+        with caplog.at_level(logging.WARNING, logger="app.core.instrumentation"):
+            with track_queries("/test/n-plus-one") as stats:
+                for _ in range(settings.QUERY_REPEAT_WARNING_THRESHOLD):
+                    db.query(User).filter(User.id == sample_user.id).first()
+            record_request(stats)
+
+        assert stats.repeated_statements()
+        assert "N+1 suspecté sur /test/n-plus-one" in caplog.text
+        assert route_totals()["/test/n-plus-one"].n_plus_one_requests >= 1
+
+    def test_scores_list_query_budget(self, client, auth_headers_user, many_scores, query_budget):
+        """La liste des scores ne dépend pas du nombre de scores en nombre de requêtes."""
+        with query_budget(2) as requests:
+            response = client.get("/api/v1/scores/", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        assert len(response.json()) == 6
+        assert not requests[0].repeated_statements()
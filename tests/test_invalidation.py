@@ -0,0 +1,122 @@
+import json
+from app.core import invalidation
+from app.core.database import engine
+from app.core.invalidation import InvalidationBus, PostgresInvalidationBus, invalidation_bus, MAX_PAYLOAD_BYTES
+from app.core.query_cache import query_cache
+from app.models import Game
+from app.services.friend_service import friend_graph
+from app.services.user_service import pseudo_index
+
+
+class RecordingBus(InvalidationBus):
+    """Bus distant simulé : enregistre les messages émis et la connexion utilisée."""
+
+    remote = True
+
+    def __init__(self):
+        super().__init__()
+        self.sent = []
+
+    def send(self, messages, connection=None):
+        self.sent.append((list(messages), connection is not None))
+
+
+class TestInvalidation:
+    """Tests du bus d'invalidation des caches entre workers."""
+
+    def test_session_message_dispatched_after_commit(self, db, monkeypatch):
+        """Un message lié à une session n'est appliqué qu'après le commit."""
+        received = []
+        monkeypatch.setitem(invalidation_bus._handlers, "test", [received.append])
+
+        invalidation_bus.publish("test", {"id": 1}, session=db)
+        assert received == []
+
+        db.commit()
+        assert received == [{"id": 1}]
+
+    def test_session_message_dropped_on_rollback(self, db, monkeypatch):
+        """Une écriture annulée ne publie rien."""
+        received = []
+        monkeypatch.setitem(invalidation_bus._handlers, "test", [received.append])
+
+        db.add(Game(nom="Pong", description="Classique", min_players=1, max_players=2, ticket_cost=1))
+        db.flush()
+        invalidation_bus.publish("test", {"id": 1}, session=db)
+        db.rollback()
+        db.commit()
+
+        assert received == []
+
+    def test_messages_sent_within_transaction(self, db, monkeypatch):
+        """Avec un bus distant, les messages partent dans la transaction d'écriture (au flush)."""
+        bus = RecordingBus()
+        monkeypatch.setattr(invalidation, "invalidation_bus", bus)
+
+        db.add(Game(nom="Pong", description="Classique", min_players=1, max_players=2, ticket_cost=1))
+        db.flush()
+        assert bus.sent == [([("tables", {"tables": ["games"]})], True)]
+
+        db.commit()
+        # Rien de nouveau à émettre au commit
+        assert len(bus.sent) == 1
+
+    def test_local_bus_sends_nothing(self, db, monkeypatch):
+        """Avec SQLite, aucune émission : pas de connexion empruntée pour rien."""
+        calls = []
+        monkeypatch.setattr(InvalidationBus, "send", lambda self, messages, connection=None: calls.append(1))
+
+        db.add(Game(nom="Pong", description="Classique", min_players=1, max_players=2, ticket_cost=1))
+        db.commit()
+
+        assert calls == []
+
+    def test_remote_message_applied_and_own_ignored(self):
+        """Un worker applique les messages des autres et ignore les siens."""
+        bus = PostgresInvalidationBus(engine, "test_channel")
+        received = []
+        bus.subscribe("tables", received.append)
+
+        bus._receive(json.dumps({"origin": "autre-worker", "topic": "tables", "payload": {"tables": ["scores"]}}))
+        bus._receive(json.dumps({"origin": bus.origin, "topic": "tables", "payload": {"tables": ["games"]}}))
+        bus._receive("pas du json")
+
+        assert received == [{"tables": ["scores"]}]
+
+    def test_oversized_message_becomes_resync(self):
+        """Un message trop gros pour NOTIFY est remplacé par une resynchronisation."""
+        bus = PostgresInvalidationBus(engine, "test_channel")
+
+        message = json.loads(bus._encode("users", {"pseudo": "x" * MAX_PAYLOAD_BYTES}))
+
+        assert message["topic"] == "resync"
+
+    def test_friendship_message_updates_graph(self, db):
+        """Une amitié acceptée puis retirée dans un autre worker est reportée dans le graphe local."""
+        friend_graph.ensure_loaded(db)
+
+        invalidation_bus.dispatch("friendships", {"action": "add", "user_id": 1, "friend_id": 2})
+        assert friend_graph.friends_of(1) == {2}
+
+        invalidation_bus.dispatch("friendships", {"action": "remove_user", "user_id": 2, "friend_id": None})
+        assert friend_graph.friends_of(1) == set()
+
+    def test_user_message_updates_pseudo_index(self, db, sample_user):
+        """Un pseudo modifié dans un autre worker est réindexé localement."""
+        pseudo_index.ensure_loaded(db)
+
+        invalidation_bus.dispatch("users", {"id": sample_user.id, "pseudo": "NouveauPseudo", "nom": "Nom",
+                                            "prenom": "Prénom", "is_deleted": False})
+
+        assert not pseudo_index.is_available("NouveauPseudo")
+        assert pseudo_index.is_available(sample_user.pseudo)
+
+    def test_resync_clears_local_caches(self, db, sample_user):
+        """La resynchronisation vide les caches : ils sont rechargés au prochain accès."""
+        pseudo_index.ensure_loaded(db)
+        query_cache.get_or_load("test.resync", {}, ("games",), lambda: [1])
+
+        invalidation_bus.resync()
+
+        assert pseudo_index.is_available(sample_user.pseudo)
+        assert query_cache.backend.stats()["entries"] == 0
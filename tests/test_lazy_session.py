@@ -0,0 +1,131 @@
+import pytest
+from fastapi import APIRouter, Depends, FastAPI, HTTPException
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from pydantic import BaseModel, model_validator
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.database import Base, SessionReleasingRoute, release_connection
+from app.models import Game
+
+
+class TestSessionRelease:
+    """Tests de l'emprunt paresseux et de la restitution anticipée des connexions."""
+
+    @pytest.fixture
+    def pool(self, tmp_path):
+        """Base dédiée, avec le suivi des emprunts du pool et de l'état des sessions à leur fermeture."""
+        engine = create_engine(f"sqlite:///{tmp_path / 'lazy.db'}")
+        Base.metadata.create_all(bind=engine)
+        factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+        with factory() as db:
+            db.add(Game(nom="Pong", description="Classique", min_players=1, max_players=2, ticket_cost=1))
+            db.commit()
+
+        tracking = {"checkouts": 0, "held_at_close": [], "held_during_serialization": []}
+
+        @event.listens_for(engine, "checkout")
+        def count_checkout(*args):
+            tracking["checkouts"] += 1
+
+        def get_session():
+            db = factory()
+            try:
+                yield db
+            finally:
+                tracking["held_at_close"].append(db.in_transaction())
+                db.close()
+
+        tracking.update(engine=engine, get_session=get_session)
+        yield tracking
+        engine.dispose()
+
+    @staticmethod
+    def make_client(pool, route_class=SessionReleasingRoute):
+        router = APIRouter(route_class=route_class)
+        get_session = pool["get_session"]
+
+        class GameOut(BaseModel):
+            nom: str
+
+            @model_validator(mode="before")
+            @classmethod
+            def record_pool(cls, data):
+                pool["held_during_serialization"].append(pool["engine"].pool.checkedout())
+                return data
+
+            model_config = {"from_attributes": True}
+
+        def load_game(db: Session = Depends(get_session)):
+            return db.query(Game).first()
+
+        @router.get("/games/first", response_model=GameOut)
+        def first_game(db: Session = Depends(get_session)):
+            return db.query(Game).first()
+
+        @router.get("/games/missing")
+        async def missing_game(db: Session = Depends(get_session)):
+            db.query(Game).filter(Game.id == 999).first()
+            raise HTTPException(status_code=404, detail="Jeu non trouvé")
+
+        @router.get("/games/loaded", response_model=GameOut)
+        def loaded_game(game: Game = Depends(load_game)):
+            return game
+
+        @router.get("/games/forbidden")
+        def forbidden(limit: int, db: Session = Depends(get_session)):
+            raise HTTPException(status_code=403, detail="Accès refusé")
+
+        app = FastAPI()
+        app.include_router(router)
+        return TestClient(app)
+
+    def test_connection_returned_before_serialization(self, pool):
+        """La connexion est rendue avant la validation du ``response_model``."""
+        response = self.make_client(pool).get("/games/first")
+
+        assert response.json() == {"nom": "Pong"}
+        assert pool["held_during_serialization"] == [0]
+        assert pool["held_at_close"] == [False]
+
+    def test_default_route_holds_connection(self, pool):
+        """Référence : sans la route dédiée, la connexion reste empruntée jusqu'à la fermeture."""
+        self.make_client(pool, route_class=APIRoute).get("/games/first")
+
+        assert pool["held_during_serialization"] == [1]
+        assert pool["held_at_close"] == [True]
+
+    def test_released_when_handler_raises(self, pool):
+        """Un handler (asynchrone) qui lève une exception rend aussi sa connexion."""
+        response = self.make_client(pool).get("/games/missing")
+
+        assert response.status_code == 404
+        assert pool["held_at_close"] == [False]
+
+    def test_session_reached_through_loaded_object(self, pool):
+        """La session d'une dépendance est retrouvée par l'objet qu'elle a chargé (``current_user``)."""
+        response = self.make_client(pool).get("/games/loaded")
+
+        assert response.status_code == 200
+        assert pool["held_at_close"] == [False]
+
+    def test_no_checkout_without_query(self, pool):
+        """Erreur de validation ou de permission avant toute requête : aucun emprunt au pool."""
+        client = self.make_client(pool)
+        checkouts = pool["checkouts"]
+
+        assert client.get("/games/forbidden", params={"limit": "abc"}).status_code == 422
+        assert client.get("/games/forbidden", params={"limit": 1}).status_code == 403
+        assert pool["checkouts"] == checkouts
+
+    def test_release_keeps_objects_loaded(self, db):
+        """Après restitution, les objets restent attachés et lisibles sans nouvelle requête."""
+        db.add(Game(nom="Tetris", description="Blocs", min_players=1, max_players=1, ticket_cost=1))
+        db.flush()
+        game = db.query(Game).first()
+
+        assert release_connection(db)
+        assert not db.in_transaction()
+        assert game in db
+        assert game.nom == "Tetris"
+        assert not release_connection(db)
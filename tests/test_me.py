@@ -0,0 +1,153 @@
+import pytest
+import time
+import datetime
+
+
+class TestDashboard:
+    """Tests pour l'endpoint tableau de bord."""
+
+    @pytest.fixture(autouse=True)
+    def section_sessions(self, client, db):
+        """Sessions des sections liées à la connexion de test.
+
+        Avec la base en mémoire, la fermeture d'une session ordinaire annulerait
+        les données des fixtures avant que les autres sections ne les lisent.
+        """
+        from sqlalchemy.orm import sessionmaker
+        from app.main import app
+        from app.core.database import get_read_session_factory
+        app.dependency_overrides[get_read_session_factory] = lambda: sessionmaker(bind=db.connection())
+
+    @pytest.fixture
+    def dashboard_data(self, db, sample_user, sample_arcade, sample_game, sample_promo_code):
+        """Une réservation, une demande d'ami reçue et un code promo disponible."""
+        from app.models import User, Friendship, Reservation
+        requester = User(
+            firebase_uid="dashboard_friend_uid",
+            email="dashboardfriend@example.com",
+            nom="Ami",
+            prenom="Tableau",
+            pseudo="dashboardfriend",
+            date_naissance=datetime.date(1990, 1, 1),
+            numero_telephone="0912345678"
+        )
+        db.add(requester)
+        db.flush()
+        db.add_all([
+            Friendship(requester_id=requester.id, requested_id=sample_user.id),
+            Reservation(
+                player_id=sample_user.id,
+                arcade_id=sample_arcade.id,
+                game_id=sample_game.id,
+                unlock_code="3",
+                tickets_used=sample_game.ticket_cost
+            )
+        ])
+        db.commit()
+        return requester
+
+    def test_dashboard_success(self, client, auth_headers_user, sample_user, dashboard_data):
+        """Test du tableau de bord complet."""
+        pseudo, balance = sample_user.pseudo, sample_user.tickets_balance
+
+        response = client.get("/api/v1/me/dashboard", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["user"]["pseudo"] == pseudo
+        assert data["tickets_balance"] == balance
+        assert len(data["reservations"]) == 1
+        assert data["reservations"][0]["position_in_queue"] == 1
+        assert [request["requester"]["pseudo"] for request in data["friend_requests"]] == ["dashboardfriend"]
+        assert len(data["available_promos"]) == 1
+        assert data["unavailable_sections"] == []
+
+    def test_dashboard_partial_on_slow_section(self, client, auth_headers_user, dashboard_data, monkeypatch):
+        """Une section trop lente est omise sans bloquer les autres."""
+        from app.api.v1 import me
+        from app.services import promo_service
+
+        def slow_promos(db, user_id):
+            time.sleep(0.5)
+            return []
+
+        monkeypatch.setattr(promo_service, "available_promo_codes", slow_promos)
+        monkeypatch.setattr(me.settings, "DASHBOARD_TIMEOUT_SECONDS", 0.2)
+
+        response = client.get("/api/v1/me/dashboard", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["available_promos"] is None
+        assert data["unavailable_sections"] == ["available_promos"]
+        assert len(data["reservations"]) == 1
+
+    def test_dashboard_partial_on_failing_section(self, client, auth_headers_user, dashboard_data, monkeypatch):
+        """Une section en erreur est omise sans faire échouer la requête."""
+        from app.services import reservation_service
+
+        def failing_reservations(db, user_id):
+            raise RuntimeError("base indisponible")
+
+        monkeypatch.setattr(reservation_service, "list_user_reservations", failing_reservations)
+
+        response = client.get("/api/v1/me/dashboard", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["reservations"] is None
+        assert data["unavailable_sections"] == ["reservations"]
+        assert len(data["friend_requests"]) == 1
+
+    def test_dashboard_sections_run_concurrently(self, client, auth_headers_user, dashboard_data, monkeypatch):
+        """Les sections lentes se chevauchent au lieu de s'additionner."""
+        from app.api.v1 import me
+        from app.services import promo_service, reservation_service
+
+        def slow(db, user_id):
+            time.sleep(0.3)
+            return []
+
+        monkeypatch.setattr(promo_service, "available_promo_codes", slow)
+        monkeypatch.setattr(reservation_service, "list_user_reservations", slow)
+        monkeypatch.setattr(me.settings, "DASHBOARD_TIMEOUT_SECONDS", 0.5)
+
+        response = client.get("/api/v1/me/dashboard", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        assert response.json()["unavailable_sections"] == []
+
+    def test_section_past_deadline_not_started(self):
+        """Une section restée en file au-delà de l'échéance n'ouvre pas de session."""
+        from app.api.v1 import me
+        opened = []
+
+        with pytest.raises(TimeoutError):
+            me._run_section(lambda db, user_id: [], lambda: opened.append(1), 1, time.monotonic() - 1)
+
+        assert opened == []
+
+    def test_section_statement_timeout_follows_deadline(self):
+        """Sur PostgreSQL, les requêtes d'une section sont bornées au temps restant."""
+        from unittest.mock import MagicMock
+        from app.api.v1 import me
+        db = MagicMock()
+        db.get_bind.return_value.dialect.name = "postgresql"
+
+        me._apply_statement_timeout(db, time.monotonic() + 1.5)
+
+        statement, parameters = db.execute.call_args.args
+        assert "set_config('statement_timeout'" in str(statement)
+        assert 1000 < int(parameters["timeout"]) <= 1500
+
+    def test_sections_use_bounded_executor(self):
+        """Les sections tournent sur un exécuteur dédié, borné par la configuration."""
+        from app.api.v1 import me
+
+        assert me._section_executor._max_workers == me.settings.DASHBOARD_MAX_WORKERS
+
+    def test_dashboard_unauthorized(self, client):
+        """Test d'accès non autorisé au tableau de bord."""
+        response = client.get("/api/v1/me/dashboard")
+
+        assert response.status_code == 403
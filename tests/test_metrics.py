@@ -0,0 +1,73 @@
+import pytest
+from app.core.metrics import Histogram
+
+
+class TestMetrics:
+    """Tests de l'exposition des métriques."""
+
+    def test_metrics_endpoint_format(self, client):
+        """L'endpoint /metrics renvoie le format texte Prometheus."""
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE http_request_duration_seconds histogram" in response.text
+        assert "http_requests_in_flight 1" in response.text
+
+    def test_request_duration_by_route_template(self, client, sample_game):
+        """Les durées sont agrégées par chemin déclaré, méthode et statut."""
+        client.get(f"/api/v1/games/{sample_game.id}")
+        client.get("/api/v1/games/99999")
+
+        text = client.get("/metrics").text
+
+        assert 'http_request_duration_seconds_count{route="/api/v1/games/{game_id}",method="GET",status="200"}' in text
+        assert 'http_request_duration_seconds_count{route="/api/v1/games/{game_id}",method="GET",status="404"}' in text
+        assert f"/api/v1/games/{sample_game.id}\"" not in text
+
+    def test_query_totals_exported(self, client):
+        """Les cumuls SQL de l'instrumentation sont exportés par route."""
+        client.get("/api/v1/games/")
+
+        text = client.get("/metrics").text
+
+        assert 'db_queries_total{route="/api/v1/games/"}' in text
+
+    def test_firebase_verification_timed(self, client):
+        """Les vérifications de token Firebase sont chronométrées."""
+        from app.core.security import verify_firebase_token
+
+        assert verify_firebase_token("not-a-token", "user") is None
+
+        text = client.get("/metrics").text
+        assert 'firebase_token_verification_seconds_count{app_type="user",result="invalid"}' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Les compteurs de bornes sont cumulatifs et cohérents avec _count."""
+        histogram = Histogram("test_latency_seconds", "Test", ("route",), buckets=(0.1, 1.0))
+        histogram.observe(0.05, "/a")
+        histogram.observe(0.1, "/a")
+        histogram.observe(0.5, "/a")
+        histogram.observe(3.0, "/a")
+
+        lines = histogram.collect()
+
+        assert 'test_latency_seconds_bucket{route="/a",le="0.1"} 2' in lines
+        assert 'test_latency_seconds_bucket{route="/a",le="1"} 3' in lines
+        assert 'test_latency_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+        assert 'test_latency_seconds_count{route="/a"} 4' in lines
+        assert 'test_latency_seconds_sum{route="/a"} 3.65' in lines
+
+    def test_histogram_merges_thread_shards(self):
+        """Les observations faites depuis plusieurs threads sont fusionnées à la collecte."""
+        import threading
+        histogram = Histogram("test_threads_seconds", "Test")
+
+        threads = [threading.Thread(target=lambda: [histogram.observe(0.01) for _ in range(100)])
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert "test_threads_seconds_count 400" in histogram.collect()
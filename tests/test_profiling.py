@@ -0,0 +1,124 @@
+import time
+import pytest
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from app.core import profiling
+from app.core.profiling import RequestProfiler, build_call_tree, profile_store
+
+
+def busy_loop(duration):
+    """Fonction à repérer dans l'arbre d'appels."""
+    end = time.perf_counter() + duration
+    while time.perf_counter() < end:
+        pass
+
+
+class TestProfiling:
+    """Tests du profilage à la demande."""
+
+    @pytest.fixture
+    def profile_headers(self, mock_firebase, sample_user, sample_admin_user):
+        """Token utilisateur pour la route, token admin pour le profilage."""
+        identities = {"user": sample_user, "admin": sample_admin_user}
+
+        def verify(token, app_type="user"):
+            expected = {"user": "user_token", "admin": "admin_token"}[app_type]
+            if token != expected:
+                return None
+            user = identities[app_type]
+            return {"uid": user.firebase_uid, "email": user.email, "email_verified": True}
+
+        mock_firebase.side_effect = verify
+        return {"Authorization": "Bearer user_token", "X-Profile-Token": "admin_token", "X-Profile": "1"}
+
+    def test_profiled_request(self, client, profile_headers, sample_game):
+        """Avec X-Profile et un token admin, le profil est stocké avec son temps SQL."""
+        response = client.get("/api/v1/games/", headers=profile_headers)
+
+        assert response.status_code == 200
+        profile = profile_store.get(response.headers["x-profile-id"])
+        assert profile["route"] == "/api/v1/games/"
+        assert profile["status"] == 200
+        assert profile["sql"]["count"] >= 1
+        assert profile["sql"]["statements"][0]["statement"].startswith("SELECT")
+        assert profile["call_tree"]["function"] == "<requête>"
+
+    def test_profile_query_flag(self, client, profile_headers):
+        """Le paramètre ?profile=1 déclenche aussi le profilage."""
+        response = client.get("/health?profile=1", headers={"X-Profile-Token": "admin_token"})
+
+        assert "x-profile-id" in response.headers
+
+    def test_profiled_user_route(self, client, profile_headers):
+        """Une route utilisateur reste authentifiée par Authorization pendant son profilage."""
+        response = client.get("/api/v1/reservations/", headers=profile_headers)
+
+        assert response.status_code == 200
+        profile = profile_store.get(response.headers["x-profile-id"])
+        assert profile["route"] == "/api/v1/reservations/"
+        assert profile["sql"]["count"] >= 1
+
+    def test_admin_authorization_does_not_enable_profiling(self, client, profile_headers):
+        """Un token admin dans Authorization ne suffit pas : la preuve passe par X-Profile-Token."""
+        response = client.get("/health", headers={"Authorization": "Bearer admin_token", "X-Profile": "1"})
+
+        assert "x-profile-id" not in response.headers
+
+    def test_not_profiled_without_admin(self, client, mock_firebase):
+        """Sans token admin valide, la requête est servie sans profilage."""
+        mock_firebase.return_value = None
+
+        response = client.get("/health", headers={"X-Profile-Token": "x", "X-Profile": "1"})
+
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+        assert profile_store.summaries() == []
+
+    def test_sql_listeners_idle_when_disabled(self, client, sample_game):
+        """Écouteurs SQL permanents, inactifs sans profilage en cours."""
+        response = client.get("/api/v1/games/")
+
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+        assert event.contains(Engine, "before_cursor_execute", profiling._before_cursor_execute)
+        assert profile_store.summaries() == []
+
+    def test_admin_profile_endpoints(self, client, auth_headers_admin):
+        """Les profils sont listés sans arbre et consultables par identifiant."""
+        profile_store.add({"id": "abc", "route": "/x", "call_tree": {"function": "<requête>"}})
+
+        listing = client.get("/api/v1/admin/profiles", headers=auth_headers_admin)
+        detail = client.get("/api/v1/admin/profiles/abc", headers=auth_headers_admin)
+        missing = client.get("/api/v1/admin/profiles/inconnu", headers=auth_headers_admin)
+
+        assert listing.json() == [{"id": "abc", "route": "/x"}]
+        assert detail.json()["call_tree"] == {"function": "<requête>"}
+        assert missing.status_code == 404
+
+    def test_sampler_builds_call_tree(self):
+        """Les piles échantillonnées du thread profilé forment l'arbre d'appels."""
+        profiler = RequestProfiler(interval=0.001)
+        profiler.start()
+        busy_loop(0.1)
+        profiler.stop()
+
+        report = profiler.report(id="test")
+
+        assert report["samples"] > 10
+        labels = []
+        stack = [report["call_tree"]]
+        while stack:
+            node = stack.pop()
+            labels.append(node["function"])
+            stack.extend(node["children"])
+        assert any(label.startswith("busy_loop ") for label in labels)
+
+    def test_build_call_tree(self):
+        """Les piles partageant un préfixe sont fusionnées, enfants triés par échantillons."""
+        tree = build_call_tree({("main", "a"): 3, ("main", "b"): 5, ("main",): 1}, interval=0.01)
+
+        main = tree["children"][0]
+        assert tree["samples"] == 9
+        assert main["samples"] == 9
+        assert [child["function"] for child in main["children"]] == ["b", "a"]
+        assert main["children"][0]["estimated_ms"] == 50.0
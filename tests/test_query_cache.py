@@ -0,0 +1,153 @@
+import time
+from sqlalchemy import insert
+from app.core.config import settings
+from app.core.metrics import query_cache_requests
+from app.core.query_cache import MemoryBackend, QueryCache, SQLiteBackend, query_cache
+from app.models import Game, TicketOffer
+
+
+def _count(name, result):
+    return query_cache_requests.values().get((name, result), 0)
+
+
+class TestQueryCache:
+    """Tests du cache de requêtes invalidé par version de table."""
+
+    def test_second_read_served_from_cache(self, client, sample_game, query_budget):
+        """La deuxième lecture identique n'exécute aucune requête SQL."""
+        hits = _count("games.list", "hit")
+        first = client.get("/api/v1/games/")
+        with query_budget(0):
+            second = client.get("/api/v1/games/")
+
+        assert second.json() == first.json()
+        assert _count("games.list", "hit") == hits + 1
+
+    def test_write_invalidates_dependent_entries(self, client, sample_game, db):
+        """Une écriture dans ``games`` invalide la liste des jeux."""
+        stale = _count("games.list", "stale")
+        client.get("/api/v1/games/")
+
+        db.add(Game(nom="Pong", description="Classique", min_players=1, max_players=2, ticket_cost=1))
+        db.commit()
+        response = client.get("/api/v1/games/")
+
+        assert "Pong" in [game["nom"] for game in response.json()]
+        assert _count("games.list", "stale") == stale + 1
+
+    def test_unrelated_write_keeps_entries(self, client, sample_game, db):
+        """Une écriture dans une autre table ne touche pas aux résultats qui n'en dépendent pas."""
+        hits = _count("games.list", "hit")
+        client.get("/api/v1/games/")
+
+        db.add(TicketOffer(tickets_amount=5, price_euros=4.0, name="Petit pack"))
+        db.commit()
+        client.get("/api/v1/games/")
+
+        assert _count("games.list", "hit") == hits + 1
+
+    def test_bulk_insert_invalidates(self, db):
+        """Les ``insert()`` exécutés par la session incrémentent aussi la version de la table."""
+        before = query_cache.backend.versions(["games"])["games"]
+
+        db.execute(insert(Game), [{"nom": "Tetris", "description": "Blocs", "min_players": 1,
+                                   "max_players": 1, "ticket_cost": 1}])
+        db.commit()
+
+        assert query_cache.backend.versions(["games"])["games"] > before
+
+    def test_disabled(self, monkeypatch):
+        """Désactivé, chaque appel recharge."""
+        monkeypatch.setattr(settings, "QUERY_CACHE_ENABLED", False)
+        calls = []
+
+        for _ in range(2):
+            query_cache.get_or_load("test.disabled", {}, ("games",), lambda: calls.append(1) or [1])
+
+        assert len(calls) == 2
+
+    def test_replica_reads_not_cached(self, tmp_path, monkeypatch, db):
+        """Un résultat lu sur une réplica, peut-être en retard, n'est pas mis en cache."""
+        from sqlalchemy import create_engine
+        from app.core.database import _Replica, replica_router
+        replica = _Replica(create_engine(f"sqlite:///{tmp_path / 'replica.db'}"))
+        monkeypatch.setattr(replica_router, "replicas", [replica])
+        calls = []
+
+        replica_db = replica.session_factory()
+        try:
+            for _ in range(2):
+                query_cache.get_or_load("test.replica", {}, ("games",), lambda: calls.append(1) or [1], db=replica_db)
+        finally:
+            replica_db.close()
+            replica.engine.dispose()
+        assert len(calls) == 2
+
+        # Lu sur le primaire : mis en cache
+        query_cache.get_or_load("test.replica", {}, ("games",), lambda: calls.append(1) or [1], db=db)
+        query_cache.get_or_load("test.replica", {}, ("games",), lambda: calls.append(1) or [1], db=db)
+        assert len(calls) == 3
+
+    def test_memory_backend_bounds(self):
+        """LRU borné en entrées et en octets ; les entrées expirées sont ignorées."""
+        cache = QueryCache(MemoryBackend(max_entries=2, max_bytes=20))
+        load = lambda value: (lambda: value)
+
+        cache.get_or_load("q", {"n": 1}, ("t",), load("a"))
+        cache.get_or_load("q", {"n": 2}, ("t",), load("b"))
+        cache.get_or_load("q", {"n": 1}, ("t",), load("ignored"))
+        cache.get_or_load("q", {"n": 3}, ("t",), load("c"))
+
+        # {"n": 2} était le moins récemment lu
+        assert cache.backend.get('q:{"n": 2}') is None
+        assert cache.get_or_load("q", {"n": 1}, ("t",), load("x")) == "a"
+
+        cache.get_or_load("q", {"n": 4}, ("t",), load("y" * 30))
+        assert cache.backend.get('q:{"n": 4}') is None
+
+        cache.get_or_load("q", {"n": 5}, ("t",), load("d"), ttl=0)
+        assert cache.get_or_load("q", {"n": 5}, ("t",), load("e")) == "e"
+
+    def test_sqlite_backend_shared_between_workers(self, tmp_path):
+        """Deux workers sur le même fichier partagent résultats et versions de tables."""
+        path = str(tmp_path / "cache.db")
+        worker_a = QueryCache(SQLiteBackend(path, max_entries=100, max_bytes=1 << 20))
+        worker_b = QueryCache(SQLiteBackend(path, max_entries=100, max_bytes=1 << 20))
+
+        worker_a.get_or_load("scores.list", {"game_id": 1}, ("scores",), lambda: [{"score": 10}])
+        assert worker_b.get_or_load("scores.list", {"game_id": 1}, ("scores",), lambda: []) == [{"score": 10}]
+
+        # Écriture vue par le worker A : le worker B relit la base
+        worker_a.invalidate_tables({"scores"})
+        assert worker_b.get_or_load("scores.list", {"game_id": 1}, ("scores",), lambda: [{"score": 20}]) == [
+            {"score": 20}]
+
+    def test_sqlite_backend_evicts_least_recently_read(self, tmp_path):
+        """Au-delà de la borne, les entrées les moins récemment lues sont supprimées."""
+        backend = SQLiteBackend(str(tmp_path / "cache.db"), max_entries=2, max_bytes=1 << 20)
+
+        backend.set("a", b"1", {}, 60)
+        time.sleep(0.01)
+        backend.set("b", b"2", {}, 60)
+        time.sleep(0.01)
+        backend.get("a")
+        time.sleep(0.01)
+        backend.set("c", b"3", {}, 60)
+
+        assert backend.get("b") is None
+        assert backend.get("a") == (b"1", {})
+        assert backend.stats() == {"entries": 2, "bytes": 2}
+
+    def test_admin_stats(self, client, auth_headers_admin, sample_game):
+        """Les administrateurs consultent la taille du cache et le taux de succès."""
+        client.get("/api/v1/games/")
+        client.get("/api/v1/games/")
+
+        response = client.get("/api/v1/admin/query-cache", headers=auth_headers_admin)
+
+        assert response.status_code == 200
+        stats = response.json()
+        assert stats["entries"] >= 1
+        games = stats["queries"]["games.list"]
+        assert games["hit"] >= 1
+        assert games["hit_rate"] == round(games["hit"] / (games["hit"] + games["miss"] + games["stale"]), 4)
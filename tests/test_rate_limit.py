@@ -0,0 +1,182 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from app.api.middleware import RateLimitMiddleware
+from app.core.config import settings
+from app.core.metrics import http_requests_rejected
+from app.core.rate_limit import (
+    TokenBucket, RateLimiter, ConcurrencyLimiter, concurrency_limiter, parse_route_limits
+)
+
+
+class TestRateLimit:
+    """Tests de la limitation de débit et du délestage."""
+
+    @pytest.fixture
+    def strict_user_limit(self, monkeypatch):
+        monkeypatch.setattr(settings, "RATE_LIMIT_USER_PER_SECOND", 0.5)
+        monkeypatch.setattr(settings, "RATE_LIMIT_USER_BURST", 2)
+
+    def test_user_limited_with_retry_after(self, client, strict_user_limit):
+        """Au-delà de sa rafale, un utilisateur reçoit 429 avec Retry-After."""
+        headers = {"Authorization": "Bearer user-a"}
+
+        statuses = [client.get("/api/v1/games/", headers=headers).status_code for _ in range(3)]
+        response = client.get("/api/v1/games/", headers=headers)
+
+        assert statuses == [200, 200, 429]
+        assert response.status_code == 429
+        assert response.headers["retry-after"] == "2"
+
+    def test_users_limited_independently(self, client, strict_user_limit):
+        """Chaque utilisateur a son propre seau."""
+        for _ in range(2):
+            client.get("/api/v1/games/", headers={"Authorization": "Bearer user-a"})
+
+        assert client.get("/api/v1/games/", headers={"Authorization": "Bearer user-a"}).status_code == 429
+        assert client.get("/api/v1/games/", headers={"Authorization": "Bearer user-b"}).status_code == 200
+
+    def test_junk_api_key_does_not_bypass_user_limit(self, client, strict_user_limit):
+        """Une clé API invalide, différente à chaque requête, laisse l'utilisateur dans son seau."""
+        statuses = [
+            client.get("/api/v1/games/", headers={"Authorization": "Bearer user-a",
+                                                  "X-API-Key": f"fausse-cle-{index}"}).status_code
+            for index in range(3)
+        ]
+
+        assert statuses == [200, 200, 429]
+
+    def test_changing_tokens_capped_by_address(self, client, monkeypatch):
+        """Des tokens inventés à chaque requête restent plafonnés par adresse IP."""
+        monkeypatch.setattr(settings, "RATE_LIMIT_BY_ADDRESS", True)
+        monkeypatch.setattr(settings, "RATE_LIMIT_ADDRESS_BURST", 2)
+
+        statuses = [
+            client.get("/api/v1/games/", headers={"Authorization": f"Bearer token-{index}"}).status_code
+            for index in range(3)
+        ]
+
+        assert statuses == [200, 200, 429]
+
+    def test_anonymous_limited_by_client(self, client, monkeypatch):
+        """Les clients anonymes sont limités par adresse."""
+        monkeypatch.setattr(settings, "RATE_LIMIT_BY_ADDRESS", True)
+        monkeypatch.setattr(settings, "RATE_LIMIT_ANONYMOUS_BURST", 1)
+
+        assert client.get("/api/v1/games/").status_code == 200
+        assert client.get("/api/v1/games/").status_code == 429
+
+    def test_address_buckets_opt_in(self, client, monkeypatch):
+        """Sans adresse réelle configurée, pas de seau partagé par l'adresse du proxy."""
+        monkeypatch.setattr(settings, "RATE_LIMIT_ANONYMOUS_BURST", 1)
+        monkeypatch.setattr(settings, "RATE_LIMIT_ADDRESS_BURST", 1)
+
+        assert [client.get("/api/v1/games/").status_code for _ in range(3)] == [200, 200, 200]
+        assert [client.get("/api/v1/games/", headers={"Authorization": f"Bearer token-{index}"}).status_code
+                for index in range(3)] == [200, 200, 200]
+
+    def test_rejection_readable_by_browsers(self, client, strict_user_limit):
+        """Les 429 portent les en-têtes CORS ; les requêtes OPTIONS préliminaires ne sont pas limitées."""
+        headers = {"Authorization": "Bearer user-a", "Origin": "https://app.example.com"}
+        preflight = {"Origin": "https://app.example.com", "Access-Control-Request-Method": "GET",
+                     "Access-Control-Request-Headers": "authorization"}
+
+        statuses = [client.options("/api/v1/games/", headers=preflight).status_code for _ in range(5)]
+        for _ in range(2):
+            client.get("/api/v1/games/", headers=headers)
+        response = client.get("/api/v1/games/", headers=headers)
+
+        assert statuses == [200] * 5
+        assert response.status_code == 429
+        assert "access-control-allow-origin" in response.headers
+
+    def test_health_never_limited(self, client, monkeypatch):
+        """Les sondes de santé et /metrics ne sont pas limitées."""
+        monkeypatch.setattr(settings, "RATE_LIMIT_ANONYMOUS_BURST", 1)
+
+        assert [client.get("/health").status_code for _ in range(3)] == [200, 200, 200]
+
+    def test_route_limit_spares_kiosks(self, client, arcade_api_headers, monkeypatch):
+        """La limite globale d'une route s'applique aux utilisateurs, pas aux bornes."""
+        monkeypatch.setattr(settings, "RATE_LIMIT_ROUTES", "/api/v1/games/=0.1:1")
+
+        assert client.get("/api/v1/games/", headers={"Authorization": "Bearer user-a"}).status_code == 200
+        assert client.get("/api/v1/games/", headers={"Authorization": "Bearer user-b"}).status_code == 429
+        assert client.get("/api/v1/games/", headers=arcade_api_headers).status_code == 200
+        assert client.get("/api/v1/games/1", headers={"Authorization": "Bearer user-b"}).status_code == 404
+
+    def test_shedding_keeps_kiosk_reserve(self, client, arcade_api_headers, sample_arcade):
+        """Capacité ordinaire épuisée : 503 pour l'application, la borne passe sur la réserve."""
+        arcade_id = sample_arcade.id
+        concurrency_limiter.in_flight = concurrency_limiter.max_concurrency - concurrency_limiter.reserved
+        before = http_requests_rejected.values().get(("shed",), 0)
+
+        user = client.get("/api/v1/games/", headers={"Authorization": "Bearer user-a"})
+        kiosk = client.get(f"/api/v1/arcades/{arcade_id}/queue", headers=arcade_api_headers)
+
+        assert user.status_code == 503
+        assert user.headers["retry-after"] == "1"
+        assert kiosk.status_code == 200
+        assert concurrency_limiter.in_flight == concurrency_limiter.max_concurrency - concurrency_limiter.reserved
+        assert http_requests_rejected.values()[("shed",)] == before + 1
+
+    def test_invalid_api_key_not_prioritized(self, client):
+        """Une clé API invalide ne donne pas accès à la réserve des bornes."""
+        concurrency_limiter.in_flight = concurrency_limiter.max_concurrency - concurrency_limiter.reserved
+
+        response = client.get("/api/v1/games/", headers={"X-API-Key": "fausse-cle"})
+
+        assert response.status_code == 503
+
+    def test_pool_saturation_sheds_non_kiosk(self, arcade_api_headers):
+        """Pool saturé : seules les bornes sont servies."""
+        app = FastAPI()
+
+        @app.get("/ping")
+        async def ping():
+            return {"ok": True}
+
+        app.add_middleware(RateLimitMiddleware, pool_saturation=lambda: 1.0,
+                           limiter=RateLimiter(), concurrency=ConcurrencyLimiter(10, 2))
+        test_client = TestClient(app)
+
+        assert test_client.get("/ping", headers={"Authorization": "Bearer x"}).status_code == 503
+        assert test_client.get("/ping", headers=arcade_api_headers).status_code == 200
+
+    def test_token_bucket_refills(self):
+        """Le seau se remplit au débit configuré, sans dépasser sa capacité."""
+        bucket = TokenBucket(rate=2, capacity=2, now=0.0)
+
+        assert bucket.take(0.0) == 0.0
+        assert bucket.take(0.0) == 0.0
+        assert bucket.take(0.0) == pytest.approx(0.5)
+        assert bucket.take(0.5) == 0.0
+        bucket.take(100.0)
+        assert bucket.tokens == pytest.approx(1.0)
+
+    def test_limiter_forgets_oldest_keys(self):
+        """Le nombre de seaux est borné : les moins récents sont oubliés."""
+        limiter = RateLimiter(max_keys=2, clock=lambda: 0.0)
+        limiter.check("user", "a", 1, 1)
+        limiter.check("user", "b", 1, 1)
+        limiter.check("user", "c", 1, 1)
+
+        # "a" a été oublié : son seau repart plein
+        assert limiter.check("user", "a", 1, 1) == 0.0
+        assert limiter.check("user", "c", 1, 1) > 0
+
+    def test_concurrency_reserve(self):
+        """La réserve n'est accessible qu'aux requêtes prioritaires."""
+        limiter = ConcurrencyLimiter(max_concurrency=3, reserved=1)
+
+        assert limiter.acquire(priority=False)
+        assert limiter.acquire(priority=False)
+        assert not limiter.acquire(priority=False)
+        assert limiter.acquire(priority=True)
+        assert not limiter.acquire(priority=True)
+        limiter.release()
+        assert limiter.in_flight == 2
+
+    def test_parse_route_limits(self):
+        """Format "route=débit:rafale", rafale égale au débit si omise."""
+        assert parse_route_limits("/a/=10:20, /b/=5,") == {"/a/": (10.0, 20.0), "/b/": (5.0, 5.0)}
@@ -0,0 +1,93 @@
+import pytest
+import time
+from sqlalchemy import create_engine
+from app.core.database import ReplicaRouter, SessionLocal
+
+
+class TestReplicaRouting:
+    """Tests du routage des lectures vers les réplicas."""
+
+    @pytest.fixture
+    def replica_engines(self, tmp_path):
+        engines = [create_engine(f"sqlite:///{tmp_path / f'replica_{i}.db'}") for i in range(2)]
+        yield engines
+        for engine in engines:
+            engine.dispose()
+
+    @staticmethod
+    def make_router(engines, lag=0.0, **kwargs):
+        options = {"max_lag": 5.0, "check_interval": 60.0, "rw_window": 10.0}
+        options.update(kwargs)
+        probe = lag if callable(lag) else (lambda engine: lag)
+        return ReplicaRouter(engines, lag_probe=probe, **options)
+
+    def test_no_replica_uses_primary(self):
+        """Sans réplica configurée, les lectures vont au primaire."""
+        router = self.make_router([])
+
+        assert router.choose("client") is None
+
+    def test_round_robin_between_fresh_replicas(self, replica_engines):
+        """Les lectures sont réparties entre les réplicas à jour."""
+        router = self.make_router(replica_engines)
+
+        first = router.choose()
+        second = router.choose()
+
+        assert {first, second} == {replica.session_factory for replica in router.replicas}
+
+    def test_lagging_replica_falls_back_to_primary(self, replica_engines):
+        """Une réplica trop en retard est écartée."""
+        router = self.make_router(replica_engines, lag=30.0)
+
+        assert router.choose() is None
+
+    def test_unreachable_replica_falls_back_to_primary(self, replica_engines):
+        """Une réplica injoignable est écartée."""
+        def failing_probe(engine):
+            raise ConnectionError("replica down")
+
+        router = self.make_router(replica_engines, lag=failing_probe)
+
+        assert router.choose() is None
+
+    def test_skips_only_lagging_replica(self, replica_engines):
+        """Seule la réplica en retard est écartée."""
+        lagging, fresh = replica_engines
+        router = self.make_router(replica_engines, lag=lambda engine: 30.0 if engine is lagging else 0.0)
+
+        for _ in range(3):
+            assert router.choose() is router.replicas[1].session_factory
+
+    def test_lag_is_cached_between_checks(self, replica_engines):
+        """Le retard n'est remesuré qu'après l'intervalle de vérification."""
+        calls = []
+        router = self.make_router(replica_engines[:1], lag=lambda engine: calls.append(engine) or 0.0)
+
+        for _ in range(5):
+            router.choose()
+
+        assert len(calls) == 1
+
+    def test_read_your_writes(self, replica_engines):
+        """Un client qui vient d'écrire lit sur le primaire pendant la fenêtre."""
+        router = self.make_router(replica_engines, rw_window=0.05)
+        router.record_write("writer")
+
+        assert router.choose("writer") is None
+        assert router.choose("other") is not None
+
+        time.sleep(0.06)
+        assert router.choose("writer") is not None
+
+    def test_commit_records_client_write(self, monkeypatch, replica_engines):
+        """Un commit sur une session primaire marque le client comme écrivain récent."""
+        router = self.make_router(replica_engines)
+        monkeypatch.setattr("app.core.database.replica_router", router)
+
+        session = SessionLocal()
+        session.info["client_key"] = "client-key"
+        session.commit()
+        session.close()
+
+        assert router.wrote_recently("client-key")
@@ -456,6 +456,42 @@ class TestScores:
             response = client.get(endpoint)
             assert response.status_code == 403
 
+    def test_get_scores_sparse_fields(self, client, auth_headers_user, sample_user, player2, sample_game,
+                                      sample_arcade, db, query_budget):
+        """Test de fields= : réponse et requête SQL réduites aux champs demandés."""
+        from app.models import Score
+        db.add(Score(
+            player1_id=sample_user.id,
+            player2_id=player2.id,
+            game_id=sample_game.id,
+            arcade_id=sample_arcade.id,
+            score_j1=80,
+            score_j2=120
+        ))
+        db.commit()
+        winner = player2.pseudo
+
+        with query_budget(2) as requests:
+            response = client.get("/api/v1/scores/?fields=id,winner_pseudo", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 1
+        assert set(data[0]) == {"id", "winner_pseudo"}
+        assert data[0]["winner_pseudo"] == winner
+
+        score_queries = [statement for statement in requests[0].statements if "FROM scores" in statement]
+        assert score_queries
+        assert all("JOIN games" not in statement and "JOIN arcades" not in statement
+                   for statement in score_queries)
+
+    def test_get_scores_unknown_field(self, client, auth_headers_user):
+        """Test de fields= avec un champ inconnu."""
+        response = client.get("/api/v1/scores/?fields=id,password", headers=auth_headers_user)
+
+        assert response.status_code == 400
+        assert "password" in response.json()["detail"]
+
     def test_scores_ordered_by_date(self, client, auth_headers_user, sample_user, player2, sample_game, sample_arcade,
                                     db):
         """Test que les scores sont triés par date décroissante."""
@@ -484,6 +520,102 @@ class TestScores:
         assert len(data) == 3
 
         # Le plus récent devrait être en premier (score 102)
-        assert data[0]["score_j1"] == 100
+        assert data[0]["score_j1"] == 102
         assert data[1]["score_j1"] == 101
-        assert data[2]["score_j1"] == 102
\ No newline at end of file
+        assert data[2]["score_j1"] == 100
+
+    def test_create_scores_batch_success(self, client, arcade_api_headers, sample_user, player2, sample_game,
+                                         sample_arcade, db):
+        """Test d'envoi groupé de scores par une borne."""
+        from app.models import Score
+        batch_data = {
+            "scores": [
+                {
+                    "player1_id": sample_user.id,
+                    "player2_id": player2.id,
+                    "game_id": sample_game.id,
+                    "arcade_id": sample_arcade.id,
+                    "score_j1": 150,
+                    "score_j2": 120
+                },
+                {
+                    "player1_id": sample_user.id,
+                    "game_id": sample_game.id,
+                    "arcade_id": sample_arcade.id,
+                    "score_j1": 300
+                }
+            ]
+        }
+
+        response = client.post("/api/v1/scores/batch", json=batch_data, headers=arcade_api_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 2
+        assert data["created"] == 2
+        assert data["failed"] == 0
+        assert data["results"][0]["score"]["winner_pseudo"] == sample_user.pseudo
+        assert data["results"][1]["score"]["is_single_player"] is True
+        assert db.query(Score).count() == 2
+
+    def test_create_scores_batch_partial_failure(self, client, arcade_api_headers, sample_user, player2,
+                                                 sample_game, sample_arcade, db):
+        """Test que les scores invalides n'empêchent pas l'enregistrement des autres."""
+        from app.models import Score
+        batch_data = {
+            "scores": [
+                {
+                    "player1_id": 99999,
+                    "game_id": sample_game.id,
+                    "arcade_id": sample_arcade.id,
+                    "score_j1": 10
+                },
+                {
+                    "player1_id": sample_user.id,
+                    "player2_id": player2.id,
+                    "game_id": sample_game.id,
+                    "arcade_id": sample_arcade.id,
+                    "score_j1": 80,
+                    "score_j2": 120
+                },
+                {
+                    "player1_id": sample_user.id,
+                    "game_id": sample_game.id,
+                    "arcade_id": 99999,
+                    "score_j1": 10
+                }
+            ]
+        }
+
+        response = client.post("/api/v1/scores/batch", json=batch_data, headers=arcade_api_headers)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["created"] == 1
+        assert data["failed"] == 2
+        assert data["results"][0]["error"] == "Joueur 1 non trouvé"
+        assert data["results"][1]["success"] is True
+        assert data["results"][1]["score"]["winner_pseudo"] == player2.pseudo
+        assert data["results"][2]["error"] == "Borne d'arcade non trouvée"
+        assert db.query(Score).count() == 1
+
+    def test_create_scores_batch_unauthorized(self, client, sample_user, sample_game, sample_arcade):
+        """Test d'envoi groupé sans clé API."""
+        batch_data = {
+            "scores": [{
+                "player1_id": sample_user.id,
+                "game_id": sample_game.id,
+                "arcade_id": sample_arcade.id,
+                "score_j1": 10
+            }]
+        }
+
+        response = client.post("/api/v1/scores/batch", json=batch_data)
+
+        assert response.status_code == 401
+
+    def test_create_scores_batch_empty(self, client, arcade_api_headers):
+        """Test d'envoi groupé vide."""
+        response = client.post("/api/v1/scores/batch", json={"scores": []}, headers=arcade_api_headers)
+
+        assert response.status_code == 422
@@ -0,0 +1,103 @@
+import datetime
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import StaticPool
+from app.core.config import settings
+from app.core.slow_queries import slow_query_log, redact, flush_explains
+
+
+class TestSlowQueries:
+    """Tests du journal des requêtes lentes."""
+
+    @pytest.fixture
+    def log_everything(self, monkeypatch):
+        """Seuil minimal : toutes les instructions sont journalisées."""
+        monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 1e-6)
+
+    def test_slow_query_recorded_with_route(self, client, auth_headers_user, log_everything):
+        """Les instructions lentes portent la route qui les a émises et des paramètres masqués."""
+        response = client.get("/api/v1/users/me", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        entries = slow_query_log.entries("/api/v1/users/me")
+        assert entries
+        user_lookup = next(entry for entry in entries if "FROM users" in entry.statement)
+        # L'UID Firebase est masqué
+        assert "test_uid_123" not in str(user_lookup.parameters)
+        assert "<str len=12>" in str(user_lookup.parameters)
+
+    def test_below_threshold_not_recorded(self, client, auth_headers_user, monkeypatch):
+        """Une instruction sous le seuil n'est pas journalisée."""
+        monkeypatch.setattr(settings, "SLOW_QUERY_THRESHOLD_MS", 60000)
+
+        client.get("/api/v1/users/me", headers=auth_headers_user)
+
+        assert slow_query_log.entries() == []
+
+    def test_explain_captured_in_background(self, log_everything, monkeypatch):
+        """Avec SLOW_QUERY_EXPLAIN, le plan des SELECT lents est capturé sur une autre connexion."""
+        monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN", True)
+        engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False},
+                               poolclass=StaticPool)
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        slow_query_log.clear()
+
+        with engine.connect() as connection:
+            connection.execute(text("SELECT name FROM items WHERE id = :id"), {"id": 3}).all()
+        flush_explains(timeout=5)
+
+        entry = slow_query_log.entries()[0]
+        assert entry.parameters == [3]
+        assert entry.plan and "items" in entry.plan[0]
+        assert not any(e.statement.startswith("EXPLAIN") for e in slow_query_log.entries())
+
+    def test_explain_queue_bounded(self, log_everything, monkeypatch):
+        """Worker occupé : au-delà de la file, les EXPLAIN sont abandonnés au lieu de s'accumuler."""
+        import threading
+        from app.core import slow_queries
+        monkeypatch.setattr(settings, "SLOW_QUERY_EXPLAIN", True)
+        monkeypatch.setattr(slow_queries, "_explain_slots", threading.BoundedSemaphore(2))
+        engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False},
+                               poolclass=StaticPool)
+        with engine.begin() as connection:
+            connection.execute(text("CREATE TABLE items (id INTEGER PRIMARY KEY, name TEXT)"))
+        slow_query_log.clear()
+        busy = threading.Event()
+        slow_queries._explain_executor.submit(busy.wait, 5)
+
+        with engine.connect() as connection:
+            for item_id in range(5):
+                connection.execute(text("SELECT name FROM items WHERE id = :id"), {"id": item_id}).all()
+        busy.set()
+        flush_explains(timeout=5)
+
+        plans = [entry.plan for entry in slow_query_log.entries()]
+        assert len(plans) == 5
+        assert sum(plan is not None for plan in plans) == 2
+        # Les places sont rendues une fois les EXPLAIN terminés
+        assert slow_queries._explain_slots.acquire(blocking=False)
+
+    def test_admin_endpoints(self, client, auth_headers_admin, db, log_everything):
+        """Les requêtes lentes sont listées et regroupées par instruction."""
+        db.execute(text("SELECT 1")).all()
+        db.execute(text("SELECT 1")).all()
+
+        response = client.get("/api/v1/admin/slow-queries", headers=auth_headers_admin)
+        summary = client.get("/api/v1/admin/slow-queries/summary", headers=auth_headers_admin)
+
+        assert response.status_code == 200
+        assert summary.status_code == 200
+        assert response.json()[0]["statement"] == "SELECT 1"
+        assert summary.json()[0]["statement"] == "SELECT 1"
+        assert summary.json()[0]["count"] == 2
+        assert {"total_ms", "avg_ms", "max_ms", "routes"} <= set(summary.json()[0])
+
+    def test_redact(self):
+        """Les chaînes sont masquées ; nombres, dates et booléens conservés."""
+        when = datetime.datetime(2025, 1, 1)
+
+        assert redact(("alice", 42, None, True, when, b"xy")) == [
+            "<str len=5>", 42, None, True, "2025-01-01T00:00:00", "<bytes len=2>"
+        ]
+        assert redact({"pseudo": "bob", "id": 1}) == {"pseudo": "<str len=3>", "id": 1}
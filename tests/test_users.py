@@ -144,6 +144,86 @@ class TestUsers:
         assert len(data) == 1
         assert data[0]["pseudo"] == "pseudotest"
 
+    def test_search_users_ranked_by_similarity(self, client, auth_headers_user, sample_user, db):
+        """Test du classement des résultats par similarité."""
+        from app.models import User
+        for i, pseudo in enumerate(["marcelino", "marc", "lemarchand"]):
+            db.add(User(
+                firebase_uid=f"rank{i}",
+                email=f"rank{i}@example.com",
+                nom="Classement",
+                prenom="Test",
+                pseudo=pseudo,
+                date_naissance=datetime.date(1990, 1, 1),
+                numero_telephone=f"044444444{i}"
+            ))
+        db.commit()
+
+        response = client.get("/api/v1/users/search?q=marc", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        assert [user["pseudo"] for user in response.json()] == ["marc", "marcelino", "lemarchand"]
+
+    def test_search_users_wildcards_are_literal(self, client, auth_headers_user, sample_user, db):
+        """Les caractères % et _ sont recherchés tels quels."""
+        from app.models import User
+        db.add(User(
+            firebase_uid="wildcard",
+            email="wildcard@example.com",
+            nom="Joker",
+            prenom="Test",
+            pseudo="jo_ker",
+            date_naissance=datetime.date(1990, 1, 1),
+            numero_telephone="0555555555"
+        ))
+        db.commit()
+
+        response = client.get("/api/v1/users/search?q=o_k", headers=auth_headers_user)
+        assert [user["pseudo"] for user in response.json()] == ["jo_ker"]
+
+    def test_search_index_follows_user_writes(self, client, auth_headers_user, sample_user, db):
+        """L'index en mémoire suit les renommages et suppressions."""
+        from app.models import User
+        from app.services.user_service import user_search_index
+        user_search_index.ensure_loaded(db)
+        renamed = User(
+            firebase_uid="renamed",
+            email="renamed@example.com",
+            nom="Avant",
+            prenom="Test",
+            pseudo="ancienpseudo",
+            date_naissance=datetime.date(1990, 1, 1),
+            numero_telephone="0666666666"
+        )
+        deleted = User(
+            firebase_uid="deleted",
+            email="deleted@example.com",
+            nom="Nouveau",
+            prenom="Supprime",
+            pseudo="nouveaupseudo2",
+            date_naissance=datetime.date(1990, 1, 1),
+            numero_telephone="0777777777"
+        )
+        db.add_all([renamed, deleted])
+        db.commit()
+        renamed.pseudo = "nouveaupseudo"
+        deleted.is_deleted = True
+        db.commit()
+
+        assert user_search_index.search("ancien", 10) == []
+        assert user_search_index.search("nouveau", 10) == [renamed.id]
+
+    def test_search_postgresql_query_uses_trigram_operators(self):
+        """Sur PostgreSQL, la recherche filtre en ILIKE et classe par similarity()."""
+        from sqlalchemy.dialects import postgresql
+        from app.services.user_service import postgresql_search_query
+
+        sql = str(postgresql_search_query("dupont", 10, 1).compile(dialect=postgresql.dialect()))
+
+        assert "users.pseudo ILIKE" in sql
+        assert "similarity(users.pseudo" in sql
+        assert "lower(" not in sql
+
     def test_search_users_empty_query(self, client, auth_headers_user):
         """Test de recherche avec query trop courte."""
         response = client.get("/api/v1/users/search?q=a", headers=auth_headers_user)
@@ -177,4 +257,119 @@ class TestUsers:
 
         for endpoint in endpoints:
             response = client.get(endpoint)
-            assert response.status_code == 403
\ No newline at end of file
+            assert response.status_code == 403
+
+class TestPseudoIndex:
+    """Tests de la disponibilité et de l'autocomplétion des pseudos."""
+
+    @pytest.fixture
+    def pseudos(self, db, sample_user):
+        from app.models import User
+        users = []
+        for i, pseudo in enumerate(["Marco", "marcel", "martine", "zoe"]):
+            user = User(
+                firebase_uid=f"pseudo{i}",
+                email=f"pseudo{i}@example.com",
+                nom="Pseudo",
+                prenom="Test",
+                pseudo=pseudo,
+                date_naissance=datetime.date(1990, 1, 1),
+                numero_telephone=f"088888888{i}"
+            )
+            db.add(user)
+            users.append(user)
+        db.commit()
+        return users
+
+    def test_pseudo_taken(self, client, pseudos):
+        """Un pseudo utilisé n'est pas disponible."""
+        response = client.get("/api/v1/users/pseudo-availability?q=marcel")
+
+        assert response.status_code == 200
+        assert response.json() == {"pseudo": "marcel", "available": False}
+
+    def test_pseudo_available(self, client, pseudos):
+        """Un pseudo libre est disponible."""
+        response = client.get("/api/v1/users/pseudo-availability?q=marcelle")
+
+        assert response.status_code == 200
+        assert response.json()["available"] is True
+
+    def test_deleted_account_pseudo_not_available(self, client, auth_headers_user, sample_user, db):
+        """Le pseudo d'un compte supprimé reste pris : l'inscription le refuserait."""
+        from app.services.user_service import pseudo_index
+        pseudo = sample_user.pseudo
+        pseudo_index.ensure_loaded(db)
+
+        assert client.delete("/api/v1/users/me", headers=auth_headers_user).status_code == 200
+        response = client.get(f"/api/v1/users/pseudo-availability?q={pseudo}")
+
+        assert response.json() == {"pseudo": pseudo, "available": False}
+        assert pseudo_index.autocomplete(pseudo) == []
+
+    def test_deleted_account_pseudo_reserved_on_load(self, db, pseudos):
+        """Au chargement, les comptes supprimés réservent leur pseudo sans être suggérés."""
+        from app.services.user_service import pseudo_index
+        pseudos[1].is_deleted = True
+        db.commit()
+        pseudo_index.reset()
+
+        pseudo_index.ensure_loaded(db)
+
+        assert not pseudo_index.is_available("marcel")
+        assert pseudo_index.autocomplete("marc") == ["Marco"]
+
+    def test_autocomplete_prefix(self, client, auth_headers_user, pseudos):
+        """L'autocomplétion ignore la casse et trie par ordre alphabétique."""
+        response = client.get("/api/v1/users/autocomplete?prefix=MARC", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        assert response.json() == ["marcel", "Marco"]
+
+    def test_autocomplete_limit(self, client, auth_headers_user, pseudos):
+        """Le nombre de suggestions est limité."""
+        response = client.get("/api/v1/users/autocomplete?prefix=mar&limit=2", headers=auth_headers_user)
+
+        assert response.status_code == 200
+        assert response.json() == ["marcel", "Marco"]
+
+    def test_autocomplete_requires_authentication(self, client, pseudos):
+        """Sans connexion, l'autocomplétion est refusée ; la disponibilité reste publique."""
+        assert client.get("/api/v1/users/autocomplete?prefix=m").status_code == 403
+        assert client.get("/api/v1/users/pseudo-availability?q=marcel").status_code == 200
+
+    def test_no_query_once_loaded(self, client, pseudos, db, query_budget):
+        """Une fois l'index chargé, aucune requête SQL n'est émise."""
+        from app.services.user_service import pseudo_index
+        pseudo_index.ensure_loaded(db)
+
+        with query_budget(0):
+            response = client.get("/api/v1/users/pseudo-availability?q=zoe")
+
+        assert response.json() == {"pseudo": "zoe", "available": False}
+
+    def test_index_follows_user_writes(self, db, pseudos):
+        """Renommage, suppression et restauration mettent l'index à jour après commit."""
+        from app.services.user_service import pseudo_index
+        pseudo_index.ensure_loaded(db)
+        marco, marcel, martine, _ = pseudos
+
+        marco.pseudo = "polo"
+        marcel.is_deleted = True
+        db.commit()
+        assert pseudo_index.is_available("Marco")
+        assert pseudo_index.autocomplete("p") == ["polo"]
+        # Compte supprimé : pseudo toujours réservé, mais plus suggéré
+        assert not pseudo_index.is_available("marcel")
+        assert pseudo_index.autocomplete("marc") == []
+
+        marcel.is_deleted = False
+        db.commit()
+        assert not pseudo_index.is_available("marcel")
+        assert pseudo_index.autocomplete("marc") == ["marcel"]
+
+        martine.pseudo = "annulee"
+        db.flush()
+        db.rollback()
+        assert not pseudo_index.is_available("martine")
+        assert pseudo_index.is_available("annulee")